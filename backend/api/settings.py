@@ -208,3 +208,73 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:5173',
     'http://localhost:5173',
 ]
+
+# 추천(recommendations) 벡터 스토어 설정
+VECTOR_STORE_WARMUP = True # 서버 기동 시 Chroma 컬렉션을 미리 열어 둘지 여부
+# 추천 검색 백엔드: "chroma"(Chroma 컬렉션) | "numpy"(BookVector 인메모리 exact 검색)
+#   | "compressed"(IVF + int8 압축 인덱스 + 원본 벡터 재순위, `manage.py build_compressed_index` 필요)
+RECOMMEND_VECTOR_BACKEND = "chroma"
+# BookVector / UserProfileVector 저장 포맷: "float32" | "float16"
+VECTOR_STORAGE_DTYPE = "float32"
+# 인메모리 / 스냅샷 / 압축 인덱스가 다른 프로세스에서 저장된 책 벡터를 DB에서 확인하는 주기(초)
+RECOMMEND_VECTOR_INDEX_CHECK_SECONDS = 5
+# 책 벡터 삭제 확인(전체 행 수 집계) 주기(초). 줄었으면 인메모리 인덱스를 다시 적재한다.
+RECOMMEND_VECTOR_INDEX_COUNT_SECONDS = 300
+# 임베딩 캐시 (DB 영구 캐시 앞단의 프로세스 LRU 크기)
+EMBEDDING_CACHE_LRU_SIZE = 512
+
+# 벡터 작업 큐(VectorJob) 설정
+VECTOR_JOB_RUN_IN_PROCESS = True # False면 웹 프로세스에서 워커를 띄우지 않고 `manage.py run_vector_workers`로 실행
+VECTOR_JOB_WORKERS = 2 # 동시에 실행할 작업 수 (크롤링/Selenium/LLM 동시 실행 상한)
+VECTOR_JOB_POLL_SECONDS = 2.0
+VECTOR_JOB_RETRY_BASE_SECONDS = 30 # 실패 시 30s, 60s, 120s ... 후 재시도
+VECTOR_JOB_HEARTBEAT_SECONDS = 15 # 실행 중인 작업의 heartbeat_at 갱신 주기
+VECTOR_JOB_LEASE_SECONDS = 60 # 이 시간 동안 heartbeat가 없으면 워커가 죽은 것으로 보고 작업을 다시 대기열로
+
+# 신규 도서 벡터 생성 시 크롤링 예산 (소스들을 동시에 실행)
+BOOK_CRAWL_BUDGET_SECONDS = 60 # 이 시간 안에 끝난 소스만으로 요약
+BOOK_CRAWL_SOURCE_TIMEOUTS = {
+    "aladin": 20,
+    "kyobo": 45, # 리뷰 + 책 소개 (상세 페이지 1회 로드)
+}
+
+# 교보 크롤러 headless Chrome 풀
+CRAWLER_BROWSER_POOL_SIZE = 2 # 동시에 띄울 Chrome 수 (VECTOR_JOB_WORKERS 이하로 충분)
+CRAWLER_BROWSER_MAX_PAGES = 50 # 드라이버 하나로 이만큼 처리하면 종료 후 새로 생성
+
+# ISBN -> 알라딘 / 교보 상품 id 매핑 캐시 (ExternalProductId)
+PRODUCT_ID_NEGATIVE_TTL_SECONDS = 60 * 60 * 24 * 7 # 검색 결과 없음도 7일간 저장 후 재검색
+
+# LLM(gpt-4o-mini) 게이트웨이: 모든 요약 / 키워드 / 추천 사유 호출이 공유하는 예산과 캐시
+LLM_REQUESTS_PER_MINUTE = 60
+LLM_TOKENS_PER_MINUTE = 150_000
+LLM_PROMPT_CACHE = True # (모델, 프롬프트 해시) 기준 응답을 DB(LLMResponseCache)에 저장해 재사용
+
+# 신규 도서 요약: True면 알라딘 / 교보 리뷰 / 교보 책 소개를 LLM 1회(JSON 스키마 응답)로 요약, 실패 시 소스별 3회 호출
+BOOK_SUMMARY_COMBINED = True
+
+# 리뷰 작성 시 책 벡터 재생성 묶기 (같은 책 요청은 창 안에서 1회로 합쳐짐)
+REVIEW_REBUILD_WINDOW_SECONDS = 60
+REVIEW_REBUILD_MIN_INTERVAL_SECONDS = 300 # 같은 책 재생성 최소 간격
+
+# 사용자 프로필 벡터(리뷰 임베딩 가중 평균): 증분 갱신 이만큼마다 기여분 전체로 정확히 재계산
+PROFILE_RECOMPUTE_EVERY = 50
+
+# 비슷한 책 목록 (BookNeighbor, `manage.py build_book_neighbors`로 전체 계산)
+BOOK_NEIGHBOR_K = 20
+BOOK_NEIGHBOR_BLOCK_SIZE = 256 # 블록 하나의 유사도 행렬 = 256 x 전체 책 수
+BOOK_NEIGHBOR_INCREMENTAL = True # 책 벡터 저장 시 그 책과 역방향 이웃만 다시 계산 (작업 큐에서 실행)
+BOOK_NEIGHBOR_REVERSE_CANDIDATES = 200 # 새 책이 이웃 목록에 들어갈 수 있는지 확인할 책 수 (새 책과 가까운 순)
+
+# 리뷰별 추천 결과 미리 계산 (ReviewRecommendation): 계산 후 이 시간 동안은 책 벡터가 바뀌어도 다시 계산하지 않는다.
+REVIEW_RECOMMENDATION_MAX_STALENESS_SECONDS = 60 * 60 * 6
+
+# 압축 추천 인덱스 (RECOMMEND_VECTOR_BACKEND = "compressed")
+RECOMMEND_COMPRESSED_DIM = 512 # Matryoshka: 앞 512차원만 사용 (256도 가능)
+RECOMMEND_COMPRESSED_PROBE = 8 # 쿼리마다 살펴볼 IVF 군집 수
+RECOMMEND_COMPRESSED_RERANK = 100 # 원본 벡터로 다시 점수를 매길 후보 수
+
+# 워커 간 공유 책 벡터 스냅샷 (.npy memmap, `manage.py build_vector_snapshot`)
+RECOMMEND_VECTOR_SNAPSHOT = False # True면 인메모리 인덱스 대신 스냅샷을 읽기 전용으로 연다.
+RECOMMEND_VECTOR_SNAPSHOT_CHECK_SECONDS = 5 # 새 버전 확인 주기
+RECOMMEND_VECTOR_SNAPSHOT_REBUILD_DELAY_SECONDS = 120 # 책 벡터 저장 후 이 시간 동안 모아서 스냅샷 1회 재생성
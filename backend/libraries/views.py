@@ -10,6 +10,7 @@ from reviews.models import Review
 from .serializers import LibraryBookListSerializer, LibraryBookCreateSerializer, LibraryBookUpdateSerializer, LibraryBookDetailSerializer
 from .models import Library
 from common.utils.paginations import apply_queryset_pagination
+from recommendations.services.user_recommendations import refresh_user_exclusions
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 
 
@@ -81,6 +82,7 @@ def library_book_list(request):
         serializer = LibraryBookCreateSerializer(data=request.data, context={'request': request})
         if serializer.is_valid(raise_exception=True):
             new_library_book = serializer.save(user=request.user)
+            refresh_user_exclusions(request.user.id)
             return Response(LibraryBookDetailSerializer(new_library_book).data, status=status.HTTP_201_CREATED)
         
 
@@ -128,4 +130,5 @@ def library_book(request, library_id):
     # 독서 상태 삭제
     elif request.method == 'DELETE':
         library.delete()
+        refresh_user_exclusions(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,6 +1,37 @@
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RecommendationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recommendations'
+
+    def ready(self):
+        # 모든 LLM 호출이 공유하는 RPM/TPM 예산과 DB 프롬프트 캐시를 설정한다.
+        from recommendations.services.llm_cache import install_llm_gateway
+
+        install_llm_gateway()
+
+        # 교보 상세 페이지 크롤링에 쓰는 headless Chrome 풀 크기 (풀은 첫 크롤링 때 만들어진다)
+        from recommendations.my_source.crollers.browser_pool import configure_browser_pool
+
+        configure_browser_pool(
+            size=getattr(settings, "CRAWLER_BROWSER_POOL_SIZE", 2),
+            max_pages=getattr(settings, "CRAWLER_BROWSER_MAX_PAGES", 50),
+        )
+
+        from recommendations.services.job_queue import is_server_process, should_start_in_process, start_worker_pool
+
+        # 첫 추천 요청이 Chroma 오픈 비용을 떠안지 않도록 서버 기동 시 컬렉션을 미리 열어 둔다.
+            # - migrate 등 관리 명령 / runserver 리로더 부모 프로세스에서는 열지 않는다.
+        if getattr(settings, "VECTOR_STORE_WARMUP", True) and is_server_process():
+            from recommendations.services.vector_store import warm_up
+
+            threading.Thread(target=warm_up, daemon=True).start()
+
+        # 재시작 전에 남아 있던 벡터 작업을 이어서 처리하도록 워커 풀을 띄운다.
+
+        if should_start_in_process():
+            threading.Thread(target=start_worker_pool, daemon=True).start()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.models import BookVector
+from recommendations.services.make_book_vector_pipeline_after_add_book import build_vector_metadata
+from recommendations.services.vector_store import update_metadatas
+
+
+class Command(BaseCommand):
+    help = "기존 Chroma 문서 메타데이터에 book_id / category_id / published_year를 채웁니다. (재임베딩 없음)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        books = [
+            bv.book for bv in BookVector.objects.select_related("book").only(
+                "book__id", "book__isbn", "book__category_id", "book__published_date",
+            )
+            if bv.book.isbn
+        ]
+        self.stdout.write(f"targets: {len(books)}")
+
+        updated = 0
+        batch_size = max(1, options["batch_size"])
+        for start in range(0, len(books), batch_size):
+            batch = books[start:start + batch_size]
+            updated += update_metadatas(
+                ids=[str(book.isbn) for book in batch],
+                metadatas=[build_vector_metadata(book) for book in batch],
+            )
+            self.stdout.write(f"progress: {start + len(batch)}/{len(books)}")
+
+        self.stdout.write(self.style.SUCCESS(f"updated={updated} missing={len(books) - updated}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.services.book_neighbors import BLOCK_SIZE, NEIGHBOR_K, build_all_neighbors
+
+
+class Command(BaseCommand):
+    help = "BookVector 전체로 책별 비슷한 책 top-K(BookNeighbor)를 다시 계산합니다. (블록 단위 행렬곱)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=NEIGHBOR_K)
+        parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="한 번에 계산할 책 수 (메모리 = block x N x 4바이트)")
+
+    def handle(self, *args, **options):
+        result = build_all_neighbors(k=max(1, options["k"]), block_size=max(1, options["block_size"]))
+        self.stdout.write(self.style.SUCCESS(
+            f"books={result['books']} rows={result['rows']} k={result['k']} in {result['seconds']}s"
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.services.vector_snapshot import SNAPSHOT_DIR, build_vector_snapshot
+
+
+class Command(BaseCommand):
+    help = "BookVector로 워커 간 공유하는 memmap 스냅샷(.npy + 버전 헤더)을 새 버전으로 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=SNAPSHOT_DIR)
+
+    def handle(self, *args, **options):
+        header = build_vector_snapshot(options["dir"])
+        if not header.get("rows"):
+            self.stdout.write(self.style.WARNING("no book vectors"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"version={header['version']} rows={header['written']}/{header['rows']} "
+            f"dim={header['dim']} in {header['seconds']}s"
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.services.crawl_store import get_crawl_change_report
+
+
+class Command(BaseCommand):
+    help = "책별 크롤링 입력 변경 여부와 벡터가 최신 입력으로 만들어졌는지(stale) 보여줍니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="최근 N일 안에 입력이 바뀐 책만")
+        parser.add_argument("--stale-only", action="store_true", help="아직 벡터에 반영되지 않은 변경만")
+
+    def handle(self, *args, **options):
+        report = get_crawl_change_report(days=options["days"], changed_only=options["stale_only"])
+
+        for row in report:
+            self.stdout.write(
+                f"{row['isbn']} inputs={row['input_count']} "
+                f"checked={row['checked_at']:%Y-%m-%d %H:%M} "
+                f"changed={row['changed_at'] or '-'} "
+                f"built={row['built_at'] or '-'} "
+                f"{'STALE' if row['stale'] else 'ok'}"
+            )
+
+        stale = sum(1 for row in report if row["stale"])
+        self.stdout.write(self.style.SUCCESS(f"books={len(report)} stale={stale}"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from books.models import Book
+from recommendations.models import ExternalProductId
+from recommendations.services.product_id_lookup import prefill_product_ids
+
+
+class Command(BaseCommand):
+    help = "ISBN -> 알라딘 ItemId / 교보 productId 매핑(ExternalProductId)을 미리 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--provider",
+            choices=[*ExternalProductId.Provider.values, "all"],
+            default="all",
+        )
+        parser.add_argument("--csv", help="isbn13 컬럼이 있는 CSV (배치 크롤러 입력 파일). 없으면 Book 테이블 전체")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--refresh", action="store_true", help="저장된 매핑도 다시 검색")
+
+    def handle(self, *args, **options):
+        if options["csv"]:
+            import pandas as pd
+            isbns = pd.read_csv(options["csv"], dtype={"isbn13": str})["isbn13"].dropna().tolist()
+        else:
+            isbns = list(Book.objects.exclude(isbn="").values_list("isbn", flat=True))
+
+        providers = (
+            ExternalProductId.Provider.values
+            if options["provider"] == "all"
+            else [options["provider"]]
+        )
+        for provider in providers:
+            stats = prefill_product_ids(
+                provider,
+                isbns,
+                workers=options["workers"],
+                refresh=options["refresh"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"{provider}: {stats}"))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.models import ReviewProfileContribution, UserProfileVector
+from recommendations.my_source.embeddings import MAX_EMBED_BATCH
+from recommendations.services.embedding_cache import cached_make_embeddings_batch
+from recommendations.services.review_vector_pipeline import _make_review_text
+from recommendations.services.user_profile import recompute_user_profile, upsert_review_contribution
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    help = "리뷰별 기여분으로 사용자 프로필 벡터를 정확히 다시 계산합니다. (누적 오차 정리 / 기존 EMA 프로필 전환용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backfill", action="store_true", help="기여분이 없는 기존 리뷰를 임베딩해 기여분을 먼저 채운다")
+        parser.add_argument("--user", type=int, action="append", help="특정 사용자만 (여러 번 지정 가능)")
+        parser.add_argument("--batch-size", type=int, default=MAX_EMBED_BATCH * 8)
+
+    def handle(self, *args, **options):
+        user_ids = options["user"]
+
+        if options["backfill"]:
+            self._backfill(user_ids, max(1, options["batch_size"]))
+
+        if user_ids is None:
+            user_ids = set(ReviewProfileContribution.objects.values_list("user_id", flat=True).distinct())
+            user_ids |= set(UserProfileVector.objects.values_list("user_id", flat=True))
+
+        for user_id in sorted(user_ids):
+            recompute_user_profile(user_id)
+
+        self.stdout.write(self.style.SUCCESS(f"recomputed users={len(user_ids)}"))
+
+    def _backfill(self, user_ids, batch_size: int) -> None:
+        done_ids = set(ReviewProfileContribution.objects.values_list("review_id", flat=True))
+        qs = Review.objects.order_by("id")
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+
+        targets = []
+        for review_id, user_id, title, content in qs.values_list("id", "user_id", "title", "content").iterator():
+            text = _make_review_text(title, content)
+            if review_id not in done_ids and text:
+                targets.append((review_id, user_id, text))
+
+        self.stdout.write(f"backfill targets: {len(targets)}")
+
+        done = failed = 0
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+            vectors = cached_make_embeddings_batch([text for _, _, text in batch])
+            for (review_id, user_id, _), emb in zip(batch, vectors):
+                if not emb:
+                    failed += 1
+                    continue
+                upsert_review_contribution(user_id, review_id, emb)
+                done += 1
+            self.stdout.write(f"progress: {start + len(batch)}/{len(targets)}")
+
+        self.stdout.write(f"backfilled={done} failed={failed}")
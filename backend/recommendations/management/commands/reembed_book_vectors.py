@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.models import BookVector
+from recommendations.my_source.embeddings import MAX_EMBED_BATCH
+from recommendations.services.embedding_cache import cached_make_embeddings_batch
+from recommendations.services.make_book_vector_pipeline_after_add_book import (
+    PROVIDER_MODEL_KEY,
+    _save_book_vector,
+)
+
+
+class Command(BaseCommand):
+    help = "저장된 요약(BookVector.summary)을 배치 임베딩으로 다시 벡터화합니다. (모델 변경 / 누락 벡터 백필용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="모델이 같은 벡터도 모두 다시 임베딩")
+        parser.add_argument("--batch-size", type=int, default=MAX_EMBED_BATCH * 8)
+
+    def handle(self, *args, **options):
+        qs = BookVector.objects.select_related("book").exclude(summary="")
+        if not options["all"]:
+            targets = [
+                bv for bv in qs.iterator()
+                if bv.embedding_model != PROVIDER_MODEL_KEY or bv.get_vector_array() is None
+            ]
+        else:
+            targets = list(qs)
+
+        self.stdout.write(f"targets: {len(targets)}")
+
+        done = failed = 0
+        batch_size = max(1, options["batch_size"])
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+            vectors = cached_make_embeddings_batch([bv.summary for bv in batch])
+            for bv, emb in zip(batch, vectors):
+                if not emb:
+                    failed += 1
+                    continue
+                _save_book_vector(bv.book, bv.summary, emb)
+                done += 1
+            self.stdout.write(f"progress: {start + len(batch)}/{len(targets)}")
+
+        self.stdout.write(self.style.SUCCESS(f"re-embedded={done} failed={failed}"))
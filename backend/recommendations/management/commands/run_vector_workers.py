@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.services.job_queue import WORKERS, start_worker_pool, stop_worker_pool
+
+
+class Command(BaseCommand):
+    help = "벡터 작업 큐(VectorJob) 워커 풀을 별도 프로세스로 실행합니다. (VECTOR_JOB_RUN_IN_PROCESS = False 일 때 사용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=WORKERS)
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        start_worker_pool(workers)
+        self.stdout.write(self.style.SUCCESS(f"vector job workers started: {workers}"))
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            stop_worker_pool()
+            self.stdout.write("stopping workers")
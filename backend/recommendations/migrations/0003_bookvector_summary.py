@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0002_bookvector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookvector',
+            name='summary',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
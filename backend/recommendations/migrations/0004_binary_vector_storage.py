@@ -0,0 +1,86 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:02
+
+import json
+
+import numpy as np
+from django.db import migrations, models
+
+
+def json_to_binary(apps, schema_editor):
+    # 기존 JSON 텍스트 벡터를 float32 바이트로 변환하고 텍스트 컬럼은 비운다.
+    for model_name in ("BookVector", "UserProfileVector"):
+        Model = apps.get_model("recommendations", model_name)
+        for row in Model.objects.filter(vector_blob__isnull=True).exclude(vector="").iterator():
+            try:
+                values = json.loads(row.vector)
+            except Exception:
+                continue
+            if not isinstance(values, list) or not values:
+                continue
+            row.vector_blob = np.asarray(values, dtype="<f4").tobytes()
+            row.vector_dtype = "float32"
+            row.embedding_dim = len(values)
+            row.vector = ""
+            row.save(update_fields=["vector_blob", "vector_dtype", "embedding_dim", "vector"])
+
+
+def binary_to_json(apps, schema_editor):
+    for model_name in ("BookVector", "UserProfileVector"):
+        Model = apps.get_model("recommendations", model_name)
+        for row in Model.objects.filter(vector_blob__isnull=False).iterator():
+            dtype = "<f2" if row.vector_dtype == "float16" else "<f4"
+            values = np.frombuffer(row.vector_blob, dtype=dtype).astype(float).tolist()
+            row.vector = json.dumps(values)
+            row.vector_blob = None
+            row.save(update_fields=["vector", "vector_blob"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0003_bookvector_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookvector',
+            name='vector',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='bookvector',
+            name='vector_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bookvector',
+            name='vector_dtype',
+            field=models.CharField(default='float32', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='userprofilevector',
+            name='vector',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='vector_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='vector_dtype',
+            field=models.CharField(default='float32', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='embedding_model',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='embedding_dim',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(json_to_binary, binary_to_json),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0004_binary_vector_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_model', models.CharField(max_length=100)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('vector_blob', models.BinaryField()),
+                ('vector_dtype', models.CharField(default='float32', max_length=10)),
+                ('embedding_dim', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('provider_model', 'text_hash'), name='uq_embedding_cache_model_hash')],
+            },
+        ),
+    ]
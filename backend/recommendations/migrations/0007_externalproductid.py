@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0006_vectorjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalProductId',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('aladin', '알라딘'), ('kyobo', '교보문고')], max_length=20)),
+                ('isbn', models.CharField(max_length=20)),
+                ('external_id', models.CharField(blank=True, default='', max_length=50)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('provider', 'isbn'), name='uq_external_product_id_provider_isbn')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0007_externalproductid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookCrawlState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('isbn', models.CharField(max_length=20, unique=True)),
+                ('input_digest', models.CharField(blank=True, default='', max_length=64)),
+                ('input_count', models.PositiveIntegerField(default=0)),
+                ('checked_at', models.DateTimeField(auto_now=True)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+                ('built_digest', models.CharField(blank=True, default='', max_length=64)),
+                ('built_summary_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CrawledReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('isbn', models.CharField(max_length=20)),
+                ('source', models.CharField(max_length=50)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('review_text', models.TextField()),
+                ('rating', models.FloatField(blank=True, null=True)),
+                ('review_date', models.CharField(blank=True, default='', max_length=50)),
+                ('blog_url', models.TextField(blank=True, default='')),
+                ('first_seen_at', models.DateTimeField(auto_now_add=True)),
+                ('last_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['isbn', 'source'], name='idx_crawled_review_isbn_src')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'isbn', 'content_hash'), name='uq_crawled_review_source_isbn_hash')],
+            },
+        ),
+    ]
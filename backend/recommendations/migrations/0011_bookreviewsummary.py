@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0013_alter_externalcategorymapping_external_cid_and_more'),
+        ('recommendations', '0010_alter_vectorjob_kind'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookReviewSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.TextField(blank=True, default='')),
+                ('sentiment', models.CharField(blank=True, default='', max_length=20)),
+                ('keywords', models.TextField(blank=True, default='')),
+                ('last_review_id', models.BigIntegerField(default=0)),
+                ('folded_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='review_summary', to='books.book')),
+            ],
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0011_bookreviewsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='sum_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='weight_total',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='updates_since_recompute',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofilevector',
+            name='recomputed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewProfileContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_id', models.BigIntegerField(unique=True)),
+                ('vector_blob', models.BinaryField()),
+                ('vector_dtype', models.CharField(default='float32', max_length=10)),
+                ('embedding_dim', models.IntegerField()),
+                ('embedding_model', models.CharField(max_length=100)),
+                ('weight', models.FloatField(default=1.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_contributions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
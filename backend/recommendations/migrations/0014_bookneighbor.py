@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0013_alter_externalcategorymapping_external_cid_and_more'),
+        ('recommendations', '0013_userbookexclusion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='books.book')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='books.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['book', 'rank'], name='idx_book_neighbor_rank'), models.Index(fields=['neighbor'], name='idx_book_neighbor_reverse')],
+                'constraints': [models.UniqueConstraint(fields=('book', 'neighbor'), name='uq_book_neighbor_pair')],
+            },
+        ),
+    ]
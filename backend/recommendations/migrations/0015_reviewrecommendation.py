@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0014_bookneighbor'),
+        ('reviews', '0002_alter_review_book_alter_review_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vectorjob',
+            name='kind',
+            field=models.CharField(choices=[('book_vector_build', '책 벡터 생성'), ('review_vector_update', '리뷰 기반 벡터 갱신'), ('book_review_rebuild', '리뷰 기반 책 벡터 재생성'), ('review_recommendation', '리뷰 추천 결과 계산')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='ReviewRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField(default=dict)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('index_version', models.CharField(max_length=64)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation', to='reviews.review')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0015_reviewrecommendation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vectorjob',
+            name='kind',
+            field=models.CharField(choices=[('book_vector_build', '책 벡터 생성'), ('review_vector_update', '리뷰 기반 벡터 갱신'), ('book_review_rebuild', '리뷰 기반 책 벡터 재생성'), ('review_recommendation', '리뷰 추천 결과 계산'), ('vector_snapshot_build', '책 벡터 스냅샷 생성')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0016_alter_vectorjob_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vectorjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
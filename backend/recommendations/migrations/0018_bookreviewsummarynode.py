@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 21:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0013_alter_externalcategorymapping_external_cid_and_more'),
+        ('recommendations', '0017_vectorjob_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookReviewSummaryNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField(default=0)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('review_ids', models.JSONField(blank=True, default=list)),
+                ('fingerprint', models.CharField(blank=True, default='', max_length=64)),
+                ('summary', models.TextField(blank=True, default='')),
+                ('sentiment', models.CharField(blank=True, default='', max_length=20)),
+                ('keywords', models.TextField(blank=True, default='')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_summary_nodes', to='books.book')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('book', 'level', 'position'), name='uq_review_summary_node')],
+            },
+        ),
+    ]
@@ -1,30 +1,123 @@
+import numpy as np
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from books.models import Book
 
-class UserProfileVector(models.Model):
+from .vector_codec import DEFAULT_DTYPE, decode_json_vector, decode_vector, encode_vector
+
+
+class BinaryVectorMixin:
+    """
+    vector_blob(float32/float16 바이트) 읽기/쓰기 헬퍼.
+    embedding_dim / embedding_model 검증을 함께 수행한다.
+    """
+
+    def get_vector_array(self, embedding_model: str | None = None):
+        # 다른 모델로 만든 벡터는 같은 공간에서 비교할 수 없으므로 반환하지 않는다.
+        if embedding_model and self.embedding_model and self.embedding_model != embedding_model:
+            return None
+
+        if self.vector_blob is not None:
+            return decode_vector(self.vector_blob, self.vector_dtype, self.embedding_dim)
+
+        # 아직 변환되지 않은 JSON 행 호환
+        values = decode_json_vector(self.vector)
+        if values is None:
+            return None
+        if self.embedding_dim and len(values) != self.embedding_dim:
+            return None
+        return decode_vector(encode_vector(values), DEFAULT_DTYPE)
+
+    def set_vector_array(self, vector, embedding_model: str | None = None, dtype: str | None = None) -> None:
+        dtype = dtype or getattr(settings, "VECTOR_STORAGE_DTYPE", DEFAULT_DTYPE)
+        blob = encode_vector(vector, dtype)
+        self.vector_blob = blob
+        self.vector_dtype = dtype
+        self.vector = ""
+        self.embedding_dim = len(blob) // np.dtype(dtype).itemsize
+        if embedding_model:
+            self.embedding_model = embedding_model
+
+
+class UserProfileVector(BinaryVectorMixin, models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="profile_vector",
     )
-    vector = models.TextField()  # 문자열 리스트
+    vector = models.TextField(blank=True, default="")  # (legacy) JSON 문자열 리스트
+
+    # float32 / float16 원시 바이트로 저장한 벡터.
+    vector_blob = models.BinaryField(null=True, blank=True)
+    vector_dtype = models.CharField(max_length=10, default=DEFAULT_DTYPE)
+
+    embedding_model = models.CharField(max_length=100, blank=True, default="")
+    embedding_dim = models.IntegerField(null=True, blank=True)
+
+    # 리뷰 임베딩의 가중 합(float64 바이트)과 가중치 합 / 리뷰 수.
+    # vector_blob은 sum / weight_total (= 가중 평균)으로 항상 함께 갱신된다.
+    sum_blob = models.BinaryField(null=True, blank=True)
+    weight_total = models.FloatField(default=0.0)
+    review_count = models.PositiveIntegerField(default=0)
+
+    # compare-and-swap 용 버전 (갱신할 때마다 +1)
+    version = models.PositiveIntegerField(default=0)
+    # 마지막 정확 재계산 이후 증분 갱신 횟수 (부동소수 누적 오차 관리)
+    updates_since_recompute = models.PositiveIntegerField(default=0)
+    recomputed_at = models.DateTimeField(null=True, blank=True)
+
     updated_at = models.DateTimeField(auto_now=True)
 
+    def get_sum_array(self):
+        return decode_vector(self.sum_blob, "float64", self.embedding_dim)
+
     def __str__(self):
         return f"profile_vector:{self.user_id}"
 
 
-class BookVector(models.Model):
+class ReviewProfileContribution(models.Model):
+    """
+    리뷰 하나가 사용자 프로필 벡터 합계에 더한 값.
+    리뷰가 수정 / 삭제되면 이 값을 빼고(새 값을 더해) 프로필을 O(dim)으로 고친다.
+    리뷰가 삭제된 뒤에도 빼야 하므로 Review FK가 아니라 id만 저장한다.
+    """
+    review_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="profile_contributions",
+    )
+    vector_blob = models.BinaryField()
+    vector_dtype = models.CharField(max_length=10, default=DEFAULT_DTYPE)
+    embedding_dim = models.IntegerField()
+    embedding_model = models.CharField(max_length=100)
+    weight = models.FloatField(default=1.0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def get_vector_array(self):
+        return decode_vector(self.vector_blob, self.vector_dtype, self.embedding_dim)
+
+    def __str__(self):
+        return f"profile_contribution:{self.user_id}:{self.review_id}"
+
+
+class BookVector(BinaryVectorMixin, models.Model):
     book = models.OneToOneField(
         Book,
         on_delete=models.CASCADE,
         related_name="vector",
     )
 
+    # (legacy) JSON 문자열로 list[float] 직렬화해서 저장하던 필드.
+    # 바이너리 마이그레이션 이후에는 빈 문자열로 남는다.
+    vector = models.TextField(blank=True, default="")
+
     # 실제 임베딩 벡터 저장용.
-    # JSON 문자열로 list[float] 직렬화해서 저장.
-    vector = models.TextField()  # JSON string of list[float]
+    # float32(기본) 또는 float16 원시 바이트. get_vector_array()로 복사 없이 ndarray로 읽는다.
+    vector_blob = models.BinaryField(null=True, blank=True)
+    vector_dtype = models.CharField(max_length=10, default=DEFAULT_DTYPE)
 
     # 어떤 임베딩 모델로 만든 벡터인지 기록 (예: gms-openai::text-embedding-3-large).
     # 나중에 모델이 여러 개일 때 구분/검증용.
@@ -34,9 +127,353 @@ class BookVector(models.Model):
     # 모델별 차원 확인 및 검증용.
     embedding_dim = models.IntegerField(null=True, blank=True)
 
+    # 벡터를 만든 요약 텍스트 (Chroma document와 동일).
+    # 인메모리 검색 백엔드에서 Chroma 없이 키워드 추출용 문서를 얻기 위해 저장.
+    summary = models.TextField(blank=True, default="")
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"book_vector:{self.book_id}"
+
+
+class EmbeddingCache(models.Model):
+    """
+    (provider_model_key, sha256(정규화 텍스트)) -> 임베딩 벡터 영구 캐시.
+    같은 텍스트를 다시 임베딩하지 않도록 모든 make_embeddings 호출 경로가 공유한다.
+    """
+    provider_model = models.CharField(max_length=100)
+    text_hash = models.CharField(max_length=64)
+
+    vector_blob = models.BinaryField()
+    vector_dtype = models.CharField(max_length=10, default=DEFAULT_DTYPE)
+    embedding_dim = models.IntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider_model", "text_hash"],
+                name="uq_embedding_cache_model_hash",
+            )
+        ]
+
+    def get_vector_array(self):
+        return decode_vector(self.vector_blob, self.vector_dtype, self.embedding_dim)
+
+    def __str__(self):
+        return f"embedding_cache:{self.provider_model}:{self.text_hash[:12]}"
+
+
+class VectorJob(models.Model):
+    """
+    벡터 생성/갱신 백그라운드 작업 큐 (DB 기반).
+    서버가 재시작되어도 대기 중인 작업이 남고, 같은 키(ISBN 등)의 작업은 하나로 합쳐진다.
+    """
+
+    class Kind(models.TextChoices):
+        BOOK_VECTOR_BUILD = "book_vector_build", "책 벡터 생성"
+        REVIEW_VECTOR_UPDATE = "review_vector_update", "리뷰 기반 벡터 갱신"
+        BOOK_REVIEW_REBUILD = "book_review_rebuild", "리뷰 기반 책 벡터 재생성"
+        REVIEW_RECOMMENDATION = "review_recommendation", "리뷰 추천 결과 계산"
+        VECTOR_SNAPSHOT_BUILD = "vector_snapshot_build", "책 벡터 스냅샷 생성"
+        BOOK_NEIGHBOR_UPDATE = "book_neighbor_update", "비슷한 책 목록 갱신"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "대기"
+        RUNNING = "running", "실행 중"
+        DONE = "done", "완료"
+        FAILED = "failed", "실패"
+
+    kind = models.CharField(max_length=50, choices=Kind.choices)
+    dedup_key = models.CharField(max_length=100) # 예: ISBN, review id
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    priority = models.IntegerField(default=0) # 클수록 먼저 실행
+    payload = models.JSONField(default=dict, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    # 대기 중에 같은 키로 들어온 요청이 합쳐진 횟수
+    merged_count = models.PositiveIntegerField(default=0)
+    # 단계별 소요 시간(초) 예: {"crawl": 12.3, "summarize": 4.1, "embed": 0.8}
+    stage_timings = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    worker = models.CharField(max_length=100, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # 실행 중 워커가 주기적으로 갱신 (lease). 오래 갱신되지 않으면 워커가 죽은 것으로 보고 다시 대기열로 돌린다.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "dedup_key"],
+                condition=models.Q(status="queued"), # 대기 중인 작업은 키당 하나만
+                name="uq_vector_job_queued_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="idx_vector_job_status_run"),
+        ]
+
+    def __str__(self):
+        return f"vector_job:{self.kind}:{self.dedup_key}:{self.status}"
+
+
+class ExternalProductId(models.Model):
+    """
+    (provider, ISBN) -> 외부 서점 상품 id 매핑 캐시.
+    알라딘 ItemId / 교보 productId는 바뀌지 않으므로 한 번 찾으면 검색 페이지를 다시 요청하지 않는다.
+    찾지 못한 결과(external_id="")도 저장하되 expires_at 이후에는 다시 조회한다.
+    """
+
+    class Provider(models.TextChoices):
+        ALADIN = "aladin", "알라딘"
+        KYOBO = "kyobo", "교보문고"
+
+    provider = models.CharField(max_length=20, choices=Provider.choices)
+    isbn = models.CharField(max_length=20)
+    external_id = models.CharField(max_length=50, blank=True, default="") # 빈 값 = 검색 결과 없음
+    expires_at = models.DateTimeField(null=True, blank=True) # 음수 결과만 사용 (양수 결과는 만료 없음)
+    checked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "isbn"],
+                name="uq_external_product_id_provider_isbn",
+            )
+        ]
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= timezone.now()
+
+    def __str__(self):
+        return f"external_product_id:{self.provider}:{self.isbn}:{self.external_id or '-'}"
+
+
+class CrawledReview(models.Model):
+    """
+    외부 서점에서 수집한 리뷰 / 책 소개 원문 저장소.
+    (source, ISBN, 본문 해시) 단위로 한 번만 저장하고 다시 보일 때는 last_seen_at만 갱신한다.
+    """
+    isbn = models.CharField(max_length=20)
+    source = models.CharField(max_length=50) # 예: aladin_short, kyobo_review, kyobo_publisher_review
+    content_hash = models.CharField(max_length=64) # sha256(정규화한 review_text)
+
+    review_text = models.TextField()
+    rating = models.FloatField(null=True, blank=True)
+    review_date = models.CharField(max_length=50, blank=True, default="")
+    blog_url = models.TextField(blank=True, default="")
+
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "isbn", "content_hash"],
+                name="uq_crawled_review_source_isbn_hash",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["isbn", "source"], name="idx_crawled_review_isbn_src"),
+        ]
+
+    def __str__(self):
+        return f"crawled_review:{self.source}:{self.isbn}:{self.content_hash[:12]}"
+
+
+class BookCrawlState(models.Model):
+    """
+    책별 크롤링 입력 집합의 digest.
+    input_digest가 마지막으로 벡터를 만든 built_digest와 같으면 요약 / 임베딩을 다시 하지 않는다.
+    """
+    isbn = models.CharField(max_length=20, unique=True)
+
+    input_digest = models.CharField(max_length=64, blank=True, default="")
+    input_count = models.PositiveIntegerField(default=0)
+    checked_at = models.DateTimeField(auto_now=True) # 마지막 크롤링 시각
+    changed_at = models.DateTimeField(null=True, blank=True) # input_digest가 마지막으로 바뀐 시각
+
+    # 마지막으로 책 벡터를 만든 입력 digest / 그때 저장한 요약문 해시
+    # (사용자 리뷰 파이프라인이 요약을 덮어썼다면 해시가 달라지므로 다시 만든다)
+    built_digest = models.CharField(max_length=64, blank=True, default="")
+    built_summary_hash = models.CharField(max_length=64, blank=True, default="")
+    built_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.input_digest != self.built_digest
+
+    def __str__(self):
+        return f"book_crawl_state:{self.isbn}"
+
+
+class LLMResponseCache(models.Model):
+    """
+    (모델, 프롬프트 해시) -> LLM 응답 영구 캐시.
+    같은 입력으로 다시 요약 / 키워드 추출 / 추천 사유를 만들 때 API를 호출하지 않는다.
+    """
+    model = models.CharField(max_length=100)
+    prompt_hash = models.CharField(max_length=64) # sha256(model + messages + temperature + response_format)
+
+    response_text = models.TextField()
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "prompt_hash"],
+                name="uq_llm_response_cache_model_hash",
+            )
+        ]
+
+    def __str__(self):
+        return f"llm_response_cache:{self.model}:{self.prompt_hash[:12]}"
+
+
+class BookReviewSummary(models.Model):
+    """
+    책별 커뮤니티 리뷰 누적 요약 (map-reduce).
+    BookReviewSummaryNode 트리의 루트 요약을 담는다. (책 벡터 입력)
+    """
+    book = models.OneToOneField(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="review_summary",
+    )
+    summary = models.TextField(blank=True, default="")
+    sentiment = models.CharField(max_length=20, blank=True, default="")
+    keywords = models.TextField(blank=True, default="")
+
+    # 요약에 반영된 마지막 리뷰 id / 반영된 리뷰 수
+    last_review_id = models.BigIntegerField(default=0)
+    folded_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"book_review_summary:{self.book_id}:{self.last_review_id}"
+
+
+class BookReviewSummaryNode(models.Model):
+    """
+    책별 리뷰 요약 트리의 노드.
+    level 0은 리뷰 SUMMARY_CHUNK_REVIEWS개 묶음(청크) 요약, level n은 level n-1 노드 REDUCE_FANOUT개를 합친 요약이다.
+    리뷰가 추가 / 수정 / 삭제되면 그 리뷰가 속한 청크와 그 위 노드만 다시 요약한다.
+    """
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="review_summary_nodes",
+    )
+    level = models.PositiveSmallIntegerField(default=0)
+    position = models.PositiveIntegerField(default=0)
+
+    # level 0 전용: 이 청크에 속한 리뷰 id와 (id, updated_at) 지문
+    review_ids = models.JSONField(default=list, blank=True)
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    summary = models.TextField(blank=True, default="")
+    sentiment = models.CharField(max_length=20, blank=True, default="")
+    keywords = models.TextField(blank=True, default="")
+    review_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["book", "level", "position"], name="uq_review_summary_node"),
+        ]
+
+    def __str__(self):
+        return f"book_review_summary_node:{self.book_id}:{self.level}:{self.position}"
+
+
+class UserBookExclusion(models.Model):
+    """
+    사용자별 추천 제외 도서 id 집합 (서재에 담았거나 리뷰를 쓴 책).
+    서재 / 리뷰가 바뀔 때 다시 계산해 두고, 추천 요청 시에는 이 행 하나만 읽는다.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="book_exclusion",
+    )
+    book_ids = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"user_book_exclusion:{self.user_id}:{len(self.book_ids)}"
+
+
+class BookNeighbor(models.Model):
+    """
+    책별 코사인 유사도 상위 K권 (미리 계산한 "비슷한 책" 목록).
+    전체는 build_book_neighbors 명령으로, 벡터 하나가 바뀌면 그 책과 역방향 이웃만 다시 계산한다.
+    """
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="neighbors",
+    )
+    neighbor = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    rank = models.PositiveSmallIntegerField() # 0부터 (유사도 내림차순)
+    score = models.FloatField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "neighbor"],
+                name="uq_book_neighbor_pair",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["book", "rank"], name="idx_book_neighbor_rank"),
+            models.Index(fields=["neighbor"], name="idx_book_neighbor_reverse"),
+        ]
+
+    def __str__(self):
+        return f"book_neighbor:{self.book_id}->{self.neighbor_id}:{self.rank}"
+
+
+class ReviewRecommendation(models.Model):
+    """
+    리뷰별 추천 결과(GET /api/recommendations/<review_id>/ 응답 본문) 저장소.
+    리뷰 작성 / 수정 직후 백그라운드에서 계산해 두고, 조회 시에는 그대로 돌려준다.
+    리뷰 본문 해시가 바뀌었거나, 허용 기간이 지났는데 벡터 인덱스 버전이 바뀌었으면
+    저장된 값을 먼저 주고 다시 계산한다. (stale-while-revalidate)
+    """
+    review = models.OneToOneField(
+        "reviews.Review",
+        on_delete=models.CASCADE,
+        related_name="recommendation",
+    )
+    payload = models.JSONField(default=dict)
+
+    text_hash = models.CharField(max_length=64) # sha256(정규화한 리뷰 제목 + 본문)
+    index_version = models.CharField(max_length=64) # 계산 당시 get_index_version()
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"review_recommendation:{self.review_id}:{self.index_version}"
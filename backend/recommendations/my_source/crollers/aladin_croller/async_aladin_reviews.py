@@ -0,0 +1,188 @@
+# ================================
+#  0. Library imports
+# ================================
+
+import asyncio
+import csv
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from recommendations.my_source.crollers.aladin_croller.get_reviews_from_aladin import (
+    HEADERS,
+    build_search_url,
+    build_short_review_request,
+    parse_aladin_item_id,
+    parse_short_review_page,
+)
+
+
+# ================================
+#  1. Basic config (used in main only)
+# ================================
+
+INPUT_CSV = "final_books_top204.csv"
+OUTPUT_CSV = "aladin_reviews.csv"
+MAX_PAGES = 50
+
+# 고정 sleep(1.5s) 대신 전체 요청 속도를 토큰 버킷으로 제한한다.
+REQUESTS_PER_SECOND = 4.0   # 평균 요청 속도 상한 (모든 호스트 합계)
+BURST = 4                   # 순간적으로 허용할 최대 요청 수
+PER_HOST_CONCURRENCY = 4    # 호스트별 동시 요청 수
+BOOK_CONCURRENCY = 8        # 동시에 진행할 책 수 (책 안의 페이지는 순서대로)
+
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+CSV_FIELDS = ["isbn13", "source", "review_text", "rating", "review_date", "blog_url"]
+
+
+# ================================
+#  2. Rate limit / concurrency
+# ================================
+
+class TokenBucket:
+    """초당 rate개씩 토큰이 차는 버킷. 요청 1건마다 토큰 1개를 쓴다."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PoliteFetcher:
+    """
+    호스트별 동시 요청 수 + 전체 요청 속도를 지키는 비동기 GET.
+    HTTP 호출 자체는 keep-alive 세션으로 스레드에서 실행한다. (requirements에 비동기 HTTP 클라이언트 없음)
+    """
+
+    def __init__(
+        self,
+        rate: float = REQUESTS_PER_SECOND,
+        burst: int = BURST,
+        per_host: int = PER_HOST_CONCURRENCY,
+    ):
+        self._bucket = TokenBucket(rate, burst)
+        self._per_host = per_host
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._session = requests.Session()
+        self.request_count = 0
+
+    async def get_text(self, url: str, headers: dict) -> str | None:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self._per_host))
+
+        for attempt in range(MAX_RETRIES):
+            async with limit:
+                await self._bucket.acquire()
+                self.request_count += 1
+                try:
+                    res = await asyncio.to_thread(self._session.get, url, headers=headers, timeout=10)
+                except requests.RequestException as e:
+                    print(f"request failed ({attempt + 1}/{MAX_RETRIES}): {e}")
+                    res = None
+
+            if res is not None and res.status_code == 200:
+                return res.text
+            if res is not None and res.status_code not in RETRY_STATUS_CODES:
+                return None
+            if attempt < MAX_RETRIES - 1: # 마지막 시도 뒤에는 기다리지 않는다.
+                await asyncio.sleep(2 ** attempt)
+        return None
+
+    def close(self) -> None:
+        self._session.close()
+
+
+# ================================
+#  3. Per-book crawl
+# ================================
+
+async def crawl_book_async(fetcher: PoliteFetcher, isbn: str, max_pages: int, on_reviews) -> int:
+    html = await fetcher.get_text(build_search_url(isbn), HEADERS)
+    item_id = parse_aladin_item_id(html) if html else None
+    if not item_id:
+        print(f"itemId not found -> skip ({isbn})")
+        return 0
+
+    total = 0
+    for page in range(1, max_pages + 1):
+        url, headers = build_short_review_request(item_id, page)
+        html = await fetcher.get_text(url, headers)
+        if html is None:
+            break
+
+        reviews, li_count = parse_short_review_page(html, isbn)
+        if not li_count:
+            break
+        on_reviews(reviews) # 페이지가 도착하는 대로 바로 기록
+        total += len(reviews)
+    return total
+
+
+async def crawl_many_async(isbns: list[str], output_csv: str, max_pages: int = MAX_PAGES) -> dict:
+    fetcher = PoliteFetcher()
+    book_limit = asyncio.Semaphore(BOOK_CONCURRENCY)
+    stats = {"books": len(isbns), "reviews": 0, "requests": 0}
+
+    with open(output_csv, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+        # 이벤트 루프 스레드에서만 호출되므로 별도 잠금이 필요 없다.
+        def write_reviews(reviews: list[dict]) -> None:
+            writer.writerows(reviews)
+            f.flush()
+            stats["reviews"] += len(reviews)
+
+        async def run(isbn: str) -> None:
+            async with book_limit:
+                try:
+                    count = await crawl_book_async(fetcher, isbn, max_pages, write_reviews)
+                    print(f"{isbn}: short reviews {count}")
+                except Exception as e:
+                    print(f"{isbn}: failed: {e}")
+
+        try:
+            await asyncio.gather(*(run(isbn) for isbn in isbns))
+        finally:
+            fetcher.close()
+
+    stats["requests"] = fetcher.request_count
+    return stats
+
+
+# ================================
+#  4. Batch runner
+# ================================
+
+def main() -> None:
+    import pandas as pd
+
+    books_df = pd.read_csv(INPUT_CSV, dtype={"isbn13": str})
+    isbns = [str(isbn).strip() for isbn in books_df["isbn13"].dropna()]
+    print(f"Loaded {len(isbns)} books")
+
+    started = time.perf_counter()
+    stats = asyncio.run(crawl_many_async(isbns, OUTPUT_CSV))
+    elapsed = time.perf_counter() - started
+
+    print(f"Saved: {OUTPUT_CSV} {stats} elapsed={elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@
 import time
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 
 # ================================
@@ -19,18 +19,37 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0",
 }
 
+# lxml(requirements.txt)로 파싱한다. 단독 스크립트 환경에 없으면 내장 파서로 대체한다.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 # ================================
 #  2. ISBN -> Aladin itemId
 # ================================
 
+# 반환값 None은 "검색 결과 페이지를 정상으로 받았지만 상품이 없음"일 때만이다.
+# 429 / 5xx 응답이나 검색 결과 페이지가 아닌 응답(차단 / 오류 페이지)은 예외를 던진다. (결과 없음으로 캐시되지 않도록)
 def get_aladin_item_id(isbn: str) -> str | None:
-    search_url = (
+    res = requests.get(build_search_url(isbn), headers=HEADERS, timeout=10)
+    res.raise_for_status()
+    if isbn not in res.text: # 정상 검색 결과 페이지는 검색어를 그대로 담고 있다.
+        raise requests.RequestException(f"unexpected aladin search response isbn={isbn}")
+    return parse_aladin_item_id(res.text)
+
+
+def build_search_url(isbn: str) -> str:
+    return (
         "https://www.aladin.co.kr/search/wsearchresult.aspx"
         f"?SearchTarget=Book&SearchWord={isbn}"
     )
-    res = requests.get(search_url, headers=HEADERS, timeout=10)
-    soup = BeautifulSoup(res.text, "html.parser")
+
+
+def parse_aladin_item_id(html: str) -> str | None:
+    soup = BeautifulSoup(html, "html.parser")
 
     book_boxes = soup.select("div.ss_book_box")
     if not book_boxes:
@@ -50,85 +69,107 @@ def get_aladin_item_id(isbn: str) -> str | None:
 #  3. Short review crawl
 # ================================
 
+# 200이 아닌 응답은 예외를 던진다. (차단 / 오류를 "리뷰 없음"으로 저장하지 않도록)
 def crawl_short_reviews(item_id: str, isbn: str, max_pages: int = 1) -> list[dict]:
     reviews = []
 
     for page in range(1, max_pages + 1):
-        url = (
-            "https://www.aladin.co.kr/ucl/shop/product/ajax/GetCommunityListAjax.aspx"
-            f"?ProductItemId={item_id}"
-            f"&itemId={item_id}"
-            "&pageCount=10"
-            "&communitytype=CommentReview"
-            "&nemoType=-1"
-            f"&page={page}"
-            "&startNumber=1"
-            "&endNumber=10"
-            "&sort=2"
-            "&IsOrderer=1"
-            "&BranchType=1"
-            "&IsAjax=true"
-            "&pageType=0"
-        )
-
-        headers = {
-            "User-Agent": "Mozilla/5.0",
-            "Referer": f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={item_id}",
-            "X-Requested-With": "XMLHttpRequest",
-        }
+        url, headers = build_short_review_request(item_id, page)
         res = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
+        res.raise_for_status()
 
-        li_blocks = soup.select("li")
-        if not li_blocks:
+        page_reviews, li_count = parse_short_review_page(res.text, isbn)
+        if not li_count:
             print("short review ajax empty -> stop")
             break
+        reviews.extend(page_reviews)
 
-        for i in range(0, len(li_blocks), 2):
-            try:
-                content_li = li_blocks[i]
-                meta_li = li_blocks[i + 1]
-
-                text_tag = content_li.select_one(
-                    "span[id^='spnPaper']:not([id*='Spoiler'])"
-                )
-                review_text = text_tag.text.strip() if text_tag else None
-
-                blog_tag = content_li.select_one("a[href*='blog.aladin.co.kr']")
-                blog_url = blog_tag["href"] if blog_tag else None
-
-                hundred_box = content_li.find_parent("div", class_="hundred_list")
-                rating = None
-                if hundred_box:
-                    star_tag = hundred_box.select_one("div.HL_star")
-                    if star_tag:
-                        star_imgs = star_tag.find_all("img")
-                        star_on_count = sum(
-                            1 for img in star_imgs
-                            if "icon_star_on" in img.get("src", "")
-                        )
-                        rating = star_on_count * 2
-
-                date_tag = meta_li.select_one("div.left span")
-                review_date = date_tag.text.strip() if date_tag else None
-
-                if review_text:
-                    reviews.append({
-                        "isbn13": isbn,
-                        "source": "aladin_short",
-                        "review_text": review_text,
-                        "rating": rating,
-                        "review_date": review_date,
-                        "blog_url": blog_url,
-                    })
-            except IndexError:
-                continue
-
-        time.sleep(1.5)
+        # 다음 페이지를 요청할 때만 쉰다. (마지막 페이지 뒤에는 대기하지 않음)
+        if page < max_pages:
+            time.sleep(1.5)
 
     return reviews
 
 
+def build_short_review_request(item_id: str, page: int) -> tuple[str, dict]:
+    url = (
+        "https://www.aladin.co.kr/ucl/shop/product/ajax/GetCommunityListAjax.aspx"
+        f"?ProductItemId={item_id}"
+        f"&itemId={item_id}"
+        "&pageCount=10"
+        "&communitytype=CommentReview"
+        "&nemoType=-1"
+        f"&page={page}"
+        "&startNumber=1"
+        "&endNumber=10"
+        "&sort=2"
+        "&IsOrderer=1"
+        "&BranchType=1"
+        "&IsAjax=true"
+        "&pageType=0"
+    )
+    headers = {
+        "User-Agent": "Mozilla/5.0",
+        "Referer": f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={item_id}",
+        "X-Requested-With": "XMLHttpRequest",
+    }
+    return url, headers
+
+
+# 응답 전체를 트리로 만들지 않고 리뷰 블록(div.hundred_list 안의 li)만 파싱한다.
+    # - 별점(div.HL_star)이 li의 부모 div에 있으므로 div.hundred_list 단위로 남긴다.
+    # - 레이아웃이 달라 hundred_list가 없으면 li만 남겨 다시 파싱한다. (별점 없음)
+def parse_short_review_page(html: str, isbn: str) -> tuple[list[dict], int]:
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("div", attrs={"class": "hundred_list"}))
+    li_blocks = soup.find_all("li")
+    if not li_blocks:
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("li"))
+        li_blocks = soup.find_all("li")
+
+    reviews = []
+    for i in range(0, len(li_blocks), 2):
+        try:
+            content_li = li_blocks[i]
+            meta_li = li_blocks[i + 1]
+
+            text_tag = content_li.select_one(
+                "span[id^='spnPaper']:not([id*='Spoiler'])"
+            )
+            review_text = text_tag.text.strip() if text_tag else None
+
+            blog_tag = content_li.select_one("a[href*='blog.aladin.co.kr']")
+            blog_url = blog_tag["href"] if blog_tag else None
+
+            hundred_box = content_li.find_parent("div", class_="hundred_list")
+            rating = None
+            if hundred_box:
+                star_tag = hundred_box.select_one("div.HL_star")
+                if star_tag:
+                    star_imgs = star_tag.find_all("img")
+                    star_on_count = sum(
+                        1 for img in star_imgs
+                        if "icon_star_on" in img.get("src", "")
+                    )
+                    rating = star_on_count * 2
+
+            date_tag = meta_li.select_one("div.left span")
+            review_date = date_tag.text.strip() if date_tag else None
+
+            if review_text:
+                reviews.append({
+                    "isbn13": isbn,
+                    "source": "aladin_short",
+                    "review_text": review_text,
+                    "rating": rating,
+                    "review_date": review_date,
+                    "blog_url": blog_url,
+                })
+        except IndexError:
+            continue
+
+    return reviews, len(li_blocks)
+
+
 # ================================
 #  4. Batch runner
 # ================================
@@ -146,12 +187,20 @@ def main() -> None:
         title = row["title"]
 
         print(f"\nCrawling: {title} ({isbn})")
-        item_id = get_aladin_item_id(isbn)
+        try:
+            item_id = get_aladin_item_id(isbn)
+        except requests.RequestException as e:
+            print(f"itemId lookup failed -> skip ({e})")
+            continue
         if not item_id:
             print("itemId not found -> skip")
             continue
 
-        short_reviews = crawl_short_reviews(item_id, isbn, max_pages=50)
+        try:
+            short_reviews = crawl_short_reviews(item_id, isbn, max_pages=50)
+        except requests.RequestException as e:
+            print(f"short review request failed -> skip ({e})")
+            continue
         print(f"short reviews: {len(short_reviews)}")
         all_reviews.extend(short_reviews)
         time.sleep(1)
@@ -0,0 +1,249 @@
+# ================================
+#  0. Library imports
+# ================================
+
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+
+# ================================
+#  1. Basic config
+# ================================
+
+DEFAULT_POOL_SIZE = 2        # 동시에 띄울 수 있는 Chrome 수 (= 동시 크롤링 상한)
+DEFAULT_MAX_PAGES = 50       # 드라이버 하나로 처리할 최대 페이지 수 (메모리 누수 방지용 재생성 주기)
+DEFAULT_CHECKOUT_TIMEOUT = 120
+PAGE_LOAD_TIMEOUT = 30       # driver.get 최대 대기 (eager 기준: DOM 파싱 완료까지)
+
+# 크롤러는 텍스트만 읽는다. 이미지 / CSS / 폰트 / 미디어는 받지 않는다.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.css",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+
+
+# ================================
+#  2. Chrome driver binary (resolve once)
+# ================================
+
+# ChromeDriverManager().install()은 호출할 때마다 버전 확인 / 캐시 탐색을 한다.
+# 프로세스에서 한 번만 경로를 구해 재사용한다.
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_chromedriver_path() -> str:
+    global _driver_path
+    if _driver_path:
+        return _driver_path
+    with _driver_path_lock:
+        if not _driver_path:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+def make_chrome_options():
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("user-agent=Mozilla/5.0")
+
+    # load 이벤트(이미지 / 광고 스크립트까지)를 기다리지 않고 DOM이 준비되면 바로 반환
+    options.page_load_strategy = "eager"
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+    })
+    return options
+
+
+def create_chrome_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    driver = webdriver.Chrome(
+        service=Service(get_chromedriver_path()),
+        options=make_chrome_options(),
+    )
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    # prefs로 막히지 않는 CSS / 폰트 / 미디어 요청은 네트워크 단에서 차단
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception:
+        pass
+    return driver
+
+
+# ================================
+#  2-1. Explicit waits
+# ================================
+
+# 고정 sleep 대신 필요한 요소가 나타날 때까지만 기다린다.
+def wait_for_selector(driver, css_selector: str, timeout: float) -> bool:
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    if timeout <= 0:
+        return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+# 여러 선택자 중 하나라도 나타나면 바로 끝낸다. (목록 항목 / 빈 목록 표시처럼 결과가 둘 중 하나인 경우)
+def wait_for_any(driver, css_selectors, timeout: float) -> bool:
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    if timeout <= 0 or not css_selectors:
+        return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            EC.any_of(*(EC.presence_of_element_located((By.CSS_SELECTOR, sel)) for sel in css_selectors))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+# ================================
+#  3. Browser pool
+# ================================
+
+class BrowserPool:
+    """
+    오래 살아 있는 headless Chrome 드라이버 풀.
+
+    with pool.driver() as driver:
+        driver.get(url)
+        ...
+
+    - 동시에 사용 중인 드라이버는 최대 size 개 (나머지는 대기)
+    - max_pages 만큼 사용했거나 사용 중 예외가 나면 해당 드라이버는 종료하고 다음에 새로 만든다.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_pages: int = DEFAULT_MAX_PAGES, factory=None):
+        self.size = size
+        self.max_pages = max_pages
+        self._factory = factory or create_chrome_driver
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._page_counts: dict[int, int] = {}
+        self._closed = False
+
+    @contextmanager
+    def driver(self, timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        driver = self.checkout(timeout=timeout)
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self.checkin(driver, healthy=healthy)
+
+    def checkout(self, timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        if self._closed:
+            raise RuntimeError("browser pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("no browser available in pool")
+        try:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._factory()
+                with self._lock:
+                    self._page_counts[id(driver)] = 0
+                return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, driver, healthy: bool = True) -> None:
+        try:
+            with self._lock:
+                used = self._page_counts.get(id(driver), 0) + 1
+                self._page_counts[id(driver)] = used
+
+            if self._closed or not healthy or used >= self.max_pages:
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+# ================================
+#  4. Process-wide pool
+# ================================
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_config = {"size": DEFAULT_POOL_SIZE, "max_pages": DEFAULT_MAX_PAGES}
+
+
+def configure_browser_pool(size: int | None = None, max_pages: int | None = None) -> None:
+    # 풀이 만들어지기 전에 호출해야 적용된다. (웹 프로세스: RecommendationsConfig.ready, 배치: main 시작 시점)
+    if size:
+        _pool_config["size"] = size
+    if max_pages:
+        _pool_config["max_pages"] = max_pages
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(**_pool_config)
+    return _pool
+
+
+def close_browser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_browser_pool)
@@ -0,0 +1,138 @@
+# ================================
+#  0. Library imports
+# ================================
+
+import os
+import sys
+import time
+
+import requests
+
+# 폴더에서 직접 실행(python get_kyobo_detail_page.py)해도 패키지 경로 import가 되도록 backend 디렉터리를 sys.path에 추가한다.
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")))
+
+from recommendations.my_source.crollers.browser_pool import (
+    close_browser_pool,
+    get_browser_pool,
+    wait_for_any,
+    wait_for_selector,
+)
+from recommendations.my_source.crollers.kyobo_crollers.get_reviews_from_kyobo import (
+    extract_kyobo_reviews,
+    get_kyobo_product_id,
+)
+from recommendations.my_source.crollers.kyobo_crollers.get_kyobo_publisher_review import (
+    extract_kyobo_descriptions,
+)
+
+
+# ================================
+#  1. Basic config (used in main only)
+# ================================
+
+INPUT_CSV = "final_books_top204.csv"
+OUTPUT_CSV = "final_kyobo_detail_page.csv"
+
+# 상세 페이지 요소 대기 예산 (책 소개 + 리뷰 대기 합계)
+WAIT_BUDGET_SECONDS = 10
+# 리뷰 영역이 그려졌는지 판단하는 선택자 (리뷰 항목 / 리뷰가 없을 때의 빈 목록 표시)
+    # - 리뷰가 없는 책도 빈 목록 표시가 뜨는 즉시 대기를 끝낸다.
+REVIEW_READY_SELECTORS = ("div.comment_item", "div.comment_list .no_data")
+# 둘 다 나타나지 않는 경우(레이아웃 변경 등)의 리뷰 대기 상한
+REVIEW_WAIT_SECONDS = 5
+
+
+# ================================
+#  2. Kyobo detail page crawl (reviews + descriptions in one pass)
+# ================================
+
+# 리뷰 크롤러와 책 소개 크롤러는 같은 상세 페이지(product.kyobobook.co.kr/detail/{product_id})를 연다.
+# 브라우저 실행 / 페이지 로드 / 대기를 한 번만 하고 두 종류를 함께 추출한다.
+# 상세 페이지가 뜨지 않으면(차단 / 오류 페이지) 빈 결과 대신 RuntimeError를 던진다.
+def crawl_kyobo_detail_page(product_id: str, isbn: str) -> dict:
+    result = {"reviews": [], "descriptions": []}
+
+    # 풀에서 드라이버를 빌려 쓰고 돌려준다. (Chrome 재실행 / 드라이버 설치 확인 없음)
+    with get_browser_pool().driver() as driver:
+        driver.get(f"https://product.kyobobook.co.kr/detail/{product_id}")
+        deadline = time.monotonic() + WAIT_BUDGET_SECONDS
+
+        # 책 소개 섹션(페이지 70% 지점)을 지나 리뷰 영역(하단)까지 스크롤
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
+        if not wait_for_selector(driver, "div.product_detail_area", deadline - time.monotonic()):
+            raise RuntimeError(f"kyobo detail page not loaded product_id={product_id}")
+
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_any(
+            driver,
+            REVIEW_READY_SELECTORS,
+            min(REVIEW_WAIT_SECONDS, deadline - time.monotonic()),
+        )
+
+        result["descriptions"] = extract_kyobo_descriptions(driver, isbn)
+        result["reviews"] = extract_kyobo_reviews(driver, isbn)
+
+    return result
+
+
+# ISBN -> productId 조회도 한 번만 한다.
+def crawl_kyobo_by_isbn(isbn: str) -> dict:
+    product_id = get_kyobo_product_id(isbn)
+    if not product_id:
+        return {"reviews": [], "descriptions": []}
+    return crawl_kyobo_detail_page(product_id, isbn)
+
+
+# ================================
+#  3. Batch runner
+# ================================
+
+
+def main() -> None:
+    import pandas as pd
+    from tqdm import tqdm
+
+    books_df = pd.read_csv(INPUT_CSV)
+    print(f"Loaded {len(books_df)} books")
+
+    all_rows = []
+    for _, row in tqdm(books_df.iterrows(), total=len(books_df)):
+        isbn = str(row["isbn13"]).strip()
+        title = row["title"]
+
+        print(f"\nCrawling: {title} ({isbn})")
+
+        try:
+            product_id = get_kyobo_product_id(isbn)
+        except requests.RequestException as e:
+            print(f"productId lookup failed -> skip ({e})")
+            continue
+        if not product_id:
+            print("productId not found -> skip")
+            continue
+
+        try:
+            page = crawl_kyobo_detail_page(product_id, isbn)
+        except RuntimeError as e:
+            print(f"detail page failed -> skip ({e})")
+            continue
+        print(f"reviews: {len(page['reviews'])} descriptions: {len(page['descriptions'])}")
+
+        all_rows.extend(page["reviews"])
+        all_rows.extend(page["descriptions"])
+        time.sleep(1)
+
+    rows_df = pd.DataFrame(all_rows)
+    rows_df.to_csv(
+        OUTPUT_CSV,
+        index=False,
+        encoding="utf-8-sig",
+    )
+
+    close_browser_pool()
+    print(f"Saved: {OUTPUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,23 @@
 #  0. Library imports
 # ================================
 
+import os
 import re
+import sys
 import time
 
 import requests
 
+# 폴더에서 직접 실행(python get_kyobo_publisher_review.py)해도 패키지 경로 import가 되도록 backend 디렉터리를 sys.path에 추가한다.
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")))
+
+from recommendations.my_source.crollers.browser_pool import (
+    close_browser_pool,
+    get_browser_pool,
+    wait_for_selector,
+)
+
 
 # ================================
 #  1. Basic config (used in main only)
@@ -15,6 +27,9 @@ import requests
 INPUT_CSV = "../final_books_top204.csv"
 OUTPUT_CSV = "final_kyobo_publisher_reviews.csv"
 
+# 상세 페이지 요소 대기 예산 (고정 sleep 대신 요소가 나타나는 즉시 진행)
+WAIT_BUDGET_SECONDS = 10
+
 
 # ================================
 #  2. ISBN -> Kyobo productId
@@ -49,34 +64,29 @@ def get_kyobo_product_id(isbn: str) -> str | None:
 
 
 def crawl_kyobo_book_descriptions(product_id: str, isbn: str) -> list[dict]:
-    results = []
-
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.service import Service
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.chrome.options import Options
-        from webdriver_manager.chrome import ChromeDriverManager
+        import selenium  # noqa: F401
     except Exception:
-        return results
+        return []
 
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("user-agent=Mozilla/5.0")
+    # 풀에서 드라이버를 빌려 쓰고 돌려준다. (Chrome 재실행 / 드라이버 설치 확인 없음)
+    with get_browser_pool().driver() as driver:
+        driver.get(f"https://product.kyobobook.co.kr/detail/{product_id}")
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options,
-    )
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
+        wait_for_selector(driver, "div.product_detail_area", WAIT_BUDGET_SECONDS)
 
-    driver.get(f"https://product.kyobobook.co.kr/detail/{product_id}")
-    time.sleep(3)
+        results = extract_kyobo_descriptions(driver, isbn)
 
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-    time.sleep(2)
+    return results
+
+
+# 상세 페이지가 이미 열린 driver에서 책 소개 / 출판사 서평 / 추천사 섹션만 추출한다.
+    # - 통합 크롤러(get_kyobo_detail_page)와 공유
+def extract_kyobo_descriptions(driver, isbn: str) -> list[dict]:
+    from selenium.webdriver.common.by import By
 
+    results = []
     target_sections = {
         "book_contents": "kyobo_book_contents",
         "book_publish_review": "kyobo_publisher_review",
@@ -105,7 +115,6 @@ def crawl_kyobo_book_descriptions(product_id: str, isbn: str) -> list[dict]:
         except Exception:
             continue
 
-    driver.quit()
     return results
 
 
@@ -128,7 +137,11 @@ def main() -> None:
 
         print(f"\nCrawling: {title} ({isbn})")
 
-        product_id = get_kyobo_product_id(isbn)
+        try:
+            product_id = get_kyobo_product_id(isbn)
+        except requests.RequestException as e:
+            print(f"productId lookup failed -> skip ({e})")
+            continue
         if not product_id:
             print("productId not found -> skip")
             continue
@@ -146,6 +159,7 @@ def main() -> None:
         encoding="utf-8-sig",
     )
 
+    close_browser_pool()
     print(f"Saved: {OUTPUT_CSV}")
 
 
@@ -2,11 +2,23 @@
 #  0. Library imports
 # ================================
 
+import os
 import re
+import sys
 import time
 
 import requests
 
+# 폴더에서 직접 실행(python get_reviews_from_kyobo.py)해도 패키지 경로 import가 되도록 backend 디렉터리를 sys.path에 추가한다.
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")))
+
+from recommendations.my_source.crollers.browser_pool import (
+    close_browser_pool,
+    get_browser_pool,
+    wait_for_selector,
+)
+
 
 # ================================
 #  1. Basic config (used in main only)
@@ -15,12 +27,17 @@ import requests
 INPUT_CSV = "final_books_top204.csv"
 OUTPUT_CSV = "final_kyobo_reviews.csv"
 
+# 상세 페이지 요소 대기 예산 (고정 sleep 대신 요소가 나타나는 즉시 진행)
+WAIT_BUDGET_SECONDS = 10
+
 
 # ================================
 #  2. ISBN -> Kyobo productId
 # ================================
 
 
+# 반환값 None은 "검색 결과 페이지를 정상으로 받았지만 상품이 없음"일 때만이다.
+# 429 / 5xx 응답이나 검색 결과 페이지가 아닌 응답은 예외를 던진다. (결과 없음으로 캐시되지 않도록)
 def get_kyobo_product_id(isbn: str) -> str | None:
     search_url = (
         "https://search.kyobobook.co.kr/search"
@@ -33,8 +50,9 @@ def get_kyobo_product_id(isbn: str) -> str | None:
         timeout=10,
     )
 
-    if res.status_code != 200:
-        return None
+    res.raise_for_status()
+    if isbn not in res.text: # 정상 검색 결과 페이지는 검색어를 그대로 담고 있다.
+        raise requests.RequestException(f"unexpected kyobo search response isbn={isbn}")
 
     match = re.search(r"/detail/(S\d{12})", res.text)
     if not match:
@@ -49,34 +67,30 @@ def get_kyobo_product_id(isbn: str) -> str | None:
 
 
 def crawl_kyobo_reviews_selenium(product_id: str, isbn: str) -> list[dict]:
-    reviews = []
-
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.service import Service
-        from selenium.webdriver.common.by import By
-        from selenium.webdriver.chrome.options import Options
-        from webdriver_manager.chrome import ChromeDriverManager
+        import selenium  # noqa: F401
     except Exception:
-        return reviews
+        return []
 
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("user-agent=Mozilla/5.0")
+    # 풀에서 드라이버를 빌려 쓰고 돌려준다. (Chrome 재실행 / 드라이버 설치 확인 없음)
+    with get_browser_pool().driver() as driver:
+        driver.get(f"https://product.kyobobook.co.kr/detail/{product_id}")
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options,
-    )
+        # 리뷰 목록은 하단까지 스크롤해야 불러온다.
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_selector(driver, "div.comment_item", WAIT_BUDGET_SECONDS)
 
-    driver.get(f"https://product.kyobobook.co.kr/detail/{product_id}")
-    time.sleep(3)
+        reviews = extract_kyobo_reviews(driver, isbn)
 
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
+    return reviews
+
+
+# 상세 페이지가 이미 열린 driver에서 리뷰(div.comment_item)만 추출한다.
+    # - 통합 크롤러(get_kyobo_detail_page)와 공유
+def extract_kyobo_reviews(driver, isbn: str) -> list[dict]:
+    from selenium.webdriver.common.by import By
 
+    reviews = []
     review_items = driver.find_elements(By.CSS_SELECTOR, "div.comment_item")
 
     for elem in review_items:
@@ -114,7 +128,6 @@ def crawl_kyobo_reviews_selenium(product_id: str, isbn: str) -> list[dict]:
             "blog_url": None,
         })
 
-    driver.quit()
     return reviews
 
 
@@ -138,7 +151,11 @@ def main() -> None:
 
         print(f"\nCrawling: {title} ({isbn})")
 
-        product_id = get_kyobo_product_id(isbn)
+        try:
+            product_id = get_kyobo_product_id(isbn)
+        except requests.RequestException as e:
+            print(f"productId lookup failed -> skip ({e})")
+            continue
         if not product_id:
             print("productId not found -> skip")
             continue
@@ -156,6 +173,7 @@ def main() -> None:
         encoding="utf-8-sig",
     )
 
+    close_browser_pool()
     print(f"Saved: {OUTPUT_CSV}")
 
 
@@ -1,4 +1,6 @@
 import os
+import random
+import time
 from typing import Any, Optional
 
 import requests
@@ -11,10 +13,22 @@ except Exception:
 
 
 MODEL_NAME = "text-embedding-3-large"
+PROVIDER_MODEL_KEY = f"gms-openai::{MODEL_NAME}"
 OPENAI_EMBED_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/embeddings"
+MAX_TEXT_CHARS = 1500
+MAX_EMBED_BATCH = 16 # GMS 안전값 (오프라인 스크립트와 동일)
 
+MAX_RETRIES = 4
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
 
-def make_embeddings(data: Any) -> Optional[list[float]]:
+# 요청마다 새 TCP/TLS 연결을 맺지 않도록 keep-alive 세션을 재사용한다.
+session = requests.Session()
+
+
+def make_embedding_text(data: Any) -> str:
+    # make_embeddings가 실제로 전송하는 텍스트 (캐시 키도 이 텍스트 기준으로 만든다)
     if isinstance(data, dict):
         text = str(data.get("summary", ""))
     elif isinstance(data, list):
@@ -22,26 +36,79 @@ def make_embeddings(data: Any) -> Optional[list[float]]:
     else:
         text = str(data or "")
 
-    text = text.strip()[:1500]
-    if not text:
-        return None
+    return text.strip()[:MAX_TEXT_CHARS]
+
+
+def make_embeddings(data: Any) -> Optional[list[float]]:
+    return make_embeddings_batch([data])[0]
+
+
+def make_embeddings_batch(items: list[Any]) -> list[Optional[list[float]]]:
+    """
+    여러 텍스트를 MAX_EMBED_BATCH 단위로 묶어 keep-alive 세션으로 임베딩한다.
+    - 반환값은 입력과 같은 순서/길이
+    - 실패한 배치(또는 빈 텍스트)에 해당하는 자리만 None (부분 실패 허용)
+    """
+    texts = [make_embedding_text(item) for item in items]
+    results: list[Optional[list[float]]] = [None] * len(texts)
 
     api_key = os.getenv("GMS_KEY")
     if not api_key:
-        return None
+        return results
 
+    positions = [i for i, text in enumerate(texts) if text]
+    for start in range(0, len(positions), MAX_EMBED_BATCH):
+        batch = positions[start:start + MAX_EMBED_BATCH]
+        vectors = _post_embeddings([texts[i] for i in batch], api_key)
+        if vectors is None:
+            continue
+        for i, vec in zip(batch, vectors):
+            results[i] = vec
+
+    return results
+
+
+def _post_embeddings(texts: list[str], api_key: str) -> Optional[list[list[float]]]:
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
     payload = {
         "model": MODEL_NAME,
-        "input": [text],
+        "input": texts,
     }
+
+    for attempt in range(MAX_RETRIES + 1):
+        retry_after = None
+        try:
+            r = session.post(OPENAI_EMBED_URL, headers=headers, json=payload, timeout=120)
+            if r.status_code not in RETRY_STATUS_CODES:
+                r.raise_for_status()
+                data = r.json()["data"]
+                # 응답 순서가 입력 순서와 같다는 보장이 없으므로 index 기준으로 정렬한다.
+                data = sorted(data, key=lambda item: item.get("index", 0))
+                if len(data) != len(texts):
+                    return None
+                return [item["embedding"] for item in data]
+            retry_after = r.headers.get("Retry-After")
+        except requests.HTTPError:
+            return None # 4xx(429 제외)는 재시도해도 같은 결과
+        except (requests.ConnectionError, requests.Timeout):
+            pass
+        except Exception:
+            return None
+
+        if attempt < MAX_RETRIES:
+            time.sleep(_backoff_seconds(attempt, retry_after))
+
+    return None
+
+
+def _backoff_seconds(attempt: int, retry_after: Optional[str]) -> float:
     try:
-        r = requests.post(OPENAI_EMBED_URL, headers=headers, json=payload, timeout=120)
-        r.raise_for_status()
-        data = r.json()
-        return data["data"][0]["embedding"]
-    except Exception:
-        return None
+        if retry_after:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    except ValueError:
+        pass
+    # full jitter: 0 ~ base * 2^attempt
+    return random.uniform(0, min(BACKOFF_BASE_SECONDS * (2 ** attempt), BACKOFF_MAX_SECONDS))
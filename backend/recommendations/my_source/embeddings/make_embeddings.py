@@ -6,12 +6,10 @@ import os
 import re
 import json
 import math
-import time
 import hashlib
 from typing import List, Dict, Tuple
 import numpy as np
 import pandas as pd
-import requests
 from tqdm import tqdm
 
 try:
@@ -127,31 +125,9 @@ print("cache size:", len(cache))
 #%% =========================
 # 6) GMS OpenAI 임베딩 클라이언트
 # =========================
-class OpenAIEmbedder:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",  # ✅ GMS KEY
-            "Content-Type": "application/json",
-        }
-        payload = {
-            "model": FINAL_MODEL,
-            "input": texts,
-        }
-        r = requests.post(
-            OPENAI_EMBED_URL,
-            headers=headers,
-            json=payload,
-            timeout=120,
-        )
-        r.raise_for_status()
-        data = r.json()
-        return [item["embedding"] for item in data["data"]]
-
-
-embedder = OpenAIEmbedder(GMS_KEY)
+# 배치 분할 / keep-alive 세션 / 429·5xx 재시도는 서비스와 같은 make_embeddings_batch를 쓴다.
+    # - backend 디렉터리에서 `python -m recommendations.my_source.embeddings.make_embeddings`로 실행
+from recommendations.my_source.embeddings import make_embeddings_batch
 
 
 
@@ -159,9 +135,10 @@ embedder = OpenAIEmbedder(GMS_KEY)
 # 7) 임베딩 실행 (번들 텍스트 안전 처리 + 캐시)
 # =========================
 
-def split_text_by_chars(text: str, max_chars: int = 2000) -> List[str]:
+def split_text_by_chars(text: str, max_chars: int = MAX_TEXT_CHARS) -> List[str]:
     """
     GMS payload 제한을 피하기 위한 안전 분할
+    (make_embeddings_batch가 MAX_TEXT_CHARS에서 자르므로 조각도 그 길이를 넘지 않게 나눈다.)
     """
     text = text.strip()
     if len(text) <= max_chars:
@@ -190,34 +167,53 @@ def embed_final(texts: List[str]) -> np.ndarray:
             miss_texts.append(t)
 
     # 2) 임베딩
-    for idx, text in tqdm(
-            list(zip(miss_idx, miss_texts)),
-            desc="embedding",
-            total=len(miss_texts),
-    ):
-        pieces = split_text_by_chars(text)
-
-        vecs = []
-        for s in range(0, len(pieces), MAX_EMBED_BATCH):
-            batch = pieces[s:s + MAX_EMBED_BATCH]
-            vecs.extend(embedder.embed(batch))
-            time.sleep(0.2)
-
-        mean_vec = np.mean(vecs, axis=0).tolist()
-        out[idx] = mean_vec
-
-        cache_key = (PROVIDER_MODEL_KEY, stable_hash(text))
-        cache[cache_key] = mean_vec
-        append_cache(
-            CACHE_PATH,
-            PROVIDER_MODEL_KEY,
-            text,
-            mean_vec,
-        )
+        # - miss 텍스트의 조각을 MAX_EMBED_BATCH 단위로 묶어 보낸다. (N개 텍스트 → 약 N / MAX_EMBED_BATCH 번의 왕복)
+        # - 배치가 끝날 때마다 완성된 텍스트를 캐시에 추가한다. (중간에 실패해도 다시 실행하면 이어서 진행)
+    failed = 0
+    for group in tqdm(_group_by_batch(miss_idx, miss_texts), desc="embedding"):
+        pieces = [piece for _, _, text_pieces in group for piece in text_pieces]
+        piece_vecs = make_embeddings_batch(pieces)
+
+        offset = 0
+        for idx, text, text_pieces in group:
+            vecs = piece_vecs[offset:offset + len(text_pieces)]
+            offset += len(text_pieces)
+            if any(vec is None for vec in vecs):
+                failed += 1
+                continue
+
+            mean_vec = np.mean(vecs, axis=0).tolist()
+            out[idx] = mean_vec
+
+            cache_key = (PROVIDER_MODEL_KEY, stable_hash(text))
+            cache[cache_key] = mean_vec
+            append_cache(
+                CACHE_PATH,
+                PROVIDER_MODEL_KEY,
+                text,
+                mean_vec,
+            )
+
+    if failed:
+        raise RuntimeError(f"임베딩 실패 {failed}건 (성공한 결과는 캐시에 저장됨, 다시 실행하면 실패분만 요청)")
 
     return np.array(out, dtype=np.float32)
 
 
+def _group_by_batch(miss_idx: List[int], miss_texts: List[str]):
+    # 조각 수 합이 MAX_EMBED_BATCH를 넘지 않도록 텍스트를 묶는다. (조각이 더 많은 텍스트는 단독 묶음)
+    group, size = [], 0
+    for idx, text in zip(miss_idx, miss_texts):
+        text_pieces = split_text_by_chars(text)
+        if group and size + len(text_pieces) > MAX_EMBED_BATCH:
+            yield group
+            group, size = [], 0
+        group.append((idx, text, text_pieces))
+        size += len(text_pieces)
+    if group:
+        yield group
+
+
 #%% =========================
 # 8) 실행
 # =========================
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+
+# ================================================================
+#  GMS Chat Completions 게이트웨이
+# ================================================================
+
+# 요약기 3종 + 유저 리뷰 요약 + 추천 키워드 / 추천 사유 LLM 호출이 모두 이 모듈을 거친다.
+    # - keep-alive 세션 하나를 공유한다.
+    # - 분당 요청 수(RPM) / 분당 토큰 수(TPM) 예산을 스레드 간에 공유해 백그라운드 빌드가 몰려도 429가 연쇄되지 않는다.
+    # - 같은 프롬프트가 동시에 들어오면 한 번만 호출한다. (single-flight)
+    # - (model, 프롬프트 해시) 기준 영구 캐시가 설치되어 있으면 먼저 확인한다. (configure_llm_gateway)
+GMS_OPENAI_CHAT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions"
+DEFAULT_MODEL = "gpt-4o-mini"
+REQUEST_TIMEOUT = 120
+
+DEFAULT_RPM = 60
+DEFAULT_TPM = 150_000
+EXPECTED_COMPLETION_TOKENS = 500 # 응답 토큰 수 사전 추정치 (실제 사용량은 응답 후 정산)
+
+MAX_RETRIES = 4
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+session = requests.Session()
+
+
+class LLMError(Exception):
+    pass
+
+
+# ================================================================
+#  1) RPM / TPM 예산
+# ================================================================
+
+class _TokenBucket:
+    """분당 capacity 만큼 채워지는 버킷. acquire는 필요한 만큼 찰 때까지 기다린다."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float) -> float:
+        amount = min(amount, self.capacity) # 버킷보다 큰 요청도 언젠가는 통과하도록
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def debit(self, amount: float) -> None:
+        # 추정보다 실제 사용량이 많았던 만큼 추가 차감 (음수 허용 → 다음 요청이 기다린다)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+_limits_lock = threading.Lock()
+_rpm_bucket = _TokenBucket(int(os.getenv("GMS_LLM_RPM", DEFAULT_RPM)))
+_tpm_bucket = _TokenBucket(int(os.getenv("GMS_LLM_TPM", DEFAULT_TPM)))
+
+# 영구 캐시: get(model, prompt_hash) -> dict | None, set(model, prompt_hash, dict) 를 가진 객체
+_prompt_cache = None
+
+
+def configure_llm_gateway(rpm: int | None = None, tpm: int | None = None, prompt_cache=None) -> None:
+    global _rpm_bucket, _tpm_bucket, _prompt_cache
+    with _limits_lock:
+        if rpm:
+            _rpm_bucket = _TokenBucket(rpm)
+        if tpm:
+            _tpm_bucket = _TokenBucket(tpm)
+        if prompt_cache is not None:
+            _prompt_cache = prompt_cache
+
+
+def estimate_tokens(text: str) -> int:
+    # 한글 위주 텍스트 기준 대략 2자당 1토큰 (사전 예산 차감용 추정치)
+    return max(1, len(text or "") // 2)
+
+
+# ================================================================
+#  2) single-flight + 지표
+# ================================================================
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight: dict[str, _Call] = {}
+_inflight_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "cache_hits": 0,
+    "inflight_waits": 0,
+    "errors": 0,
+    "retries": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "latency_seconds": 0.0,
+    "limit_wait_seconds": 0.0,
+}
+
+
+def _count(name: str, n: float = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def get_llm_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    requests_made = stats["requests"]
+    stats["avg_latency_seconds"] = round(stats["latency_seconds"] / requests_made, 3) if requests_made else 0.0
+    stats["latency_seconds"] = round(stats["latency_seconds"], 3)
+    stats["limit_wait_seconds"] = round(stats["limit_wait_seconds"], 3)
+    return stats
+
+
+# ================================================================
+#  3) 호출
+# ================================================================
+
+def prompt_hash(model: str, messages: list[dict], temperature: float, response_format: Optional[dict] = None) -> str:
+    raw = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "response_format": response_format},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def chat_completion(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.3,
+    system: str = "You are a helpful assistant.",
+    response_format: Optional[dict] = None,
+    use_cache: bool = True,
+) -> str:
+    """
+    GMS Chat Completions 응답 본문(content)을 반환한다.
+    실패 시 LLMError를 던진다. (기존 r.raise_for_status()와 같은 위치에서 실패)
+    """
+    messages = [
+        {"role": "developer", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+    key = prompt_hash(model, messages, temperature, response_format)
+
+    if use_cache and _prompt_cache is not None:
+        cached = _cache_get(model, key)
+        if cached is not None:
+            _count("cache_hits")
+            return cached["content"]
+
+    with _inflight_lock:
+        call = _inflight.get(key)
+        lead = call is None
+        if lead:
+            call = _Call()
+            _inflight[key] = call
+
+    if not lead:
+        _count("inflight_waits")
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        result = _post_chat(model, messages, temperature, response_format)
+        call.result = result["content"]
+        if use_cache and _prompt_cache is not None:
+            _cache_set(model, key, result)
+        return call.result
+    except Exception as e:
+        call.error = e if isinstance(e, LLMError) else LLMError(str(e))
+        raise call.error
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.event.set()
+
+
+def _cache_get(model: str, key: str) -> Optional[dict]:
+    try:
+        return _prompt_cache.get(model, key)
+    except Exception as e:
+        print(f"[llm] prompt cache read failed: {e}")
+        return None
+
+
+def _cache_set(model: str, key: str, result: dict) -> None:
+    try:
+        _prompt_cache.set(model, key, result)
+    except Exception as e:
+        print(f"[llm] prompt cache write failed: {e}")
+
+
+def _post_chat(model: str, messages: list[dict], temperature: float, response_format: Optional[dict]) -> dict:
+    api_key = os.getenv("GMS_KEY")
+    if not api_key:
+        raise LLMError("GMS_KEY 없음 (.env 확인)")
+
+    payload: dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    if response_format:
+        payload["response_format"] = response_format
+
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
+
+    estimated = sum(estimate_tokens(m["content"]) for m in messages) + EXPECTED_COMPLETION_TOKENS
+
+    for attempt in range(MAX_RETRIES + 1):
+        waited = _rpm_bucket.acquire(1) + _tpm_bucket.acquire(estimated)
+        _count("limit_wait_seconds", waited)
+
+        retry_after = None
+        started = time.perf_counter()
+        try:
+            r = session.post(GMS_OPENAI_CHAT_URL, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+            _count("requests")
+            _count("latency_seconds", time.perf_counter() - started)
+            if r.status_code not in RETRY_STATUS_CODES:
+                r.raise_for_status()
+                data = r.json()
+                usage = data.get("usage") or {}
+                prompt_tokens = int(usage.get("prompt_tokens") or 0)
+                completion_tokens = int(usage.get("completion_tokens") or 0)
+                _count("prompt_tokens", prompt_tokens)
+                _count("completion_tokens", completion_tokens)
+
+                used = prompt_tokens + completion_tokens
+                if used > estimated:
+                    _tpm_bucket.debit(used - estimated)
+
+                return {
+                    "content": data["choices"][0]["message"]["content"],
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                }
+            retry_after = r.headers.get("Retry-After")
+        except requests.HTTPError as e:
+            _count("errors")
+            raise LLMError(str(e)) # 4xx(429 제외)는 재시도해도 같은 결과
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= MAX_RETRIES:
+                _count("errors")
+                raise LLMError(str(e))
+
+        if attempt < MAX_RETRIES:
+            _count("retries")
+            time.sleep(_backoff_seconds(attempt, retry_after))
+
+    _count("errors")
+    raise LLMError("chat completion retries exhausted")
+
+
+def _backoff_seconds(attempt: int, retry_after: Optional[str]) -> float:
+    try:
+        if retry_after:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    except ValueError:
+        pass
+    # full jitter: 0 ~ base * 2^attempt
+    return random.uniform(0, min(BACKOFF_BASE_SECONDS * (2 ** attempt), BACKOFF_MAX_SECONDS))
@@ -0,0 +1,155 @@
+import hashlib
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator
+
+from recommendations.my_source.llm import estimate_tokens
+
+# =========================
+# 설정
+# =========================
+SHINGLE_SIZE = 3            # 글자 단위 3-gram (한글은 띄어쓰기가 들쭉날쭉해 단어보다 안정적)
+NUM_PERM = 64               # MinHash 서명 길이
+LSH_BANDS = 16              # 16 밴드 x 4 행 → 유사도 0.8 근처 후보를 거의 놓치지 않음
+NEAR_DUP_THRESHOLD = 0.8    # 추정 Jaccard 유사도가 이 이상이면 중복으로 본다
+
+# 리뷰 요약 번들 기본 예산 (기존 6000자 ≒ 3000토큰)
+DEFAULT_MAX_TOKENS = 3000
+
+# 리뷰 분류 기준 (교보 리뷰 번들 섹션 / 구매·배송 리뷰 제외가 같은 기준을 쓴다)
+SHORT_OPINION_MAX_CHARS = 80
+# "상태" / "빠르" 처럼 내용 리뷰에도 흔한 단어(심리 상태, 전개가 빠르다)는 넣지 않고 구매 경험을 가리키는 표현만 둔다.
+PURCHASE_KEYWORDS = [
+    "배송", "포장", "택배", "책 상태", "책상태", "파본", "제본 불량", "하자", "굿즈",
+    "빨리 받", "빨리 왔", "빠르게 받", "빠르게 왔", "잘 받았",
+]
+
+# 묶음 토큰 예산이 이만큼도 남지 않으면 더 담을 리뷰를 찾지 않는다.
+MIN_REMAINING_TOKENS = 8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+
+# =========================
+# 유사도 (MinHash)
+# =========================
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    return re.sub(r"[\s\W_]+", "", text) # 공백 / 문장부호 / 이모티콘 차이는 무시
+
+
+def _shingles(text: str) -> set[int]:
+    norm = _normalize(text)
+    if len(norm) <= SHINGLE_SIZE:
+        grams = {norm} if norm else set()
+    else:
+        grams = {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big")
+        for g in grams
+    }
+
+
+def minhash_signature(text: str) -> tuple[int, ...] | None:
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in shingles)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return same / len(sig_a)
+
+
+def iter_distinct(texts: Iterable[str], threshold: float = NEAR_DUP_THRESHOLD) -> Iterator[str]:
+    """
+    앞에서부터 순서대로 내보내고, 이미 내보낸 리뷰와 거의 같은 리뷰는 버린다.
+    LSH 밴드가 하나라도 겹치는 후보끼리만 서명을 비교한다.
+    소비한 만큼만 서명을 계산하므로 번들이 차면(max_items / 토큰 예산) 나머지 리뷰는 보지 않는다.
+    """
+    rows = NUM_PERM // LSH_BANDS
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+    kept_sigs: list[tuple[int, ...]] = []
+
+    for text in texts:
+        sig = minhash_signature(text)
+        if sig is None:
+            continue
+
+        bands = [(b, sig[b * rows:(b + 1) * rows]) for b in range(LSH_BANDS)]
+        candidates = {idx for band in bands for idx in buckets.get(band, [])}
+        if any(estimate_similarity(sig, kept_sigs[idx]) >= threshold for idx in candidates):
+            continue
+
+        idx = len(kept_sigs)
+        kept_sigs.append(sig)
+        for band in bands:
+            buckets.setdefault(band, []).append(idx)
+        yield text
+
+
+def drop_near_duplicates(texts: list[str], threshold: float = NEAR_DUP_THRESHOLD) -> list[str]:
+    return list(iter_distinct(texts, threshold=threshold))
+
+
+# =========================
+# 리뷰 분류 / 구매·배송 리뷰
+# =========================
+def is_purchase_review(text: str) -> bool:
+    # 길이와 무관하게 판단한다. ("배송 빨라요" 같은 구매 리뷰는 대부분 짧다)
+    text = str(text)
+    return any(k in text for k in PURCHASE_KEYWORDS)
+
+
+def classify_review(text: str) -> str:
+    text = str(text).strip()
+
+    if is_purchase_review(text):
+        return "purchase_review"
+
+    if len(text) <= SHORT_OPINION_MAX_CHARS:
+        return "short_opinion"
+
+    return "content_review"
+
+
+# =========================
+# 요약 전 필터 + 토큰 예산 패킹
+# =========================
+def filter_reviews(reviews, drop_purchase: bool = True, threshold: float = NEAR_DUP_THRESHOLD) -> Iterator[str]:
+    # 지연 평가: pack_by_tokens가 번들을 채우는 만큼만 중복 검사(MinHash)를 한다.
+    texts = (str(r).strip() for r in reviews if r is not None and str(r).strip())
+    if drop_purchase:
+        texts = (t for t in texts if not is_purchase_review(t))
+    return iter_distinct(texts, threshold=threshold)
+
+
+def pack_by_tokens(texts: Iterable[str], max_tokens: int, max_items: int | None = None, prefix: str = "") -> list[str]:
+    """
+    토큰 추정치 기준으로 예산 안에 들어가는 만큼 담는다.
+    예산을 넘는 긴 리뷰는 건너뛰고 다음(더 짧은) 리뷰로 남은 예산을 채운다.
+    """
+    buf, used = [], 0
+    for text in texts:
+        if max_items is not None and len(buf) >= max_items:
+            break
+        if max_tokens - used < MIN_REMAINING_TOKENS:
+            break
+        line = f"{prefix}{text}"
+        cost = estimate_tokens(line) + 1 # 줄바꿈
+        if used + cost > max_tokens:
+            continue
+        buf.append(line)
+        used += cost
+    return buf
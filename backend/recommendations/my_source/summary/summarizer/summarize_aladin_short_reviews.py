@@ -1,9 +1,15 @@
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from recommendations.my_source.llm import chat_completion
+from recommendations.my_source.summary.summarizer.review_filter import (
+    DEFAULT_MAX_TOKENS,
+    filter_reviews,
+    pack_by_tokens,
+)
+
 # =========================
 # 환경변수
 # =========================
@@ -18,21 +24,15 @@ assert GMS_KEY, "GMS_KEY 없음 (.env 확인)"
 INPUT_CSV = "aladin_short_reviews.csv"
 OUT_CSV = "../outputs/summarized_aladin_reviews"
 
-GMS_OPENAI_CHAT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions"
 
 
 # =========================
 # 유틸
 # =========================
-def make_bundle_text(reviews, max_reviews=30, max_chars=6000):
-    buf, total = [], 0
-    for r in reviews[:max_reviews]:
-        r = str(r).strip()
-        total += len(r)
-        if total > max_chars:
-            break
-        buf.append(r)
-    return "\n".join(buf)
+# 중복 / 구매·배송 리뷰를 먼저 걸러내고 토큰 예산 안에서 서로 다른 리뷰를 최대한 담는다.
+def make_bundle_text(reviews, max_reviews=30, max_tokens=DEFAULT_MAX_TOKENS):
+    texts = filter_reviews(reviews)
+    return "\n".join(pack_by_tokens(texts, max_tokens, max_items=max_reviews))
 
 # =========================
 # 요약 함수
@@ -53,29 +53,8 @@ def summarize_with_gpt4o_mini(bundle_text: str) -> dict:
 {bundle_text}
 """
 
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {"role": "developer", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.3
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {GMS_KEY}"
-    }
-
-    r = requests.post(
-        GMS_OPENAI_CHAT_URL,
-        headers=headers,
-        json=payload,
-        timeout=120
-    )
-    r.raise_for_status()
-
-    text = r.json()["choices"][0]["message"]["content"]
+    # 공용 LLM 게이트웨이 (세션 재사용 / RPM·TPM 예산 / 중복 호출 합치기 / 프롬프트 캐시)
+    text = chat_completion(prompt, model="gpt-4o-mini", temperature=0.3)
 
     return {
         "summary": text.split("요약:")[-1].split("감정:")[0].strip(),
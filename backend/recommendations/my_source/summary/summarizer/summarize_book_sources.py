@@ -0,0 +1,158 @@
+import json
+
+from recommendations.my_source.llm import chat_completion
+from recommendations.my_source.summary.summarizer.summarize_aladin_short_reviews import (
+    make_bundle_text,
+    summarize_aladin_short_reviews,
+)
+from recommendations.my_source.summary.summarizer.summarize_kyobo_reviews import (
+    make_kyobo_bundle_text,
+    summarize_kyobo_reviews,
+)
+from recommendations.my_source.summary.summarizer.summarize_kyobo_publisher_reviews import (
+    make_kyobo_bundle_text as make_kyobo_publisher_bundle_text,
+    summarize_kyobo_publisher_reviews,
+)
+
+# =========================
+# 설정
+# =========================
+SOURCES = ("aladin", "kyobo", "kyobo_publisher")
+FUSED_SUMMARY_MAX_CHARS = 1200 # 임베딩 입력(1500자) 안에 들어가도록
+
+EMPTY_SUMMARY = {"summary": "", "sentiment": "", "keywords": ""}
+
+_SOURCE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "sentiment": {"type": "number"},
+        "keywords": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["summary", "sentiment", "keywords"],
+    "additionalProperties": False,
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "book_source_summaries",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                **{source: _SOURCE_SCHEMA for source in SOURCES},
+                "fused_summary": {"type": "string"},
+            },
+            "required": [*SOURCES, "fused_summary"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+# =========================
+# 통합 요약 (요청 1회)
+# =========================
+def summarize_book_sources_with_gpt4o_mini(bundles: dict[str, str]) -> dict:
+    prompt = f"""
+너는 도서 추천 시스템을 위한 책 리뷰 / 책 소개 요약 전문가다.
+
+아래는 한 권의 책에 대해 세 곳에서 수집한 자료이다.
+- aladin: 알라딘 독자 한줄평
+- kyobo: 교보문고 독자 리뷰 (구매/배송 언급은 핵심 평가가 아니면 최소화)
+- kyobo_publisher: 교보문고 책 소개 / 출판사 서평 / 추천사 (소설이면 결말 언급 금지, 인용문은 의미만 반영)
+
+각 자료별로:
+- summary: 한글 4~5문장 (자료가 비어 있으면 빈 문자열)
+- sentiment: -1.0 ~ 1.0 사이 숫자 (자료가 비어 있으면 0)
+- keywords: 키워드 5개 (자료가 비어 있으면 빈 배열)
+
+fused_summary: 세 자료를 종합해 이 책이 어떤 책인지, 독자들이 어떤 경험을 했는지를 {FUSED_SUMMARY_MAX_CHARS}자 이내 한글로 요약하라.
+독자가 검색창에 입력할 법한 표현으로 작성하라.
+
+[aladin]
+{bundles.get("aladin", "")}
+
+[kyobo]
+{bundles.get("kyobo", "")}
+
+[kyobo_publisher]
+{bundles.get("kyobo_publisher", "")}
+"""
+
+    text = chat_completion(
+        prompt,
+        model="gpt-4o-mini",
+        temperature=0.3,
+        response_format=RESPONSE_FORMAT,
+    )
+    return _parse_combined_response(text)
+
+
+def _parse_combined_response(text: str) -> dict:
+    data = json.loads(text)
+
+    result = {}
+    for source in SOURCES:
+        item = data[source]
+        keywords = item.get("keywords") or []
+        result[source] = {
+            "summary": str(item.get("summary") or "").strip(),
+            "sentiment": float(item.get("sentiment") or 0.0),
+            "keywords": ", ".join(str(k).strip() for k in keywords if str(k).strip()),
+        }
+    result["fused_summary"] = str(data.get("fused_summary") or "").strip()
+    return result
+
+
+# =========================
+# 진입점
+# =========================
+def summarize_book_sources(
+    aladin_texts: list[str],
+    kyobo_texts: list[str],
+    kyobo_publisher_texts: list[str],
+    combined: bool = True,
+) -> dict:
+    """
+    반환: {"aladin": {...}, "kyobo": {...}, "kyobo_publisher": {...}, "fused_summary": str, "mode": str}
+    combined=True면 세 자료를 한 번의 요청으로 요약하고, 실패하거나 응답을 해석하지 못하면 자료별 요약으로 대체한다.
+    """
+    texts = {
+        "aladin": aladin_texts,
+        "kyobo": kyobo_texts,
+        "kyobo_publisher": kyobo_publisher_texts,
+    }
+    if not any(texts.values()):
+        return {**{source: dict(EMPTY_SUMMARY) for source in SOURCES}, "fused_summary": "", "mode": "empty"}
+
+    if combined:
+        bundles = {
+            "aladin": make_bundle_text(aladin_texts) if aladin_texts else "",
+            "kyobo": make_kyobo_bundle_text(kyobo_texts) if kyobo_texts else "",
+            "kyobo_publisher": make_kyobo_publisher_bundle_text(kyobo_publisher_texts) if kyobo_publisher_texts else "",
+        }
+        try:
+            result = summarize_book_sources_with_gpt4o_mini(bundles)
+            # 자료가 없는 소스는 모델이 무엇을 돌려주든 비운다.
+            for source in SOURCES:
+                if not texts[source]:
+                    result[source] = dict(EMPTY_SUMMARY)
+            result["mode"] = "combined"
+            return result
+        except Exception as e:
+            print(f"[debug] combined summary failed -> per-source fallback: {e}")
+
+    summarizers = {
+        "aladin": summarize_aladin_short_reviews,
+        "kyobo": summarize_kyobo_reviews,
+        "kyobo_publisher": summarize_kyobo_publisher_reviews,
+    }
+    result = {
+        source: summarizers[source](texts[source]) if texts[source] else dict(EMPTY_SUMMARY)
+        for source in SOURCES
+    }
+    result["fused_summary"] = ""
+    result["mode"] = "per_source"
+    return result
@@ -1,9 +1,16 @@
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from recommendations.my_source.llm import chat_completion, estimate_tokens
+from recommendations.my_source.summary.summarizer.review_filter import (
+    DEFAULT_MAX_TOKENS,
+    classify_review,
+    filter_reviews,
+    pack_by_tokens,
+)
+
 # =========================
 # 환경변수
 # =========================
@@ -18,57 +25,43 @@ INPUT_CSV = "final_kyobo_reviews.csv"
 #INPUT_CSV = "final_kyobo_reviews.csv"
 OUT_CSV = "kyobo_reviews_summaries_with_gpt4o_mini.csv"
 
-GMS_OPENAI_CHAT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions"
-
-# =========================
-# 리뷰 분류 유틸
-# =========================
-def classify_review(text: str) -> str:
-    text = str(text).strip()
-
-    if len(text) <= 80:
-        return "short_opinion"
-
-    purchase_keywords = ["배송", "포장", "상태", "빠르", "하자", "굿즈", "책상태"]
-    if any(k in text for k in purchase_keywords):
-        return "purchase_review"
-
-    return "content_review"
-
 
 def make_kyobo_bundle_text(
         reviews,
-        max_total_chars=6000,
+        max_tokens=DEFAULT_MAX_TOKENS,
         max_per_section=20
 ):
     sections = {
         "content_review": [],
         "short_opinion": [],
-        "purchase_review": [],
     }
 
+    # 구매·배송 리뷰(classify_review 기준)는 번들에 넣지 않는다.
     for r in reviews:
-        category = classify_review(r)
-        sections[category].append(str(r).strip())
+        text = str(r).strip() if r is not None else ""
+        category = classify_review(text) if text else None
+        if category in sections:
+            sections[category].append(text)
+
+    # 토큰 예산은 콘텐츠 평가 → 한줄평 순서로 나눠 쓴다.
+    # 섹션마다 담는 만큼만 중복 검사(MinHash)를 한다.
+    remaining = max_tokens
 
     def join_with_limit(texts):
-        buf, total = [], 0
-        for t in texts[:max_per_section]:
-            total += len(t)
-            if total > max_total_chars:
-                break
-            buf.append(f"- {t}")
+        nonlocal remaining
+        buf = pack_by_tokens(filter_reviews(texts, drop_purchase=False), remaining, max_items=max_per_section, prefix="- ")
+        remaining -= sum(estimate_tokens(line) + 1 for line in buf)
         return "\n".join(buf)
 
+    content_text = join_with_limit(sections["content_review"])
+    short_text = join_with_limit(sections["short_opinion"])
+
     bundle = f"""
 [콘텐츠 평가 리뷰]
-{join_with_limit(sections["content_review"])}
+{content_text}
 
 [짧은 감상 / 한줄평]
-{join_with_limit(sections["short_opinion"])}
-
-[구매·배송 관련 언급]
-{join_with_limit(sections["purchase_review"])}
+{short_text}
 """.strip()
 
     return bundle
@@ -101,29 +94,8 @@ def summarize_with_gpt4o_mini(bundle_text: str) -> dict:
 {bundle_text}
 """
 
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {"role": "developer", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.3
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {GMS_KEY}"
-    }
-
-    r = requests.post(
-        GMS_OPENAI_CHAT_URL,
-        headers=headers,
-        json=payload,
-        timeout=120
-    )
-    r.raise_for_status()
-
-    text = r.json()["choices"][0]["message"]["content"]
+    # 공용 LLM 게이트웨이 (세션 재사용 / RPM·TPM 예산 / 중복 호출 합치기 / 프롬프트 캐시)
+    text = chat_completion(prompt, model="gpt-4o-mini", temperature=0.3)
 
     return {
         "summary": text.split("요약:")[-1].split("감정:")[0].strip(),
@@ -1,7 +1,13 @@
 import os
-import requests
 from dotenv import load_dotenv
 
+from recommendations.my_source.llm import chat_completion
+from recommendations.my_source.summary.summarizer.review_filter import (
+    DEFAULT_MAX_TOKENS,
+    filter_reviews,
+    pack_by_tokens,
+)
+
 # =========================
 # 환경변수
 # =========================
@@ -9,26 +15,13 @@ load_dotenv()
 GMS_KEY = os.getenv("GMS_KEY")
 assert GMS_KEY, "GMS_KEY 없음 (.env 확인)"
 
-# =========================
-# 설정
-# =========================
-GMS_OPENAI_CHAT_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions"
-
-
 # =========================
 # 유저 리뷰 묶기
 # =========================
-def make_user_bundle_text(reviews, max_reviews=30, max_chars=6000):
-    buf, total = [], 0
-    for r in reviews[:max_reviews]:
-        r = str(r).strip()
-        if not r:
-            continue
-        total += len(r)
-        if total > max_chars:
-            break
-        buf.append(f"- {r}")
-    return "\n".join(buf)
+# 중복 / 구매·배송 리뷰를 먼저 걸러내고 토큰 예산 안에서 서로 다른 리뷰를 최대한 담는다.
+def make_user_bundle_text(reviews, max_reviews=30, max_tokens=DEFAULT_MAX_TOKENS):
+    texts = filter_reviews(reviews)
+    return "\n".join(pack_by_tokens(texts, max_tokens, max_items=max_reviews, prefix="- "))
 
 
 # =========================
@@ -52,30 +45,12 @@ def summarize_user_reviews_with_gpt4o_mini(bundle_text: str) -> dict:
 {bundle_text}
 """
 
-    payload = {
-        "model": "gpt-4o-mini",
-        "messages": [
-            {"role": "developer", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.3
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {GMS_KEY}"
-    }
-
-    r = requests.post(
-        GMS_OPENAI_CHAT_URL,
-        headers=headers,
-        json=payload,
-        timeout=120
-    )
-    r.raise_for_status()
+    # 공용 LLM 게이트웨이 (세션 재사용 / RPM·TPM 예산 / 중복 호출 합치기 / 프롬프트 캐시)
+    text = chat_completion(prompt, model="gpt-4o-mini", temperature=0.3)
+    return _parse_summary_text(text)
 
-    text = r.json()["choices"][0]["message"]["content"]
 
+def _parse_summary_text(text: str) -> dict:
     return {
         "summary": text.split("요약:")[-1].split("감정:")[0].strip(),
         "sentiment": text.split("감정:")[-1].split("키워드:")[0].strip(),
@@ -83,6 +58,53 @@ def summarize_user_reviews_with_gpt4o_mini(bundle_text: str) -> dict:
     }
 
 
+# =========================
+# 요약 합치기 (reduce)
+# =========================
+def merge_user_review_summaries(parts: list[dict]) -> dict:
+    """
+    parts: [{"summary", "sentiment", "keywords", "review_count"}, ...]
+    리뷰 묶음 요약들을 하나로 합친다. (리뷰 원문은 다시 보내지 않는다)
+    프롬프트 크기가 parts 수에 비례하므로 호출하는 쪽에서 몇 개씩(REDUCE_FANOUT) 나눠 단계적으로 합친다.
+    """
+    parts = [p for p in parts if p.get("summary")]
+    if not parts:
+        return {"summary": "", "sentiment": "", "keywords": ""}
+    if len(parts) == 1:
+        return {k: parts[0].get(k, "") for k in ("summary", "sentiment", "keywords")}
+
+    blocks = []
+    for i, part in enumerate(parts, start=1):
+        blocks.append(
+            f"[부분 요약 {i}] (리뷰 {part.get('review_count', 0)}개)\n"
+            f"요약: {part.get('summary', '')}\n"
+            f"감정: {part.get('sentiment', '')}\n"
+            f"키워드: {part.get('keywords', '')}"
+        )
+    summaries_text = "\n\n".join(blocks)
+
+    prompt = f"""
+당신은 독서 커뮤니티의 유저 리뷰 요약 전문가입니다.
+
+아래는 동일한 책의 리뷰를 여러 묶음으로 나누어 요약한 결과입니다.
+리뷰 수가 많은 묶음의 비중을 더 크게 반영해 하나의 요약으로 합쳐주세요.
+실제 독서 경험과 취향, 감상 포인트를 중심으로 정리하고, 묶음 사이에 상반된 의견이 있으면 함께 언급하세요.
+
+반드시 아래 형식으로 출력하세요.
+
+[출력 형식]
+요약: 4~5문장
+감정: -1.0 ~ 1.0 사이의 숫자 하나
+키워드: 키워드, 키워드, 키워드, 키워드, 키워드, 키워드
+
+[부분 요약 목록]
+{summaries_text}
+"""
+
+    text = chat_completion(prompt, model="gpt-4o-mini", temperature=0.3)
+    return _parse_summary_text(text)
+
+
 # =========================
 # 단건 요약
 # =========================
@@ -0,0 +1,126 @@
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Min
+
+from recommendations.models import BookNeighbor, VectorJob
+from recommendations.services.job_queue import enqueue_job, job_stage, register_handler
+from recommendations.services.vector_index import BookVectorIndex, get_book_vector_index, sync_index_from_db
+
+
+# ================================================================
+#  책 -> 비슷한 책 top-K 테이블 (BookNeighbor)
+# ================================================================
+
+# 전체 계산은 쿼리 블록 단위 행렬곱(block x N)으로 처리해 N x N 유사도 행렬을 한 번에 만들지 않는다.
+# 벡터 하나가 바뀌면 영향을 받는 책만 다시 계산한다.
+    # - 그 책 자신
+    # - 기존에 그 책을 이웃으로 갖고 있던 책 (점수가 떨어졌을 수 있음)
+    # - 새 벡터와의 유사도가 현재 K번째 이웃 점수보다 높은 책 (새로 들어가야 함)
+    #   새 책과 가까운 REVERSE_CANDIDATES권만 확인한다. (더 먼 책은 자기 이웃이 더 가깝다고 보고, 전체 재계산으로 보정)
+# 책 벡터 저장 경로를 막지 않도록 작업 큐(BOOK_NEIGHBOR_UPDATE)에서 실행한다.
+NEIGHBOR_K = getattr(settings, "BOOK_NEIGHBOR_K", 20)
+BLOCK_SIZE = getattr(settings, "BOOK_NEIGHBOR_BLOCK_SIZE", 256)
+REVERSE_CANDIDATES = getattr(settings, "BOOK_NEIGHBOR_REVERSE_CANDIDATES", 200)
+
+
+def build_all_neighbors(k: int = NEIGHBOR_K, block_size: int = BLOCK_SIZE) -> dict:
+    started = time.perf_counter()
+
+    # 요청 처리용 전역 인덱스와 별개로 새로 적재해 계산한다.
+    index = BookVectorIndex()
+    index.load_from_db()
+
+    book_ids = index.book_ids()
+    written = _recompute_neighbors(index, book_ids, k, block_size)
+
+    # 벡터가 사라진 책의 이웃 목록은 남겨 두지 않는다.
+    BookNeighbor.objects.exclude(book_id__in=book_ids).delete()
+
+    return {
+        "books": len(book_ids),
+        "rows": written,
+        "k": k,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def enqueue_neighbor_update(book_id: int) -> None:
+    enqueue_job(
+        VectorJob.Kind.BOOK_NEIGHBOR_UPDATE,
+        dedup_key=book_id,
+        payload={"book_id": book_id},
+    )
+
+
+def _run_neighbor_update_job(payload: dict) -> None:
+    close_old_connections()
+    with job_stage("neighbors"):
+        update_neighbors_for_book(payload.get("book_id"))
+
+
+register_handler(VectorJob.Kind.BOOK_NEIGHBOR_UPDATE, _run_neighbor_update_job)
+
+
+def update_neighbors_for_book(book_id: int, k: int = NEIGHBOR_K) -> int:
+    # 다른 프로세스가 저장한 벡터까지 반영한 뒤 계산한다. (확인 주기를 기다리지 않음)
+    index = get_book_vector_index()
+    sync_index_from_db(index, force=True)
+    found, vectors = index.get_vectors([book_id])
+    if not found:
+        return 0
+
+    # 새 벡터와 가까운 책 (행렬곱 한 번 + top-REVERSE_CANDIDATES)
+    scores = {
+        hit["book_id"]: hit["score"]
+        for hit in index.search(vectors[0], k=max(REVERSE_CANDIDATES, k), exclude_book_ids={book_id})
+    }
+
+    # 책마다 저장된 목록의 마지막 순위 점수보다 높으면 그 책의 목록에 새로 들어간다.
+        # - 목록이 k개보다 짧으면(책 수가 적었을 때 / k 변경) 자리가 남았으므로 항상 들어간다.
+    last_scores = {
+        row["book_id"]: row["last_score"] if row["last_rank"] >= k - 1 else float("-inf")
+        for row in BookNeighbor.objects.filter(book_id__in=list(scores)).values("book_id").order_by().annotate(
+            last_rank=Max("rank"), last_score=Min("score"),
+        )
+    }
+    entering = {
+        other_id for other_id, score in scores.items()
+        if score > last_scores.get(other_id, float("-inf"))
+    }
+    reverse = set(BookNeighbor.objects.filter(neighbor_id=book_id).values_list("book_id", flat=True))
+
+    targets = [book_id] + sorted((entering | reverse) - {book_id})
+    _recompute_neighbors(index, targets, k, BLOCK_SIZE)
+
+    print(
+        f"[debug] book neighbors updated book_id={book_id} "
+        f"entering={len(entering)} reverse={len(reverse)}"
+    )
+    return len(targets)
+
+
+def _recompute_neighbors(index: BookVectorIndex, book_ids: list[int], k: int, block_size: int) -> int:
+    written = 0
+    for start in range(0, len(book_ids), block_size):
+        found, vectors = index.get_vectors(book_ids[start:start + block_size])
+        if not found:
+            continue
+
+        # 자기 자신을 빼기 위해 k + 1개를 받는다.
+        results = index.search_batch(vectors, k=k + 1)
+
+        rows = []
+        for book_id, hits in zip(found, results):
+            hits = [hit for hit in hits if hit["book_id"] != book_id][:k]
+            rows.extend(
+                BookNeighbor(book_id=book_id, neighbor_id=hit["book_id"], rank=rank, score=hit["score"])
+                for rank, hit in enumerate(hits)
+            )
+
+        with transaction.atomic():
+            BookNeighbor.objects.filter(book_id__in=found).delete()
+            BookNeighbor.objects.bulk_create(rows)
+        written += len(rows)
+    return written
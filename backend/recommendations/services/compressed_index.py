@@ -0,0 +1,425 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from django.conf import settings
+
+from recommendations.models import BookVector
+from recommendations.services.vector_index import BookVectorIndex, _normalize_rows, sync_index_from_db
+
+
+# ================================================================
+#  압축 ANN 인덱스 (IVF + int8 잔차 + Matryoshka 차원 절단)
+# ================================================================
+
+# 3072차원 float32 벡터(권당 12KB)를 전부 스캔하지 않고도 추천 검색을 할 수 있도록 한다.
+# - text-embedding-3-large는 앞쪽 차원만 잘라 써도(Matryoshka) 의미가 유지되므로 앞 TRUNC_DIM 차원만 쓴다.
+# - k-means로 나눈 N_LISTS개 군집(IVF) 중 쿼리와 가까운 N_PROBE개 군집의 책만 본다.
+# - 군집 중심과의 차이(잔차)를 차원별 스케일로 int8 양자화해 저장한다. (권당 TRUNC_DIM 바이트)
+# - 근사 점수 상위 RERANK개는 BookVector의 원본 벡터로 정확한 코사인 점수를 다시 계산한다.
+INDEX_PATH = getattr(
+    settings,
+    "RECOMMEND_COMPRESSED_INDEX_PATH",
+    os.path.join(settings.BASE_DIR, "recommendations", "vector_db", "compressed_index.npz"),
+)
+TRUNC_DIM = getattr(settings, "RECOMMEND_COMPRESSED_DIM", 512)
+N_PROBE = getattr(settings, "RECOMMEND_COMPRESSED_PROBE", 8)
+RERANK = getattr(settings, "RECOMMEND_COMPRESSED_RERANK", 100)
+
+KMEANS_ITERATIONS = 20
+ASSIGN_BLOCK_SIZE = 4096
+RECALL_SAMPLE_QUERIES = 200
+RECALL_DB_QUERIES = 20 # 재순위 벡터를 실제 서비스처럼 DB에서 읽어 시간을 재는 쿼리 수
+
+
+class CompressedBookIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.dim = 0 # 절단 후 차원
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.scale = np.zeros(0, dtype=np.float32)
+        self.codes = np.zeros((0, 0), dtype=np.int8)
+        self.lists = np.zeros(0, dtype=np.int32) # 행별 군집 번호
+        self.offsets = np.zeros(1, dtype=np.int64) # 군집별 행 범위 (빌드 시 군집 순으로 정렬)
+        self.sorted_size = 0 # 이 뒤의 행은 빌드 이후 추가된 책 (항상 스캔)
+        self.book_ids = np.zeros(0, dtype=np.int64)
+        self.category_ids = np.zeros(0, dtype=np.int64)
+        self.isbns: list[str] = []
+        self._row_by_book_id: dict[int, int] = {}
+        self.built_at = None
+        # 빌드에 쓴 책 벡터의 기준 시각. 이후 저장된 벡터는 sync_index_from_db가 upsert로 따라간다.
+        self.source_at = None
+        self.synced_until = None
+        self.synced_rows = {}
+        self.checked_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.centroids.nbytes + self.scale.nbytes + self.codes.nbytes + self.lists.nbytes)
+
+    # ------------------------------------------------------------
+    #  빌드
+    # ------------------------------------------------------------
+
+    @classmethod
+    def build(cls, book_ids, isbns, category_ids, matrix, dim: int = TRUNC_DIM, n_lists: int | None = None, seed: int = 0):
+        index = cls()
+        x = _truncate(matrix, dim)
+        n = x.shape[0]
+        n_lists = n_lists or int(np.clip(np.sqrt(n), 1, 1024))
+        n_lists = max(1, min(n_lists, n))
+
+        centroids = _spherical_kmeans(x, n_lists, seed)
+        assign = _assign(x, centroids)
+
+        # 군집 순으로 정렬해 두면 군집 하나가 연속된 행 범위가 된다.
+        order = np.argsort(assign, kind="stable")
+        x, assign = x[order], assign[order]
+
+        residual = x - centroids[assign]
+        scale = np.abs(residual).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+
+        index.dim = x.shape[1]
+        index.centroids = centroids
+        index.scale = scale.astype(np.float32)
+        index.codes = np.clip(np.rint(residual / scale), -127, 127).astype(np.int8)
+        index.lists = assign.astype(np.int32)
+        index.offsets = np.searchsorted(assign, np.arange(n_lists + 1)).astype(np.int64)
+        index.sorted_size = n
+        index.book_ids = np.asarray(book_ids, dtype=np.int64)[order]
+        index.category_ids = np.asarray(category_ids, dtype=np.int64)[order]
+        index.isbns = [isbns[i] for i in order]
+        index._row_by_book_id = {int(b): i for i, b in enumerate(index.book_ids)}
+        index.built_at = time.time()
+        return index
+
+    # ------------------------------------------------------------
+    #  증분 추가 (빌드 이후 새로 저장된 책)
+    # ------------------------------------------------------------
+
+    def upsert(self, book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+        with self._lock:
+            if not self.dim or np.asarray(vector).reshape(-1).shape[0] < self.dim:
+                return
+            x = _truncate(np.asarray(vector, dtype=np.float32)[None, :], self.dim)[0]
+
+            row = self._row_by_book_id.get(book_id)
+            if row is not None:
+                # 기존 행은 군집을 유지한 채 잔차만 다시 양자화한다. (재순위에서 정확한 점수로 보정됨)
+                self.codes[row] = self._encode(x, int(self.lists[row]))
+                self.category_ids[row] = category_id or 0
+                return
+
+            list_id = int(np.argmax(self.centroids @ x))
+            self.codes = np.vstack([self.codes, self._encode(x, list_id)[None, :]])
+            self.lists = np.append(self.lists, np.int32(list_id))
+            self.book_ids = np.append(self.book_ids, np.int64(book_id))
+            self.category_ids = np.append(self.category_ids, np.int64(category_id or 0))
+            self.isbns.append(str(isbn or ""))
+            self._row_by_book_id[book_id] = len(self.book_ids) - 1
+
+    def _encode(self, x: np.ndarray, list_id: int) -> np.ndarray:
+        return np.clip(np.rint((x - self.centroids[list_id]) / self.scale), -127, 127).astype(np.int8)
+
+    # ------------------------------------------------------------
+    #  검색
+    # ------------------------------------------------------------
+
+    def search(
+        self,
+        query,
+        k: int = 10,
+        exclude_book_ids=None,
+        category_id: int | None = None,
+        n_probe: int = N_PROBE,
+        rerank: int = RERANK,
+        rerank_vectors=None,
+    ) -> list[dict]:
+        """
+        반환값: [{"book_id", "isbn13", "score"}, ...] (정확한 코사인 점수 내림차순)
+        rerank_vectors(book_ids) -> (찾은 book_ids, 정규화된 원본 행렬). 기본값은 BookVector에서 읽는다.
+        """
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if len(self.book_ids) == 0 or q.shape[0] < self.dim:
+                return []
+            qt = _truncate(q[None, :], self.dim)[0]
+
+            coarse = self.centroids @ qt
+            order = np.argsort(-coarse)
+            n_probe = min(n_probe, len(coarse))
+            filtered = bool(exclude_book_ids) or category_id is not None
+            exclude = np.fromiter(exclude_book_ids, dtype=np.int64) if exclude_book_ids else None
+            tail = np.arange(self.sorted_size, len(self.book_ids))
+
+            while True:
+                rows = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in order[:n_probe]]
+                rows.append(tail)
+                rows = np.concatenate(rows)
+
+                # qt · (중심 + 잔차) = qt · 중심 + (qt * scale) · code
+                approx = coarse[self.lists[rows]] + self.codes[rows].astype(np.float32) @ (qt * self.scale)
+                book_ids = self.book_ids[rows]
+                if exclude is not None:
+                    approx[np.isin(book_ids, exclude)] = -np.inf
+                if category_id is not None:
+                    approx[self.category_ids[rows] != category_id] = -np.inf
+
+                # 조건(좁은 카테고리 / 제외)에 맞는 후보가 k개보다 적으면 군집을 두 배씩 더 본다.
+                # 모든 군집을 보면 전체 후보를 재순위하는 것과 같다. (조건에 맞는 책이 k개 이상이면 항상 k개)
+                if not filtered or n_probe >= len(coarse) or np.isfinite(approx).sum() >= k:
+                    break
+                n_probe = min(n_probe * 2, len(coarse))
+
+            if rows.size == 0:
+                return []
+            isbn_by_id = {int(book_ids[i]): self.isbns[r] for i, r in enumerate(rows)}
+
+        n_cand = min(max(rerank, k), approx.size)
+        top = np.argpartition(-approx, n_cand - 1)[:n_cand]
+        candidates = [int(book_ids[i]) for i in top if np.isfinite(approx[i])]
+        if not candidates:
+            return []
+
+        # 후보만 원본 벡터로 정확한 점수를 다시 계산한다.
+        found, full = (rerank_vectors or _load_full_vectors)(candidates)
+        if not found:
+            return []
+        scores = full @ _normalize_rows(q[None, :])[0]
+        order = np.argsort(-scores)[:k]
+        return [
+            {"book_id": found[i], "isbn13": isbn_by_id.get(found[i], ""), "score": float(scores[i])}
+            for i in order
+        ]
+
+    # ------------------------------------------------------------
+    #  저장 / 적재
+    # ------------------------------------------------------------
+
+    def save(self, path: str = INDEX_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        with self._lock:
+            np.savez(
+                tmp,
+                centroids=self.centroids,
+                scale=self.scale,
+                codes=self.codes,
+                lists=self.lists,
+                offsets=self.offsets,
+                sorted_size=np.int64(self.sorted_size),
+                book_ids=self.book_ids,
+                category_ids=self.category_ids,
+                isbns=np.asarray(self.isbns, dtype=str),
+                built_at=np.float64(self.built_at or time.time()),
+                source_at=np.float64(self.source_at or self.built_at or time.time()),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH):
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index.centroids = data["centroids"]
+            index.scale = data["scale"]
+            index.codes = data["codes"]
+            index.lists = data["lists"]
+            index.offsets = data["offsets"]
+            index.sorted_size = int(data["sorted_size"])
+            index.book_ids = data["book_ids"]
+            index.category_ids = data["category_ids"]
+            index.isbns = [str(x) for x in data["isbns"]]
+            index.built_at = float(data["built_at"])
+            index.source_at = float(data["source_at"]) if "source_at" in data.files else index.built_at
+        index.synced_until = datetime.fromtimestamp(index.source_at, tz=timezone.utc)
+        index.dim = index.centroids.shape[1]
+        index._row_by_book_id = {int(b): i for i, b in enumerate(index.book_ids)}
+        return index
+
+
+def _truncate(matrix: np.ndarray, dim: int) -> np.ndarray:
+    # 앞 dim 차원만 남기고 다시 정규화 (Matryoshka)
+    return _normalize_rows(np.asarray(matrix, dtype=np.float32)[:, :dim])
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assign = np.empty(x.shape[0], dtype=np.int64)
+    for start in range(0, x.shape[0], ASSIGN_BLOCK_SIZE):
+        block = x[start:start + ASSIGN_BLOCK_SIZE]
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+def _spherical_kmeans(x: np.ndarray, n_lists: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(x.shape[0], n_lists, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assign = _assign(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=n_lists)
+
+        # 빈 군집은 임의의 점으로 다시 시작한다.
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = x[rng.choice(x.shape[0], int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+def _load_full_vectors(book_ids: list[int]) -> tuple[list[int], np.ndarray]:
+    found, vectors = [], []
+    dim = None
+    for row in BookVector.objects.filter(book_id__in=book_ids).only(
+        "book_id", "vector", "vector_blob", "vector_dtype", "embedding_model", "embedding_dim",
+    ):
+        vec = row.get_vector_array()
+        if vec is None or (dim is not None and vec.shape[0] != dim):
+            continue
+        dim = vec.shape[0]
+        found.append(row.book_id)
+        vectors.append(vec)
+    if not vectors:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    return found, _normalize_rows(np.vstack(vectors))
+
+
+# ================================================================
+#  빌드 + recall@10 보고서
+# ================================================================
+
+def build_compressed_index(
+    dim: int = TRUNC_DIM,
+    n_lists: int | None = None,
+    n_probe: int = N_PROBE,
+    rerank: int = RERANK,
+    path: str = INDEX_PATH,
+) -> dict:
+    started = time.perf_counter()
+    source_at = time.time()
+
+    source = BookVectorIndex()
+    source.load_from_db()
+    found, isbns, category_ids, matrix = source.export()
+    if not found:
+        return {"books": 0}
+
+    index = CompressedBookIndex.build(found, isbns, category_ids, matrix, dim=dim, n_lists=n_lists)
+    index.source_at = source_at
+    build_seconds = round(time.perf_counter() - started, 2)
+    index.save(path)
+
+    report = {
+        "books": len(found),
+        "full_dim": int(matrix.shape[1]),
+        "dim": index.dim,
+        "lists": int(index.centroids.shape[0]),
+        "probe": n_probe,
+        "rerank": rerank,
+        "index_bytes": index.nbytes,
+        "full_bytes": int(matrix.nbytes),
+        "build_seconds": build_seconds,
+        **_recall_report(index, found, matrix, k=10, n_probe=n_probe, rerank=rerank),
+    }
+    with open(f"{os.path.splitext(path)[0]}.report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def _recall_report(index: CompressedBookIndex, book_ids: list[int], matrix: np.ndarray, k: int, n_probe: int, rerank: int) -> dict:
+    # 책 벡터 일부를 쿼리로 써서 exact 검색 top-k와 겹치는 비율을 잰다. (자기 자신 제외)
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(book_ids), min(RECALL_SAMPLE_QUERIES, len(book_ids)), replace=False)
+    row_by_id = {book_id: i for i, book_id in enumerate(book_ids)}
+
+    def rerank_vectors(ids):
+        return ids, matrix[[row_by_id[i] for i in ids]]
+
+    hits = total = 0
+    exact_ms = approx_ms = db_ms = 0.0
+    db_queries = min(RECALL_DB_QUERIES, len(sample))
+    for n_done, i in enumerate(sample):
+        query = matrix[i]
+
+        t = time.perf_counter()
+        scores = matrix @ query
+        scores[i] = -np.inf
+        kk = min(k, len(book_ids) - 1)
+        exact = set() if kk <= 0 else {book_ids[j] for j in np.argpartition(-scores, kk - 1)[:kk]}
+        exact_ms += (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        approx = index.search(
+            query, k=k, exclude_book_ids={book_ids[i]}, n_probe=n_probe, rerank=rerank, rerank_vectors=rerank_vectors,
+        )
+        approx_ms += (time.perf_counter() - t) * 1000
+
+        # 서비스 경로: 후보의 원본 벡터를 BookVector에서 읽는 시간까지 포함 (일부 쿼리만)
+        if n_done < db_queries:
+            t = time.perf_counter()
+            index.search(query, k=k, exclude_book_ids={book_ids[i]}, n_probe=n_probe, rerank=rerank)
+            db_ms += (time.perf_counter() - t) * 1000
+
+        hits += len(exact & {hit["book_id"] for hit in approx})
+        total += len(exact)
+
+    n = max(len(sample), 1)
+    return {
+        "recall_at_10": round(hits / total, 4) if total else 1.0,
+        "queries": len(sample),
+        "exact_ms_avg": round(exact_ms / n, 3),
+        "compressed_ms_avg": round(approx_ms / n, 3), # 재순위 벡터를 메모리에서 읽은 경우
+        "compressed_db_ms_avg": round(db_ms / max(db_queries, 1), 3), # 재순위 벡터를 DB에서 읽은 경우 (실제 검색 경로)
+        "db_queries": db_queries,
+    }
+
+
+# ================================================================
+#  프로세스 전역 인덱스
+# ================================================================
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+_missing_logged = False
+
+
+def get_compressed_index() -> CompressedBookIndex | None:
+    # build_compressed_index로 파일이 바뀌면(mtime) 재시작 없이 다시 읽는다.
+    global _index, _index_mtime, _missing_logged
+    try:
+        mtime = os.stat(INDEX_PATH).st_mtime
+    except OSError:
+        if not _missing_logged:
+            print(f"[compressed_index] {INDEX_PATH} 없음 -> `manage.py build_compressed_index` 필요")
+            _missing_logged = True
+        return _index
+
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                _index = CompressedBookIndex.load(INDEX_PATH)
+                _index_mtime = mtime
+                print(f"[compressed_index] loaded rows={len(_index)} dim={_index.dim}")
+    # 빌드 이후 다른 프로세스가 저장한 책도 반영한다.
+    sync_index_from_db(_index)
+    return _index
+
+
+def upsert_compressed_index(book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+    # 이 프로세스의 인덱스만 바로 고친다. (다른 프로세스는 sync_index_from_db로 반영)
+    # 적재되지 않았다면 건너뛴다. (다음 빌드에 포함됨)
+    if _index is None:
+        return
+    _index.upsert(book_id, isbn, vector, category_id=category_id)
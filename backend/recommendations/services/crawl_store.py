@@ -0,0 +1,175 @@
+import hashlib
+from datetime import timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from recommendations.models import BookCrawlState, BookVector, CrawledReview
+from recommendations.services.embedding_cache import text_hash
+
+
+# ================================================================
+#  크롤링 결과 저장소 + 입력 변경 감지
+# ================================================================
+
+# 재빌드마다 모든 소스를 다시 요약(gpt-4o-mini)하고 임베딩하면, 새 리뷰가 없어도 LLM 지연과 비용이 든다.
+    # - 수집한 리뷰는 (source, ISBN, 본문 해시) 단위로 CrawledReview에 쌓는다.
+    # - 이번 입력 집합의 digest가 마지막으로 벡터를 만든 digest와 같으면 요약 / 임베딩을 건너뛴다.
+    # - 타임아웃 / 실패한 소스는 마지막으로 수집한 결과를 대신 사용한다. (일시적 실패로 digest가 흔들리지 않도록)
+    # - 저장된 결과가 있는데 이번 결과가 비어 있어도 마지막 결과를 사용한다. (빈 결과로 digest를 바꾸지 않음)
+
+
+def sync_crawled_reviews(isbn: str, crawled: dict[str, list[dict]], groups) -> list[dict]:
+    """
+    crawled: 크롤링 그룹(aladin / kyobo) -> 이번에 수집한 리뷰 목록. 실패한 그룹은 키가 없다.
+    반환: 이번 입력 집합 (그룹별로 이번 결과 또는 마지막 저장 결과), 각 항목에 content_hash 포함
+    """
+    now = timezone.now()
+    merged = []
+    for group in groups:
+        rows = _dedup_rows(crawled[group]) if group in crawled else []
+        if rows:
+            _upsert_rows(isbn, rows, now)
+        elif group in crawled:
+            # 이전에 리뷰가 있던 책이 갑자기 0건이면 일시적인 수집 오류로 보고 마지막 결과를 유지한다.
+            rows = _load_latest_rows(isbn, group)
+            if rows:
+                print(f"[debug] crawl store empty result kept previous group={group} isbn={isbn} rows={len(rows)}")
+        else:
+            rows = _load_latest_rows(isbn, group)
+            print(f"[debug] crawl store fallback group={group} isbn={isbn} rows={len(rows)}")
+        merged.extend(rows)
+    return merged
+
+
+def _dedup_rows(reviews: list[dict]) -> list[dict]:
+    rows = {}
+    for review in reviews:
+        text = (review.get("review_text") or "").strip()
+        if not text:
+            continue
+        row = dict(review, review_text=text, content_hash=text_hash(text))
+        rows.setdefault((row["source"], row["content_hash"]), row)
+    return list(rows.values())
+
+
+def _upsert_rows(isbn: str, rows: list[dict], now) -> None:
+    if not rows:
+        return
+    CrawledReview.objects.bulk_create(
+        [
+            CrawledReview(
+                isbn=isbn,
+                source=row["source"],
+                content_hash=row["content_hash"],
+                review_text=row["review_text"],
+                rating=_to_float(row.get("rating")),
+                review_date=str(row.get("review_date") or "")[:50],
+                blog_url=row.get("blog_url") or "",
+                last_seen_at=now,
+            )
+            for row in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+    # 이미 있던 행도 이번 수집 시각으로 맞춘다. (마지막 수집 결과 = last_seen_at이 가장 최근인 행)
+    hashes_by_source: dict[str, list[str]] = {}
+    for row in rows:
+        hashes_by_source.setdefault(row["source"], []).append(row["content_hash"])
+    for source, hashes in hashes_by_source.items():
+        CrawledReview.objects.filter(isbn=isbn, source=source, content_hash__in=hashes).update(last_seen_at=now)
+
+
+def _load_latest_rows(isbn: str, group: str) -> list[dict]:
+    qs = CrawledReview.objects.filter(isbn=isbn, source__startswith=group)
+    latest = qs.aggregate(latest=Max("last_seen_at"))["latest"]
+    if latest is None:
+        return []
+    return [
+        {
+            "isbn13": isbn,
+            "source": row.source,
+            "review_text": row.review_text,
+            "rating": row.rating,
+            "review_date": row.review_date or None,
+            "blog_url": row.blog_url or None,
+            "content_hash": row.content_hash,
+        }
+        for row in qs.filter(last_seen_at=latest).order_by("id")
+    ]
+
+
+def _to_float(value) -> float | None:
+    try:
+        return float(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+# ================================================================
+#  digest / 상태
+# ================================================================
+
+def compute_input_digest(rows: list[dict]) -> str:
+    # 순서와 무관하게 같은 (source, 본문) 집합이면 같은 digest
+    keys = sorted(f"{row['source']}:{row['content_hash']}" for row in rows)
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+def record_crawl_state(isbn: str, digest: str, count: int) -> BookCrawlState:
+    state, _ = BookCrawlState.objects.get_or_create(isbn=isbn)
+    if state.input_digest != digest:
+        state.changed_at = timezone.now()
+    state.input_digest = digest
+    state.input_count = count
+    state.save()
+    return state
+
+
+def is_book_vector_current(state: BookCrawlState, book) -> bool:
+    if not state.built_digest or state.is_stale:
+        return False
+    book_vector = BookVector.objects.filter(book=book).only(
+        "summary", "vector", "vector_blob", "vector_dtype", "embedding_model", "embedding_dim"
+    ).first()
+    if book_vector is None or book_vector.get_vector_array() is None:
+        return False
+    return text_hash(book_vector.summary) == state.built_summary_hash
+
+
+def mark_book_vector_built(isbn: str, digest: str, summary_text: str) -> None:
+    BookCrawlState.objects.filter(isbn=isbn).update(
+        built_digest=digest,
+        built_summary_hash=text_hash(summary_text),
+        built_at=timezone.now(),
+    )
+
+
+# ================================================================
+#  변경 리포트
+# ================================================================
+
+def get_crawl_change_report(days: int | None = None, changed_only: bool = False) -> list[dict]:
+    """
+    책별 마지막 크롤링 / 입력 변경 시각과 벡터가 최신 입력으로 만들어졌는지(stale) 여부.
+    days: 최근 N일 안에 입력이 바뀐 책만
+    changed_only: 입력이 바뀌었는데 아직 벡터에 반영되지 않은 책만
+    """
+    qs = BookCrawlState.objects.order_by("-changed_at", "isbn")
+    if days is not None:
+        qs = qs.filter(changed_at__gte=timezone.now() - timedelta(days=days))
+
+    report = []
+    for state in qs:
+        if changed_only and not state.is_stale:
+            continue
+        report.append({
+            "isbn": state.isbn,
+            "input_count": state.input_count,
+            "checked_at": state.checked_at,
+            "changed_at": state.changed_at,
+            "built_at": state.built_at,
+            "stale": state.is_stale,
+        })
+    return report
@@ -0,0 +1,189 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import IntegrityError
+
+from recommendations.models import EmbeddingCache
+from recommendations.my_source.embeddings import (
+    PROVIDER_MODEL_KEY,
+    make_embedding_text,
+    make_embeddings_batch,
+)
+from recommendations.vector_codec import encode_vector
+
+
+# ================================================================
+#  임베딩 캐시: 프로세스 LRU -> DB(EmbeddingCache) -> GMS 임베딩 API
+# ================================================================
+
+# 같은 리뷰를 추천 화면에서 다시 볼 때, 리뷰 파이프라인이 같은 텍스트를 다시 임베딩할 때,
+# 재빌드 결과 요약문이 이전과 같을 때 모두 API 호출 없이 기존 벡터를 돌려준다.
+LRU_SIZE = getattr(settings, "EMBEDDING_CACHE_LRU_SIZE", 512)
+
+_lock = threading.Lock()
+_lru: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+# 동일 키에 대한 동시 요청은 하나만 API를 호출하고 나머지는 결과를 기다린다. (single-flight)
+_inflight: dict[tuple[str, str], "_Call"] = {}
+
+_stats = {
+    "lru_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "inflight_waits": 0,
+    "errors": 0,
+}
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def cached_make_embeddings(data: Any) -> Optional[list[float]]:
+    """make_embeddings와 같은 입력/출력. 캐시를 먼저 확인한다."""
+    return cached_make_embeddings_batch([data])[0]
+
+
+def cached_make_embeddings_batch(items: list[Any]) -> list[Optional[list[float]]]:
+    """
+    make_embeddings_batch와 같은 입력/출력.
+    LRU/DB에서 찾지 못한 텍스트만 모아 배치 API로 한 번에 임베딩한다.
+    """
+    texts = [make_embedding_text(item) for item in items]
+    results: list[Optional[list[float]]] = [None] * len(texts)
+
+    lead: dict[tuple[str, str], list[int]] = {}   # 이 호출이 직접 계산할 키
+    follow: dict[tuple[str, str], list[int]] = {} # 다른 스레드가 계산 중인 키
+    calls: dict[tuple[str, str], _Call] = {}
+
+    with _lock:
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            key = (PROVIDER_MODEL_KEY, text_hash(text))
+            if key in lead:
+                lead[key].append(i)
+                continue
+            if key in follow:
+                follow[key].append(i)
+                continue
+
+            vec = _lru.get(key)
+            if vec is not None:
+                _lru.move_to_end(key)
+                _stats["lru_hits"] += 1
+                results[i] = vec
+                continue
+
+            call = _inflight.get(key)
+            if call is not None:
+                _stats["inflight_waits"] += 1
+                follow[key] = [i]
+                calls[key] = call
+            else:
+                call = _Call()
+                _inflight[key] = call
+                lead[key] = [i]
+                calls[key] = call
+
+    try:
+        found = _load_many_from_db(list(lead.keys()))
+        _count("db_hits", len(found))
+
+        missing = [key for key in lead if key not in found]
+        _count("misses", len(missing))
+        if missing:
+            vectors = make_embeddings_batch([texts[lead[key][0]] for key in missing])
+            for key, vec in zip(missing, vectors):
+                if vec:
+                    _store_to_db(key, vec)
+                    found[key] = vec
+                else:
+                    _count("errors")
+
+        for key, positions in lead.items():
+            vec = found.get(key)
+            if vec:
+                _remember(key, vec)
+            calls[key].result = vec
+            for i in positions:
+                results[i] = vec
+    finally:
+        with _lock:
+            for key in lead:
+                _inflight.pop(key, None)
+        for key in lead:
+            calls[key].event.set()
+
+    for key, positions in follow.items():
+        calls[key].event.wait()
+        for i in positions:
+            results[i] = calls[key].result
+
+    return results
+
+
+def _load_many_from_db(keys: list[tuple[str, str]]) -> dict[tuple[str, str], list[float]]:
+    if not keys:
+        return {}
+    rows = EmbeddingCache.objects.filter(
+        provider_model=PROVIDER_MODEL_KEY,
+        text_hash__in=[key[1] for key in keys],
+    ).only("text_hash", "vector_blob", "vector_dtype", "embedding_dim")
+
+    found = {}
+    for row in rows:
+        arr = row.get_vector_array()
+        if arr is not None:
+            found[(PROVIDER_MODEL_KEY, row.text_hash)] = arr.tolist()
+    return found
+
+
+def _store_to_db(key: tuple[str, str], vec: list[float]) -> None:
+    try:
+        EmbeddingCache.objects.create(
+            provider_model=key[0],
+            text_hash=key[1],
+            vector_blob=encode_vector(vec),
+            embedding_dim=len(vec),
+        )
+    except IntegrityError:
+        pass # 다른 프로세스가 먼저 저장한 경우
+
+
+def _remember(key: tuple[str, str], vec: list[float]) -> None:
+    with _lock:
+        _lru[key] = vec
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _lock:
+        _stats[name] += n
+
+
+def get_embedding_cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["lru_size"] = len(_lru)
+    lookups = stats["lru_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["lru_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+    return stats
@@ -0,0 +1,394 @@
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from recommendations.models import VectorJob
+
+
+# ================================================================
+#  DB 기반 작업 큐 + 고정 크기 워커 풀
+# ================================================================
+
+# 요청마다 스레드를 새로 띄우면 ISBN resolve / 리뷰 작성이 몰릴 때 크롤링, Selenium, LLM 호출이
+# 동시에 수십 개 실행되고, 재시작 시 진행 중이던 작업이 사라진다.
+    # - 작업은 VectorJob 테이블에 저장 → 재시작해도 남는다.
+    # - 같은 kind + dedup_key 의 대기 작업은 하나로 합친다.
+    # - 워커 수(VECTOR_JOB_WORKERS)만큼만 동시에 실행한다.
+    # - 실패 시 지수 백오프로 재시도한다.
+    # - 실행 중인 작업은 HEARTBEAT_SECONDS마다 heartbeat_at을 갱신한다. (lease)
+    #   LEASE_SECONDS 동안 갱신되지 않은 running 작업은 워커가 죽은 것으로 보고 다시 대기열로 돌린다.
+WORKERS = getattr(settings, "VECTOR_JOB_WORKERS", 2)
+POLL_SECONDS = getattr(settings, "VECTOR_JOB_POLL_SECONDS", 2.0)
+RETRY_BASE_SECONDS = getattr(settings, "VECTOR_JOB_RETRY_BASE_SECONDS", 30)
+HEARTBEAT_SECONDS = getattr(settings, "VECTOR_JOB_HEARTBEAT_SECONDS", 15)
+LEASE_SECONDS = getattr(settings, "VECTOR_JOB_LEASE_SECONDS", 60)
+
+_handlers: dict[str, callable] = {}
+_handlers_loaded = False
+
+_local = threading.local()
+
+_pool_lock = threading.Lock()
+_pool_threads: list[threading.Thread] = []
+_heartbeat_thread: threading.Thread | None = None
+_running_ids: set[int] = set() # 이 프로세스의 워커가 실행 중인 작업 id
+_running_lock = threading.Lock()
+_wake = threading.Event()
+_stop = threading.Event()
+
+
+def register_handler(kind: str, fn) -> None:
+    _handlers[kind] = fn
+
+
+def _load_handlers() -> None:
+    # 파이프라인 모듈이 import 될 때 register_handler로 자신을 등록한다.
+    global _handlers_loaded
+    if _handlers_loaded:
+        return
+    import recommendations.services.make_book_vector_pipeline_after_add_book  # noqa: F401
+    import recommendations.services.review_vector_pipeline  # noqa: F401
+    import recommendations.services.review_recommendations  # noqa: F401
+    import recommendations.services.vector_snapshot  # noqa: F401
+    import recommendations.services.book_neighbors  # noqa: F401
+    _handlers_loaded = True
+
+
+# ================================================================
+#  1) 작업 등록
+# ================================================================
+
+def enqueue_job(kind: str, dedup_key: str, payload: dict | None = None, priority: int = 0, delay_seconds: float = 0) -> VectorJob:
+    """
+    작업을 큐에 넣는다. 같은 키의 대기 작업이 이미 있으면 새로 만들지 않고 합친다.
+        - payload는 최신 요청 값으로 덮어쓴다.
+        - priority는 더 높은 값을 유지한다.
+    """
+    dedup_key = str(dedup_key)
+    payload = payload or {}
+    run_after = timezone.now() + timedelta(seconds=delay_seconds)
+
+    try:
+        with transaction.atomic():
+            job = VectorJob.objects.create(
+                kind=kind,
+                dedup_key=dedup_key,
+                payload=payload,
+                priority=priority,
+                run_after=run_after,
+            )
+    except IntegrityError:
+        job = VectorJob.objects.filter(kind=kind, dedup_key=dedup_key, status=VectorJob.Status.QUEUED).first()
+        if job is None: # 그 사이에 워커가 가져간 경우 다시 등록
+            return enqueue_job(kind, dedup_key, payload, priority, delay_seconds)
+        VectorJob.objects.filter(id=job.id).update(
+            payload=payload,
+            priority=max(job.priority, priority),
+            merged_count=F("merged_count") + 1,
+        )
+
+    # 관리 명령 / 셸 / 테스트에서는 워커를 띄우지 않고 큐에만 남긴다. (웹 서버 또는 run_vector_workers가 처리)
+    if should_start_in_process():
+        start_worker_pool()
+    _wake.set()
+    return job
+
+
+# ================================================================
+#  2) 작업 가져오기 / 실행
+# ================================================================
+
+def claim_next_job(worker_name: str) -> VectorJob | None:
+    now = timezone.now()
+    running_keys = set(
+        VectorJob.objects.filter(status=VectorJob.Status.RUNNING).values_list("kind", "dedup_key")
+    )
+    candidates = (
+        VectorJob.objects.filter(status=VectorJob.Status.QUEUED, run_after__lte=now)
+        .order_by("-priority", "run_after", "id")
+        .values_list("id", "kind", "dedup_key")[:20]
+    )
+    for job_id, kind, dedup_key in candidates:
+        # 같은 키가 실행 중이면 동시에 두 번 돌리지 않는다. (예: 같은 ISBN 중복 빌드)
+        if (kind, dedup_key) in running_keys:
+            continue
+        # compare-and-swap: 다른 워커가 먼저 가져갔다면 0건 갱신
+        claimed = VectorJob.objects.filter(id=job_id, status=VectorJob.Status.QUEUED).update(
+            status=VectorJob.Status.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+            worker=worker_name,
+        )
+        if claimed:
+            return VectorJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job: VectorJob) -> None:
+    _load_handlers()
+    handler = _handlers.get(job.kind)
+
+    _local.stages = {}
+    started = time.perf_counter()
+    try:
+        if handler is None:
+            raise RuntimeError(f"no handler for job kind={job.kind}")
+        handler(job.payload)
+    except Exception as e:
+        stages = _finish_stages(started)
+        _mark_failed(job, e, stages)
+        return
+
+    VectorJob.objects.filter(id=job.id).update(
+        status=VectorJob.Status.DONE,
+        finished_at=timezone.now(),
+        stage_timings=_finish_stages(started),
+        last_error="",
+    )
+
+
+def _mark_failed(job: VectorJob, error: Exception, stages: dict) -> None:
+    job.refresh_from_db(fields=["attempts", "max_attempts"])
+    message = "".join(traceback.format_exception_only(type(error), error)).strip()[:2000]
+    print(f"[job_queue] job={job.id} kind={job.kind} key={job.dedup_key} failed: {message}")
+
+    if job.attempts < job.max_attempts:
+        delay = RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+        try:
+            VectorJob.objects.filter(id=job.id).update(
+                status=VectorJob.Status.QUEUED,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                stage_timings=stages,
+                last_error=message,
+            )
+            return
+        except IntegrityError:
+            pass # 그 사이 같은 키의 새 작업이 대기 중이면 그 작업이 재시도를 대신한다.
+
+    VectorJob.objects.filter(id=job.id).update(
+        status=VectorJob.Status.FAILED,
+        finished_at=timezone.now(),
+        stage_timings=stages,
+        last_error=message,
+    )
+
+
+# ================================================================
+#  3) 단계별 소요 시간 기록
+# ================================================================
+
+@contextmanager
+def job_stage(name: str):
+    """
+    with job_stage("crawl"):
+        ...
+    워커 밖(동기 호출)에서 실행되면 기록 없이 그대로 통과한다.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    stages = getattr(_local, "stages", None)
+    if stages is None:
+        return
+    stages[name] = round(stages.get(name, 0.0) + seconds, 3)
+
+
+def _finish_stages(started: float) -> dict:
+    stages = getattr(_local, "stages", None) or {}
+    stages["total"] = round(time.perf_counter() - started, 3)
+    _local.stages = None
+    return stages
+
+
+# ================================================================
+#  4) 워커 풀
+# ================================================================
+
+def _process_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def start_worker_pool(size: int | None = None) -> None:
+    global _heartbeat_thread
+    size = size or WORKERS
+    with _pool_lock:
+        alive = [t for t in _pool_threads if t.is_alive()]
+        if len(alive) >= size:
+            return
+        if not alive:
+            _stop.clear()
+            # 이 프로세스는 방금 시작했으므로 같은 host:pid 이름으로 남은 running 작업은 이전 프로세스의 것이다.
+            # (컨테이너에서는 재시작 후 같은 pid를 받는 경우가 흔하다.)
+            recover_own_jobs()
+            recover_stale_jobs()
+        if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, daemon=True, name="vector-job-heartbeat")
+            _heartbeat_thread.start()
+        host = _process_name()
+        for i in range(len(alive), size):
+            thread = threading.Thread(
+                target=_worker_loop,
+                args=(f"{host}:w{i}",),
+                daemon=True,
+                name=f"vector-job-worker-{i}",
+            )
+            thread.start()
+            alive.append(thread)
+        _pool_threads[:] = alive
+
+
+def stop_worker_pool() -> None:
+    _stop.set()
+    _wake.set()
+
+
+def _worker_loop(worker_name: str) -> None:
+    while not _stop.is_set():
+        close_old_connections() # 스레드 환경에서 끊긴 커넥션 재사용 방지
+        try:
+            job = claim_next_job(worker_name)
+        except Exception as e:
+            print(f"[job_queue] claim failed: {e}")
+            job = None
+
+        if job is None:
+            _wake.wait(POLL_SECONDS)
+            _wake.clear()
+            continue
+
+        with _running_lock:
+            _running_ids.add(job.id)
+        try:
+            run_job(job)
+        finally:
+            with _running_lock:
+                _running_ids.discard(job.id)
+
+
+def _heartbeat_loop() -> None:
+    # 작업 핸들러가 오래 걸려도(크롤링, LLM) 별도 스레드에서 lease를 갱신한다.
+    # 같은 주기로 다른 프로세스가 남긴 만료된 작업도 회수한다.
+    while not _stop.wait(HEARTBEAT_SECONDS):
+        close_old_connections()
+        try:
+            with _running_lock:
+                job_ids = list(_running_ids)
+            if job_ids:
+                VectorJob.objects.filter(id__in=job_ids, status=VectorJob.Status.RUNNING).update(
+                    heartbeat_at=timezone.now()
+                )
+            recover_stale_jobs()
+        except Exception as e:
+            print(f"[job_queue] heartbeat failed: {e}")
+
+
+def recover_own_jobs() -> int:
+    prefix = f"{_process_name()}:"
+    with _running_lock:
+        running = list(_running_ids)
+    jobs = VectorJob.objects.filter(status=VectorJob.Status.RUNNING, worker__startswith=prefix).exclude(id__in=running)
+    return _requeue(jobs)
+
+
+def recover_stale_jobs() -> int:
+    # lease가 만료된 running 작업(워커 프로세스가 죽음)을 다시 대기열로 돌린다.
+    cutoff = timezone.now() - timedelta(seconds=LEASE_SECONDS)
+    jobs = VectorJob.objects.filter(status=VectorJob.Status.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    return _requeue(jobs)
+
+
+def _requeue(jobs) -> int:
+    recovered = 0
+    for job in jobs:
+        try:
+            recovered += VectorJob.objects.filter(id=job.id, status=VectorJob.Status.RUNNING).update(
+                status=VectorJob.Status.QUEUED,
+                run_after=timezone.now(),
+                heartbeat_at=None,
+            )
+        except IntegrityError:
+            VectorJob.objects.filter(id=job.id).update(
+                status=VectorJob.Status.FAILED,
+                finished_at=timezone.now(),
+                last_error="stale running job superseded by a newer queued job",
+            )
+    if recovered:
+        print(f"[job_queue] recovered {recovered} running jobs from dead workers")
+    return recovered
+
+
+def should_start_in_process() -> bool:
+    if not getattr(settings, "VECTOR_JOB_RUN_IN_PROCESS", True):
+        return False
+    return is_server_process()
+
+
+def is_server_process() -> bool:
+    # manage.py migrate 등 관리 명령에서는 백그라운드 스레드를 띄우지 않는다. (runserver 자식 프로세스 / WSGI·ASGI만)
+    argv = sys.argv
+    if argv and os.path.basename(argv[0]) == "manage.py":
+        if len(argv) < 2 or argv[1] != "runserver":
+            return False
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in argv
+    return True
+
+
+# ================================================================
+#  5) 상태 조회
+# ================================================================
+
+def get_job_status(limit: int = 50, status: str | None = None) -> dict:
+    counts = {choice: 0 for choice in VectorJob.Status.values}
+    for row in VectorJob.objects.values("status").order_by().annotate(n=Count("id")):
+        counts[row["status"]] = row["n"]
+
+    qs = VectorJob.objects.order_by("-id")
+    if status:
+        qs = qs.filter(status=status)
+
+    jobs = [
+        {
+            "id": job.id,
+            "kind": job.kind,
+            "key": job.dedup_key,
+            "status": job.status,
+            "priority": job.priority,
+            "attempts": job.attempts,
+            "merged_count": job.merged_count,
+            "stage_timings": job.stage_timings,
+            "last_error": job.last_error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "heartbeat_at": job.heartbeat_at,
+            "finished_at": job.finished_at,
+        }
+        for job in qs[:limit]
+    ]
+    return {"counts": counts, "jobs": jobs}
+
+
+def get_coalescing_stats(kind: str) -> dict:
+    # 대기 중에 합쳐진 요청 수 = 실행하지 않고 아낀 작업 수
+    agg = VectorJob.objects.filter(kind=kind).aggregate(
+        runs=Count("id", filter=Q(status=VectorJob.Status.DONE)),
+        saved=Sum("merged_count"),
+    )
+    return {"runs": agg["runs"] or 0, "saved": agg["saved"] or 0}
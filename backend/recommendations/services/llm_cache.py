@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import IntegrityError
+
+from recommendations.models import LLMResponseCache
+from recommendations.my_source.llm import configure_llm_gateway
+
+
+# ================================================================
+#  LLM 게이트웨이 영구 캐시 (DB)
+# ================================================================
+
+# my_source/llm 은 Django 없이도 동작하는 클라이언트이므로, 웹 / 워커 프로세스에서만 DB 캐시를 붙인다.
+class DatabasePromptCache:
+
+    def get(self, model: str, prompt_hash: str) -> dict | None:
+        row = (
+            LLMResponseCache.objects.filter(model=model, prompt_hash=prompt_hash)
+            .only("response_text", "prompt_tokens", "completion_tokens")
+            .first()
+        )
+        if row is None:
+            return None
+        return {
+            "content": row.response_text,
+            "prompt_tokens": row.prompt_tokens,
+            "completion_tokens": row.completion_tokens,
+        }
+
+    def set(self, model: str, prompt_hash: str, result: dict) -> None:
+        try:
+            LLMResponseCache.objects.create(
+                model=model,
+                prompt_hash=prompt_hash,
+                response_text=result["content"],
+                prompt_tokens=result.get("prompt_tokens", 0),
+                completion_tokens=result.get("completion_tokens", 0),
+            )
+        except IntegrityError:
+            pass # 다른 프로세스가 먼저 저장한 경우
+
+
+def install_llm_gateway() -> None:
+    configure_llm_gateway(
+        rpm=getattr(settings, "LLM_REQUESTS_PER_MINUTE", None),
+        tpm=getattr(settings, "LLM_TOKENS_PER_MINUTE", None),
+        prompt_cache=DatabasePromptCache() if getattr(settings, "LLM_PROMPT_CACHE", True) else None,
+    )
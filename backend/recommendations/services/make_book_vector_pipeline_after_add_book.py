@@ -1,38 +1,36 @@
-import json
-import os
-import threading
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 
 from django.conf import settings
-from django.db import close_old_connections
-from langchain_community.vectorstores import Chroma
+from django.db import close_old_connections, connections
 from langchain_core.documents import Document
-from langchain_core.embeddings import Embeddings
 
 from books.models import Book
-from recommendations.models import BookVector
+from recommendations.models import BookVector, ExternalProductId, VectorJob
 from recommendations.my_source.crollers.aladin_croller.get_reviews_from_aladin import (
-    get_aladin_item_id,
     crawl_short_reviews as aladin_crawl_short_reviews,
 )
-from recommendations.my_source.crollers.kyobo_crollers.get_reviews_from_kyobo import (
-    get_kyobo_product_id,
-    crawl_kyobo_reviews_selenium,
+from recommendations.my_source.crollers.kyobo_crollers.get_kyobo_detail_page import (
+    crawl_kyobo_detail_page,
 )
-from recommendations.my_source.crollers.kyobo_crollers.get_kyobo_publisher_review import (
-    get_kyobo_product_id as get_kyobo_publisher_product_id,
-    crawl_kyobo_book_descriptions,
+from recommendations.my_source.summary.summarizer.summarize_book_sources import (
+    summarize_book_sources,
 )
-from recommendations.my_source.summary.summarizer.summarize_aladin_short_reviews import (
-    summarize_aladin_short_reviews,
+from recommendations.services.book_neighbors import enqueue_neighbor_update
+from recommendations.services.compressed_index import upsert_compressed_index
+from recommendations.services.crawl_store import (
+    compute_input_digest,
+    is_book_vector_current,
+    mark_book_vector_built,
+    record_crawl_state,
+    sync_crawled_reviews,
 )
-from recommendations.my_source.summary.summarizer.summarize_kyobo_reviews import (
-    summarize_kyobo_reviews,
-)
-from recommendations.my_source.summary.summarizer.summarize_kyobo_publisher_reviews import (
-    summarize_kyobo_publisher_reviews,
-)
-from recommendations.my_source.embeddings import make_embeddings
+from recommendations.services.embedding_cache import cached_make_embeddings
+from recommendations.services.job_queue import enqueue_job, job_stage, record_stage, register_handler
+from recommendations.services.product_id_lookup import lookup_product_id
+from recommendations.services.vector_index import upsert_book_vector_index
+from recommendations.services.vector_store import upsert_documents
 
 
 # Model + vector DB config
@@ -42,42 +40,11 @@ MODEL_NAME = "text-embedding-3-large"
 # 이 벡터가 어떤 공급자 + 어떤 모델로 만들어졌는지를 명시하는 식별자
 PROVIDER_MODEL_KEY = "gms-openai::text-embedding-3-large"
 
-# Chroma 내부 collection 이름으로, openai_large 임베딩만 담는 컬렉션의 논리적 이름
-COLLECTION_NAME = "reviews_openai_large"
-
-# 벡터 DB를 Django 프로젝트 내부에 파일로 저장할 때의 경로설정
-    # - project/vectordb/openai_large/chroma.sqlite3 <- 메타데이터 + 내부 관리 데이터 DB
-    # - project/vectordb/openai_large/index/ <- 실제 벡터 검색을 위한 고속 인덱스 (사람이 읽을 수 있는 데이터가 아님)
-    # - 서버를 재시작해도 벡터가 유지(persist)된다.
-VECTOR_DB_DIR = os.path.join(
-    settings.BASE_DIR,
-    "recommendations",
-    "vector_db",
-    "openai_large_test",
-    "Book_vector_db",
-)
-
 # GMS OpenAI Gateway
 OPENAI_EMBED_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1/embeddings"
 
-# LangChain의 Embeddings 인터페이스 구현
-    # - 임베딩을 내가 직접 계산해서 넣겠다는 선언
-class PrecomputedEmbedding(Embeddings):
-
-    # 벡터 차원 수 저장
-        # - Chroma는 내부적으로 차원 정보를 필요로 한다.
-    def __init__(self, dim: int | None):
-        self.dim = dim
-
-    # LangChain이 자동으로 임베딩 생성하지 못하게 차단한다.
-    def embed_documents(self, texts):
-        raise RuntimeError("Precomputed embeddings only") # 랭체인이 임베딩 생성시 에러
-
-    # 검색 시에도 LangChain이 자동 임베딩 생성하지 못하게 차단한다.
-        # - 쿼리 임베딩도 직접 생성하고자 한다.
-        # - LangChain은 저장소 역할만 하고, 임베딩 생성은 우리 서비스가 수행하겠다는 것.
-    def embed_query(self, text):
-        raise RuntimeError("Query embedding must be generated separately")
+# 작업 큐 우선순위 (클수록 먼저 실행)
+BOOK_VECTOR_BUILD_PRIORITY = 0
 
 # ================================================================
 #  1) 외부에서 호출하는 함수로, 비동기 처리의 진입점
@@ -85,12 +52,24 @@ class PrecomputedEmbedding(Embeddings):
 
 def enqueue_book_vector_build(isbn: str) -> None:
 
-    thread = threading.Thread( # 메인 요청 흐름을 막지 않도록 새 스레드 생성
-        target=_build_book_vector,
-        args=(isbn,),
-        daemon=True, # 서버 종료 시 같이 종료
+    # 메인 요청 흐름을 막지 않도록 DB 작업 큐에 등록하고, 고정 크기 워커 풀이 실행한다.
+        # - 같은 ISBN이 이미 대기 중이면 하나로 합쳐진다.
+        # - 서버가 재시작되어도 대기 중인 작업은 남는다.
+    if not isbn:
+        return
+    enqueue_job(
+        VectorJob.Kind.BOOK_VECTOR_BUILD,
+        dedup_key=isbn,
+        payload={"isbn": isbn},
+        priority=BOOK_VECTOR_BUILD_PRIORITY,
     )
-    thread.start() # 실제 비동기 실행
+
+
+def _run_book_vector_build_job(payload: dict) -> None:
+    _build_book_vector(payload.get("isbn", ""))
+
+
+register_handler(VectorJob.Kind.BOOK_VECTOR_BUILD, _run_book_vector_build_job)
 
 
 #  << 책 하나 → 요약 → 임베딩 → DB + Chroma 저장까지의 벡터 생성 파이프라인 >>
@@ -115,27 +94,28 @@ def _build_book_vector(isbn: str) -> None:
     # ================================================================
     #  2) 크롤링 시작
     # ================================================================
-    item_id = get_aladin_item_id(isbn)
-    if item_id:
-        aladin_short_reviews = aladin_crawl_short_reviews(item_id, isbn, max_pages=1)
-    else:
-        aladin_short_reviews = []
-
-    kyobo_reviews = []
-    try:
-        product_id = get_kyobo_product_id(isbn)
-        if product_id:
-            kyobo_reviews = crawl_kyobo_reviews_selenium(product_id, isbn)
-    except Exception:
-        kyobo_reviews = []
+    # 알라딘 / 교보 상세 페이지를 동시에 가져오므로 전체 소요 시간은 합이 아니라 가장 느린 소스 정도가 된다.
+        # - 예산(BOOK_CRAWL_BUDGET_SECONDS) 안에 끝난 소스만으로 요약을 진행한다.
+    with job_stage("crawl"):
+        crawled = _crawl_sources_concurrently(isbn)
+
+    # 수집 결과를 저장하고, 입력 집합이 마지막 빌드 때와 같으면 요약 / 임베딩을 건너뛴다.
+    with job_stage("store"):
+        inputs = sync_crawled_reviews(isbn, crawled, CRAWL_SOURCES)
+        input_digest = compute_input_digest(inputs)
+        state = record_crawl_state(isbn, input_digest, len(inputs))
+
+    if is_book_vector_current(state, book):
+        print(f"[debug] inputs unchanged -> skip summarize/embed isbn={isbn}")
+        record_stage("skipped_unchanged", 0.0)
+        return
 
-    kyobo_publisher_reviews = []
-    try:
-        product_id = get_kyobo_publisher_product_id(isbn)
-        if product_id:
-            kyobo_publisher_reviews = crawl_kyobo_book_descriptions(product_id, isbn)
-    except Exception:
-        kyobo_publisher_reviews = []
+    aladin_short_reviews = [r for r in inputs if r["source"].startswith("aladin")]
+    kyobo_reviews = [r for r in inputs if r["source"] == "kyobo_review"]
+    kyobo_publisher_reviews = [
+        r for r in inputs
+        if r["source"].startswith("kyobo") and r["source"] != "kyobo_review"
+    ]
 
     print(
         f"[debug] aladin_count={len(aladin_short_reviews)} "
@@ -164,16 +144,21 @@ def _build_book_vector(isbn: str) -> None:
         if review.get("review_text")
     ]
 
-    aladin_summary = summarize_aladin_short_reviews(aladin_texts) if aladin_texts else {}
-    kyobo_summary = summarize_kyobo_reviews(kyobo_texts) if kyobo_texts else {}
-    kyobo_publisher_summary = (
-        summarize_kyobo_publisher_reviews(kyobo_publisher_texts)
-        if kyobo_publisher_texts
-        else {}
-    )
+    # 세 소스를 한 번의 LLM 요청(JSON 스키마 응답)으로 요약한다. 실패하면 소스별 요청으로 대체.
+    with job_stage("summarize"):
+        summaries = summarize_book_sources(
+            aladin_texts,
+            kyobo_texts,
+            kyobo_publisher_texts,
+            combined=getattr(settings, "BOOK_SUMMARY_COMBINED", True),
+        )
+    aladin_summary = summaries["aladin"]
+    kyobo_summary = summaries["kyobo"]
+    kyobo_publisher_summary = summaries["kyobo_publisher"]
 
     print(
-        f"[debug] aladin_summary_len={len(aladin_summary.get('summary',''))} "
+        f"[debug] summary_mode={summaries['mode']} "
+        f"aladin_summary_len={len(aladin_summary.get('summary',''))} "
         f"kyobo_summary_len={len(kyobo_summary.get('summary',''))} "
         f"kyobo_pub_summary_len={len(kyobo_publisher_summary.get('summary',''))}"
     )
@@ -183,18 +168,22 @@ def _build_book_vector(isbn: str) -> None:
     #  4) 요약결과 임베딩
     # ================================================================
 
+    # 통합 요약이 있으면 그대로 쓰고, 소스별 요약만 있으면 이어 붙인다.
     summary_parts = [
         aladin_summary.get("summary", ""),
         kyobo_summary.get("summary", ""),
         kyobo_publisher_summary.get("summary", ""),
     ]
-    summary_text = _clean_text(" ".join([p for p in summary_parts if p]))
+    summary_text = _clean_text(
+        summaries.get("fused_summary") or " ".join([p for p in summary_parts if p])
+    )
     if not summary_text:
         return
 
     print(f"[debug] final_summary_len={len(summary_text)}")
 
-    emb = make_embeddings(summary_text) # GMS OpenAI를 호출하여 텍스트데이터를 임베딩
+    with job_stage("embed"):
+        emb = cached_make_embeddings(summary_text) # GMS OpenAI를 호출하여 텍스트데이터를 임베딩
     if not emb:
         return
 
@@ -202,26 +191,104 @@ def _build_book_vector(isbn: str) -> None:
     #  5) 임베딩 -> 벡터화
     # ================================================================
 
-    # 책당 하나의 벡터 DB
-        # - 벡터 DB(Chroma 컬렉션)는 하나지만 그 안에 문서(=벡터)는 여러 개 있을 수 있는 것.
-    BookVector.objects.update_or_create(
-        book=book, # book이 unique key 역할을 한다.
-        defaults={
-            "vector": json.dumps(emb), # float 배열을 JSON 문자열로 저장
-            "embedding_model": PROVIDER_MODEL_KEY, # 이 벡터가 어떤 모델인지 명시
-            "embedding_dim": len(emb), # 벡터의 차원 (추후 검증 / 마이그레이션 시 사용)
-        },
-    )
+    with job_stage("save"):
+        _save_book_vector(book, summary_text, emb)
+        mark_book_vector_built(isbn, input_digest, summary_text)
 
-    # 파일 기반 벡터 DB에 저장
-    _upsert_chroma(book, summary_text, emb)
 
+# 소스별 크롤링 함수 (각각 list[dict] 반환, 요청 실패 / 페이지 로드 실패는 예외)
+# 상품 id는 매핑 테이블(ExternalProductId)을 먼저 확인하고, 없을 때만 검색 페이지를 요청한다.
+def _crawl_aladin(isbn: str) -> list[dict]:
+    item_id = lookup_product_id(ExternalProductId.Provider.ALADIN, isbn)
+    if not item_id:
+        return []
+    return aladin_crawl_short_reviews(item_id, isbn, max_pages=1)
 
 
+# 교보 리뷰 + 책 소개는 같은 상세 페이지에서 한 번에 가져온다. (브라우저 1회, 페이지 로드 1회)
+def _crawl_kyobo(isbn: str) -> list[dict]:
+    product_id = lookup_product_id(ExternalProductId.Provider.KYOBO, isbn)
+    if not product_id:
+        return []
+    page = crawl_kyobo_detail_page(product_id, isbn)
+    return page["reviews"] + page["descriptions"]
 
 
+CRAWL_SOURCES = {
+    "aladin": _crawl_aladin,
+    "kyobo": _crawl_kyobo,
+}
 
 
+# 실패하면 None (빈 결과와 구분해 저장소의 마지막 수집 결과를 대신 쓰도록)
+def _timed_crawl(fn, isbn: str) -> tuple[list[dict] | None, float]:
+    started = time.perf_counter()
+    try:
+        reviews = fn(isbn)
+    except Exception as e:
+        print(f"[debug] crawl failed fn={fn.__name__} isbn={isbn}: {e}")
+        reviews = None
+    finally:
+        connections.close_all() # 크롤링 스레드에서 연 DB 커넥션(매핑 조회) 정리
+    return reviews, time.perf_counter() - started
+
+
+# 시간 안에 성공한 소스만 결과에 담는다. (타임아웃 / 실패한 소스는 키 없음)
+def _crawl_sources_concurrently(isbn: str) -> dict[str, list[dict]]:
+    budget = getattr(settings, "BOOK_CRAWL_BUDGET_SECONDS", 60)
+    source_timeouts = getattr(settings, "BOOK_CRAWL_SOURCE_TIMEOUTS", {})
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=len(CRAWL_SOURCES), thread_name_prefix="book-crawl")
+    futures = {
+        source: executor.submit(_timed_crawl, fn, isbn)
+        for source, fn in CRAWL_SOURCES.items()
+    }
+
+    results = {}
+    try:
+        for source, future in futures.items():
+            # 마감 시각은 모두 제출 시점 기준이다. (앞 소스를 기다린 시간만큼 뒤 소스의 타임아웃이 늘어나지 않게)
+                # - 소스별 타임아웃과 전체 예산 중 먼저 도달하는 쪽까지만 기다린다.
+            deadline = started + min(source_timeouts.get(source, budget), budget)
+            try:
+                reviews, elapsed = future.result(timeout=max(deadline - time.perf_counter(), 0))
+            except FuturesTimeoutError:
+                print(f"[debug] crawl timeout source={source} isbn={isbn}")
+                record_stage(f"crawl_{source}_timeout", time.perf_counter() - started)
+                continue
+            record_stage(f"crawl_{source}", elapsed)
+            if reviews is not None:
+                results[source] = reviews
+    finally:
+        # 시간 안에 끝나지 않은 소스는 기다리지 않는다. (스레드는 스스로 정리된다)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+# DB(BookVector) + 파일 기반 벡터 DB(Chroma) + 인메모리 인덱스에 같은 벡터를 반영
+def _save_book_vector(book: Book, summary_text: str, emb: list[float]) -> None:
+
+    # 책당 하나의 벡터 DB
+        # - 벡터 DB(Chroma 컬렉션)는 하나지만 그 안에 문서(=벡터)는 여러 개 있을 수 있는 것.
+    book_vector = BookVector.objects.filter(book=book).first() or BookVector(book=book) # book이 unique key 역할을 한다.
+    # float 배열을 float32(설정 시 float16) 바이트로 저장하고, 모델 키와 차원 수를 함께 기록한다.
+    book_vector.set_vector_array(emb, embedding_model=PROVIDER_MODEL_KEY)
+    book_vector.summary = summary_text
+    book_vector.save()
+
+    # 파일 기반 벡터 DB에 저장
+    _upsert_chroma(book, summary_text, emb)
+
+    # 인메모리 검색 인덱스에도 증분 반영 (전체 재적재 불필요)
+    upsert_book_vector_index(book.id, book.isbn, emb, category_id=book.category_id)
+    upsert_compressed_index(book.id, book.isbn, emb, category_id=book.category_id)
+
+    # 비슷한 책 목록은 이 책과 영향을 받는 책만 작업 큐에서 다시 계산한다.
+    if getattr(settings, "BOOK_NEIGHBOR_INCREMENTAL", True):
+        enqueue_neighbor_update(book.id)
+
 
 # 공백 제거
 def _clean_text(text: str) -> str:
@@ -229,16 +296,27 @@ def _clean_text(text: str) -> str:
     return text[:1500]
 
 
+# 벡터 DB 메타데이터
+    # - 추천 검색에서 where 조건(카테고리 / 원본 책 제외 / 출간 연도)을 벡터 DB 안에서 적용하는 데 쓴다.
+    # - Chroma 메타데이터는 None을 받지 않으므로 값이 없으면 0으로 저장한다.
+def build_vector_metadata(book: Book) -> dict:
+    return {
+        "isbn13": book.isbn,
+        "model": PROVIDER_MODEL_KEY,
+        "book_id": book.id,
+        "category_id": book.category_id or 0,
+        "published_year": _published_year(book.published_date),
+    }
+
+
+def _published_year(published_date: str | None) -> int:
+    match = re.search(r"(\d{4})", str(published_date or ""))
+    return int(match.group(1)) if match else 0
+
+
 # 파일 기반 벡터 DB에 저장
 def _upsert_chroma(book: Book, summary: str, emb: list[float]) -> None:
 
-    os.makedirs(VECTOR_DB_DIR, exist_ok=True) # 디렉터리가 없다면 생성
-    vectordb = Chroma(
-        collection_name=COLLECTION_NAME,
-        persist_directory=VECTOR_DB_DIR,
-        embedding_function=PrecomputedEmbedding(len(emb)),
-    )
-
     doc = Document(
 
         # 검색 시 반환될 텍스트로, 나중에 RAG에서 그대로 LLM에 들어간다.
@@ -246,30 +324,16 @@ def _upsert_chroma(book: Book, summary: str, emb: list[float]) -> None:
         page_content=summary,
 
         # 필터링 / 디버깅 / 재색인 시 핵심 메타데이터
-        metadata={
-            "isbn13": book.isbn,
-            "model": PROVIDER_MODEL_KEY,
-        },
+        metadata=build_vector_metadata(book),
     )
 
     # Chroma document id.
         # ISBN을 전역 유니크 키로 사용하게 된다.
-    book_id = str(book.isbn)
-    try:
-        # 기존 벡터 삭제
-        vectordb._collection.delete(ids=[book_id])
-    except Exception:
-        pass
-
-    vectordb._collection.add( # documents / metadatas / embeddings / ids 모두 길이가 같아야 한다.
+    # 프로세스 전역 컬렉션 핸들에 upsert 하므로 요청마다 persistent store를 다시 열지 않는다.
+    # (chromadb 0.4+ 는 쓰기 시 자동으로 디스크에 persist 된다.)
+    upsert_documents(
+        ids=[str(book.isbn)],
         documents=[doc.page_content],
         metadatas=[doc.metadata],
         embeddings=[emb],
-        ids=[book_id],
     )
-
-    # 디스크에 저장하여, 서버 재시작 후에도 유지되도록 한다.
-    vectordb.persist()
-
-
-
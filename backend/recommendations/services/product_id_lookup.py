@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from recommendations.models import ExternalProductId
+from recommendations.my_source.crollers.aladin_croller.get_reviews_from_aladin import get_aladin_item_id
+from recommendations.my_source.crollers.kyobo_crollers.get_reviews_from_kyobo import get_kyobo_product_id
+
+
+# ================================================================
+#  ISBN -> 외부 서점 상품 id 조회 (DB 매핑 테이블 우선)
+# ================================================================
+
+# 벡터를 만들거나 다시 만들 때마다 알라딘 / 교보 검색 페이지를 긁으면 책당 2~3번의 HTTP 왕복이 추가된다.
+# 매핑은 바뀌지 않으므로 ExternalProductId에 저장해 두고 먼저 확인한다.
+    # - 찾지 못한 결과도 저장하되 NEGATIVE_TTL_SECONDS 이후 다시 검색한다. (신간 등록 지연 대비)
+    # - resolver는 정상 검색 결과 페이지에서 상품이 없을 때만 None을 돌려준다.
+    #   네트워크 오류 / 429 / 5xx / 차단 페이지는 예외로 올라오므로 저장하지 않는다. (다음 호출에서 다시 시도)
+NEGATIVE_TTL_SECONDS = getattr(settings, "PRODUCT_ID_NEGATIVE_TTL_SECONDS", 60 * 60 * 24 * 7)
+
+RESOLVERS = {
+    ExternalProductId.Provider.ALADIN: get_aladin_item_id,
+    ExternalProductId.Provider.KYOBO: get_kyobo_product_id,
+}
+
+
+def lookup_product_id(provider: str, isbn: str) -> str | None:
+    if not isbn:
+        return None
+
+    row = ExternalProductId.objects.filter(provider=provider, isbn=isbn).first()
+    if row is not None and not row.is_expired:
+        return row.external_id or None
+
+    external_id = RESOLVERS[provider](isbn) # 일시적 실패는 예외로 호출한 쪽(크롤링)에 전달
+    _save_mapping(provider, isbn, external_id)
+    return external_id or None
+
+
+def _save_mapping(provider: str, isbn: str, external_id: str | None) -> None:
+    expires_at = None if external_id else timezone.now() + timedelta(seconds=NEGATIVE_TTL_SECONDS)
+    defaults = {"external_id": external_id or "", "expires_at": expires_at}
+    try:
+        ExternalProductId.objects.update_or_create(provider=provider, isbn=isbn, defaults=defaults)
+    except IntegrityError: # 다른 워커가 동시에 같은 ISBN을 저장한 경우
+        ExternalProductId.objects.filter(provider=provider, isbn=isbn).update(**defaults)
+
+
+# ================================================================
+#  배치 선조회 (prefill)
+# ================================================================
+
+def prefill_product_ids(provider: str, isbns: list[str], workers: int = 4, refresh: bool = False) -> dict:
+    """
+    매핑이 없거나 만료된 ISBN만 모아 병렬로 검색하고 한 번에 저장한다.
+    refresh=True면 저장된 매핑도 다시 검색한다.
+    """
+    isbns = list(dict.fromkeys(i.strip() for i in isbns if i and i.strip()))
+    targets = isbns
+    if not refresh:
+        known = {
+            row.isbn
+            for row in ExternalProductId.objects.filter(provider=provider, isbn__in=isbns)
+            if not row.is_expired
+        }
+        targets = [isbn for isbn in isbns if isbn not in known]
+
+    resolver = RESOLVERS[provider]
+
+    def _resolve(isbn: str):
+        try:
+            return isbn, resolver(isbn), None
+        except Exception as e:
+            return isbn, None, e
+
+    stats = {"total": len(isbns), "skipped": len(isbns) - len(targets), "found": 0, "not_found": 0, "errors": 0}
+
+    # 검색(HTTP)만 스레드에서 하고 DB 저장은 호출한 스레드에서 한다.
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="product-id-prefill") as executor:
+        for isbn, external_id, error in executor.map(_resolve, targets):
+            if error is not None:
+                print(f"[debug] product id lookup failed provider={provider} isbn={isbn}: {error}")
+                stats["errors"] += 1
+                continue
+            _save_mapping(provider, isbn, external_id)
+            stats["found" if external_id else "not_found"] += 1
+
+    return stats
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from recommendations.models import ReviewRecommendation, VectorJob
+from recommendations.services.embedding_cache import text_hash
+from recommendations.services.job_queue import enqueue_job, job_stage, register_handler
+from recommendations.services.recommendation_payload import compute_recommendation_payload
+from recommendations.services.review_vector_pipeline import _make_review_text
+from recommendations.services.vector_search import get_index_version
+from reviews.models import Review
+
+
+# ================================================================
+#  리뷰별 추천 결과 미리 계산 (precompute-on-write)
+# ================================================================
+
+# 임베딩 → 벡터 검색 → 키워드 추출 → 추천 사유 생성을 조회마다 하지 않는다.
+    # - 리뷰 작성 / 수정 직후 백그라운드에서 계산해 ReviewRecommendation에 저장
+    # - 저장 시 리뷰 본문 해시와 벡터 인덱스 버전을 함께 기록
+    # - 조회 시 본문이 바뀌었으면 저장된 결과를 먼저 주고 재계산을 예약 (stale-while-revalidate)
+    # - 인덱스 버전은 책 벡터가 저장될 때마다 바뀌므로(리뷰마다 책 재생성) 계산 후 MAX_STALENESS_SECONDS 동안은 버전 차이를 허용한다.
+    #   → 리뷰 하나당 재계산(LLM 키워드 / 사유 호출)은 이 간격에 최대 한 번
+REVIEW_RECOMMENDATION_PRIORITY = 8 # 리뷰 벡터 갱신(10) 다음, 책 재생성(5)보다 먼저
+MAX_STALENESS_SECONDS = getattr(settings, "REVIEW_RECOMMENDATION_MAX_STALENESS_SECONDS", 60 * 60 * 6)
+
+
+def enqueue_review_recommendation(review_id: int) -> None:
+    enqueue_job(
+        VectorJob.Kind.REVIEW_RECOMMENDATION,
+        dedup_key=review_id,
+        payload={"review_id": review_id},
+        priority=REVIEW_RECOMMENDATION_PRIORITY,
+    )
+
+
+def _run_review_recommendation_job(payload: dict) -> None:
+    close_old_connections()
+    review = Review.objects.select_related("book").filter(id=payload.get("review_id")).first()
+    if review:
+        refresh_review_recommendation(review)
+
+
+register_handler(VectorJob.Kind.REVIEW_RECOMMENDATION, _run_review_recommendation_job)
+
+
+def is_recommendation_current(stored: ReviewRecommendation, review_text: str) -> bool:
+    if stored.text_hash != text_hash(review_text):
+        return False
+    if stored.computed_at and timezone.now() - stored.computed_at < timedelta(seconds=MAX_STALENESS_SECONDS):
+        return True
+    return stored.index_version == get_index_version()
+
+
+def save_review_recommendation(review, review_text: str, payload: dict, index_version: str) -> ReviewRecommendation:
+    stored, _ = ReviewRecommendation.objects.update_or_create(
+        review=review,
+        defaults={
+            "payload": payload,
+            "text_hash": text_hash(review_text),
+            "index_version": index_version,
+        },
+    )
+    return stored
+
+
+def refresh_review_recommendation(review) -> ReviewRecommendation | None:
+    review_text = _make_review_text(review.title, review.content)
+    if not review_text:
+        ReviewRecommendation.objects.filter(review=review).delete()
+        return None
+
+    stored = ReviewRecommendation.objects.filter(review=review).first()
+    if stored and is_recommendation_current(stored, review_text):
+        return stored
+
+    # 계산 도중 책 벡터가 바뀌면 다음 조회에서 다시 계산되도록 시작 시점의 버전을 기록한다.
+    index_version = get_index_version()
+
+    with job_stage("recommend"):
+        payload = compute_recommendation_payload(review, review_text)
+    if payload is None:
+        return stored
+    return save_review_recommendation(review, review_text, payload, index_version)
@@ -1,30 +1,90 @@
-import json
-import threading
+import hashlib
+from datetime import timedelta
 
-from django.db import close_old_connections
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
 
-from recommendations.models import BookVector, UserProfileVector
-from recommendations.my_source.embeddings import make_embeddings
+from books.models import Book
+from recommendations.models import BookReviewSummary, BookReviewSummaryNode, VectorJob
 from recommendations.my_source.summary.summarizer.summarize_user_reviews import (
+    merge_user_review_summaries,
     summarize_user_reviews,
 )
-from recommendations.services.make_book_vector_pipeline_after_add_book import (
-    PROVIDER_MODEL_KEY,
-    _upsert_chroma,
-)
+from recommendations.services.embedding_cache import cached_make_embeddings
+from recommendations.services.job_queue import enqueue_job, job_stage, register_handler
+from recommendations.services.make_book_vector_pipeline_after_add_book import _save_book_vector
+from recommendations.services.user_profile import remove_review_contribution, upsert_review_contribution
 from reviews.models import Review
 
 
-ALPHA = 0.2
+# 사용자가 방금 쓴 리뷰가 반영되도록 신규 책 벡터 생성보다 먼저 처리한다.
+REVIEW_VECTOR_UPDATE_PRIORITY = 10
+BOOK_REVIEW_REBUILD_PRIORITY = 5
+
+# 책 벡터 재생성(리뷰 전체 재요약 + 재임베딩)은 리뷰마다 하지 않고 책 단위로 모아서 한 번 실행한다.
+    # - 첫 요청 후 REBUILD_WINDOW_SECONDS 동안 들어온 같은 책의 요청은 대기 작업 하나로 합쳐진다. (VectorJob dedup)
+    # - 같은 책의 직전 재생성이 끝난 뒤(실행 중이면 시작한 뒤) REBUILD_MIN_INTERVAL_SECONDS 이내에는 실행하지 않는다.
+    # - 실행 시점의 리뷰 전체를 다시 읽으므로 가장 최신 상태가 반영된다.
+REBUILD_WINDOW_SECONDS = getattr(settings, "REVIEW_REBUILD_WINDOW_SECONDS", 60)
+REBUILD_MIN_INTERVAL_SECONDS = getattr(settings, "REVIEW_REBUILD_MIN_INTERVAL_SECONDS", 300)
+
+# 요약 트리: 청크 하나에 담는 리뷰 수 / 한 번의 reduce 호출로 합치는 노드 수
+SUMMARY_CHUNK_REVIEWS = 10
+REDUCE_FANOUT = 8
 
 
 def enqueue_review_vector_update(review_id: int) -> None:
-    thread = threading.Thread(
-        target=_update_vectors_for_review,
-        args=(review_id,),
-        daemon=True,
+    enqueue_job(
+        VectorJob.Kind.REVIEW_VECTOR_UPDATE,
+        dedup_key=review_id,
+        payload={"review_id": review_id},
+        priority=REVIEW_VECTOR_UPDATE_PRIORITY,
+    )
+
+
+def _run_review_vector_update_job(payload: dict) -> None:
+    _update_vectors_for_review(payload.get("review_id"))
+
+
+register_handler(VectorJob.Kind.REVIEW_VECTOR_UPDATE, _run_review_vector_update_job)
+
+
+def enqueue_book_review_rebuild(book_id: int) -> None:
+    delay = REBUILD_WINDOW_SECONDS
+
+    # 실행 중인 재생성도 직전 재생성으로 본다. (시작 시각 기준, 끝나자마자 다음 작업이 돌지 않도록)
+    last_runs = VectorJob.objects.filter(
+        kind=VectorJob.Kind.BOOK_REVIEW_REBUILD,
+        dedup_key=str(book_id),
+    ).aggregate(
+        finished=Max("finished_at", filter=Q(status=VectorJob.Status.DONE)),
+        running=Max("started_at", filter=Q(status=VectorJob.Status.RUNNING)),
     )
-    thread.start()
+    last_run = max((at for at in last_runs.values() if at), default=None)
+    if last_run:
+        next_allowed = last_run + timedelta(seconds=REBUILD_MIN_INTERVAL_SECONDS)
+        delay = max(delay, (next_allowed - timezone.now()).total_seconds())
+
+    # 이미 대기 중인 작업이 있으면 합쳐지고(merged_count + 1) 실행 시각은 그대로 유지된다.
+    enqueue_job(
+        VectorJob.Kind.BOOK_REVIEW_REBUILD,
+        dedup_key=book_id,
+        payload={"book_id": book_id},
+        priority=BOOK_REVIEW_REBUILD_PRIORITY,
+        delay_seconds=delay,
+    )
+
+
+def _run_book_review_rebuild_job(payload: dict) -> None:
+    close_old_connections()
+    book = Book.objects.filter(id=payload.get("book_id")).first()
+    if book:
+        _update_book_vector_from_reviews(book)
+
+
+register_handler(VectorJob.Kind.BOOK_REVIEW_REBUILD, _run_book_review_rebuild_job)
 
 
 def _update_vectors_for_review(review_id: int) -> None:
@@ -40,11 +100,24 @@ def _update_vectors_for_review(review_id: int) -> None:
 
     review_text = _make_review_text(review.title, review.content)
     if review_text:
-        review_emb = make_embeddings(review_text)
+        with job_stage("embed_review"):
+            review_emb = cached_make_embeddings(review_text)
         if review_emb:
-            _update_user_profile_vector(review.user_id, review_emb)
+            # 수정된 리뷰면 이전 기여분을 빼고 새 값을 더한다.
+            with job_stage("profile"):
+                upsert_review_contribution(review.user_id, review.id, review_emb)
+    else:
+        with job_stage("profile"):
+            remove_review_contribution(review.id)
+
+    # 프로필은 리뷰마다 바로 갱신하고, 책 벡터 재생성은 책 단위로 모아서 실행한다.
+    enqueue_book_review_rebuild(review.book_id)
 
-    _update_book_vector_from_reviews(review.book)
+
+def on_review_deleted(review_id: int, book_id: int) -> None:
+    # 삭제된 리뷰의 기여분을 프로필 합계에서 빼고(O(dim)), 책 벡터는 재생성 대기열에 넣는다.
+    remove_review_contribution(review_id)
+    enqueue_book_review_rebuild(book_id)
 
 
 def _make_review_text(title: str | None, content: str | None) -> str:
@@ -52,64 +125,148 @@ def _make_review_text(title: str | None, content: str | None) -> str:
     return " ".join(parts).strip()
 
 
-def _update_user_profile_vector(user_id: int, review_emb: list[float]) -> None:
-    if not review_emb:
+def _update_book_vector_from_reviews(book) -> None:
+    with job_stage("summarize"):
+        rolling = _fold_reviews_into_summary(book)
+    if rolling is None:
+        return
+    summary_text = _clean_text(rolling.summary)
+    if not summary_text:
         return
 
-    profile, created = UserProfileVector.objects.get_or_create(
-        user_id=user_id,
-        defaults={"vector": json.dumps(review_emb)},
-    )
-    if created:
+    with job_stage("embed"):
+        emb = cached_make_embeddings(summary_text)
+    if not emb:
         return
 
-    try:
-        old = json.loads(profile.vector)
-    except Exception:
-        old = None
+    with job_stage("save"):
+        _save_book_vector(book, summary_text, emb)
 
-    if not isinstance(old, list) or len(old) != len(review_emb):
-        profile.vector = json.dumps(review_emb)
-    else:
-        new_vec = [
-            (1 - ALPHA) * o + ALPHA * r
-            for o, r in zip(old, review_emb)
-        ]
-        profile.vector = json.dumps(new_vec)
 
-    profile.save(update_fields=["vector", "updated_at"])
+# 리뷰가 많은 책도 요약 비용이 바뀐 리뷰 양에 비례하도록 요약 트리(BookReviewSummaryNode)에 접어 넣는다. (map-reduce)
+    # - map: 리뷰를 SUMMARY_CHUNK_REVIEWS 개씩 청크(level 0)로 묶어 요약. 새 리뷰는 마지막 청크를 채운 뒤 새 청크로
+    # - 수정 / 삭제된 리뷰는 그 리뷰가 속한 청크만 다시 요약한다. (청크 위치는 바뀌지 않음)
+    # - reduce: 노드 REDUCE_FANOUT 개씩 위 단계로 합친다. 바뀐 노드의 부모만 다시 합치므로 프롬프트 크기가 제한된다.
+    # - 중간에 LLM 호출이 실패하면 아무것도 저장하지 않고 다음 실행에서 다시 시도한다. (성공한 호출은 프롬프트 캐시에 남음)
+def _fold_reviews_into_summary(book) -> BookReviewSummary | None:
+    rolling, _ = BookReviewSummary.objects.get_or_create(book=book)
 
+    reviews = {
+        review_id: (title, content, updated_at)
+        for review_id, title, content, updated_at in Review.objects.filter(book_id=book.id)
+        .order_by("id")
+        .values_list("id", "title", "content", "updated_at")
+    }
 
-def _update_book_vector_from_reviews(book) -> None:
-    reviews = Review.objects.filter(book_id=book.id).values_list("title", "content")
-    review_texts = []
-    for title, content in reviews:
-        text = _make_review_text(title, content)
-        if text:
-            review_texts.append(text)
-
-    if not review_texts:
-        return
+    nodes = {}
+    for node in BookReviewSummaryNode.objects.filter(book=book):
+        nodes.setdefault(node.level, {})[node.position] = node
+    leaves = [nodes.get(0, {})[p] for p in sorted(nodes.get(0, {}))]
 
-    summary = summarize_user_reviews(review_texts)
-    summary_text = _clean_text(summary.get("summary", ""))
-    if not summary_text:
-        return
+    # 1) 기존 청크: 삭제 / 수정된 리뷰가 있으면 그 청크만 다시 요약
+    dirty = set()
+    assigned = set()
+    for leaf in leaves:
+        assigned.update(leaf.review_ids)
+        members = [review_id for review_id in leaf.review_ids if review_id in reviews]
+        if members != leaf.review_ids or _chunk_fingerprint(members, reviews) != leaf.fingerprint:
+            leaf.review_ids = members
+            dirty.add(leaf.position)
 
-    emb = make_embeddings(summary_text)
-    if not emb:
-        return
+    # 2) 새 리뷰: 마지막 청크를 먼저 채우고 남은 리뷰는 새 청크로
+    new_ids = [review_id for review_id in reviews if review_id not in assigned]
+    if new_ids and leaves and len(leaves[-1].review_ids) < SUMMARY_CHUNK_REVIEWS:
+        take = SUMMARY_CHUNK_REVIEWS - len(leaves[-1].review_ids)
+        leaves[-1].review_ids = leaves[-1].review_ids + new_ids[:take]
+        dirty.add(leaves[-1].position)
+        new_ids = new_ids[take:]
+    for start in range(0, len(new_ids), SUMMARY_CHUNK_REVIEWS):
+        leaf = BookReviewSummaryNode(book=book, level=0, position=len(leaves), review_ids=new_ids[start:start + SUMMARY_CHUNK_REVIEWS])
+        leaves.append(leaf)
+        dirty.add(leaf.position)
 
-    BookVector.objects.update_or_create(
-        book=book,
-        defaults={
-            "vector": json.dumps(emb),
-            "embedding_model": PROVIDER_MODEL_KEY,
-            "embedding_dim": len(emb),
-        },
+    if not dirty:
+        return None
+
+    changed = []
+    map_calls = 0
+    for leaf in leaves:
+        if leaf.position not in dirty:
+            continue
+        texts = [text for text in (_make_review_text(*reviews[review_id][:2]) for review_id in leaf.review_ids) if text]
+        part = summarize_user_reviews(texts) if texts else {}
+        map_calls += bool(texts)
+        if texts and not part.get("summary"):
+            return None
+        _set_node_summary(leaf, part, len(leaf.review_ids))
+        leaf.fingerprint = _chunk_fingerprint(leaf.review_ids, reviews)
+        changed.append(leaf)
+
+    # 3) 바뀐 노드의 부모만 위 단계로 다시 합친다.
+    level, level_nodes = 0, leaves
+    reduce_calls = 0
+    while len(level_nodes) > 1:
+        level += 1
+        existing = nodes.get(level, {})
+        parent_dirty = {position // REDUCE_FANOUT for position in dirty}
+        parents = []
+        for position in range((len(level_nodes) + REDUCE_FANOUT - 1) // REDUCE_FANOUT):
+            parent = existing.get(position)
+            if parent is None:
+                parent = BookReviewSummaryNode(book=book, level=level, position=position)
+                parent_dirty.add(position)
+            if position in parent_dirty:
+                children = level_nodes[position * REDUCE_FANOUT:(position + 1) * REDUCE_FANOUT]
+                parts = [_node_part(child) for child in children if child.summary]
+                merged = merge_user_review_summaries(parts)
+                reduce_calls += len(parts) > 1
+                if parts and not merged.get("summary"):
+                    return None
+                _set_node_summary(parent, merged, sum(child.review_count for child in children))
+                changed.append(parent)
+            parents.append(parent)
+        dirty, level_nodes = parent_dirty, parents
+    root = level_nodes[0]
+
+    with transaction.atomic():
+        for node in changed:
+            node.save()
+        # 트리가 낮아지는 경우는 없지만, 루트보다 위에 남은 노드는 지운다.
+        BookReviewSummaryNode.objects.filter(book=book, level__gt=level).delete()
+
+        rolling.summary = root.summary
+        rolling.sentiment = root.sentiment
+        rolling.keywords = root.keywords
+        rolling.last_review_id = max(reviews, default=0)
+        rolling.folded_count = root.review_count
+        rolling.save()
+
+    print(
+        f"[debug] folded reviews book_id={book.id} chunks={len(leaves)} "
+        f"map_calls={map_calls} reduce_calls={reduce_calls} total={rolling.folded_count}"
     )
+    return rolling if rolling.summary else None
+
+
+def _chunk_fingerprint(review_ids: list[int], reviews: dict) -> str:
+    raw = ",".join(f"{review_id}:{reviews[review_id][2].isoformat()}" for review_id in review_ids)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _node_part(node: BookReviewSummaryNode) -> dict:
+    return {
+        "summary": node.summary,
+        "sentiment": node.sentiment,
+        "keywords": node.keywords,
+        "review_count": node.review_count,
+    }
+
 
-    _upsert_chroma(book, summary_text, emb)
+def _set_node_summary(node: BookReviewSummaryNode, part: dict, review_count: int) -> None:
+    node.summary = part.get("summary", "")
+    node.sentiment = str(part.get("sentiment", ""))[:20]
+    node.keywords = part.get("keywords", "")
+    node.review_count = review_count
 
 
 def _clean_text(text: str) -> str:
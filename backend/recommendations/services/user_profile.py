@@ -0,0 +1,166 @@
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from recommendations.models import ReviewProfileContribution, UserProfileVector
+from recommendations.services.make_book_vector_pipeline_after_add_book import PROVIDER_MODEL_KEY
+from recommendations.vector_codec import encode_vector
+
+
+# ================================================================
+#  사용자 프로필 벡터 = 리뷰 임베딩의 가중 평균 (가중 합 + 가중치 합으로 유지)
+# ================================================================
+
+# EMA를 잠금 없이 읽고-쓰면 같은 사용자의 리뷰 두 개가 동시에 처리될 때 하나가 사라지고,
+# 리뷰 수정 / 삭제는 프로필에 반영되지 않았다.
+    # - 리뷰별 기여분(ReviewProfileContribution)을 저장하고, 프로필에는 합계와 가중치 합만 둔다.
+    # - 추가 / 수정 / 삭제는 합계에 차이만 더하는 O(dim) 연산이다.
+    # - 갱신은 version 기반 compare-and-swap (실패하면 다시 읽고 재시도)
+    # - RECOMPUTE_EVERY 번 증분 갱신하면 기여분 전체로 정확히 다시 계산해 누적 오차를 없앤다.
+REVIEW_WEIGHT = 1.0
+RECOMPUTE_EVERY = getattr(settings, "PROFILE_RECOMPUTE_EVERY", 50)
+MAX_CAS_RETRIES = 5
+
+
+class ProfileUpdateConflict(Exception):
+    pass
+
+
+def upsert_review_contribution(user_id: int, review_id: int, review_emb: list[float]) -> None:
+    vec = np.asarray(review_emb, dtype=np.float32)
+    weight = REVIEW_WEIGHT
+
+    with transaction.atomic():
+        old = ReviewProfileContribution.objects.select_for_update().filter(review_id=review_id).first()
+
+        delta = vec.astype(np.float64) * weight
+        weight_delta, count_delta = weight, 1
+        exact = True
+        if old is not None:
+            old_vec = old.get_vector_array()
+            if old.embedding_model == PROVIDER_MODEL_KEY and old_vec is not None and old_vec.shape == vec.shape:
+                delta -= old_vec.astype(np.float64) * old.weight
+                weight_delta, count_delta = weight - old.weight, 0
+            else:
+                exact = False # 이전 기여분을 뺄 수 없으면 전체 재계산
+
+        contribution = old or ReviewProfileContribution(review_id=review_id, user_id=user_id)
+        contribution.vector_blob = encode_vector(vec)
+        contribution.vector_dtype = "float32"
+        contribution.embedding_dim = vec.size
+        contribution.embedding_model = PROVIDER_MODEL_KEY
+        contribution.weight = weight
+        contribution.save()
+
+        if exact:
+            _apply_delta(user_id, delta, weight_delta, count_delta)
+        else:
+            recompute_user_profile(user_id)
+
+
+def remove_review_contribution(review_id: int) -> None:
+    with transaction.atomic():
+        old = ReviewProfileContribution.objects.select_for_update().filter(review_id=review_id).first()
+        if old is None:
+            return
+        user_id = old.user_id
+        old_vec = old.get_vector_array()
+        old.delete()
+
+        if old.embedding_model == PROVIDER_MODEL_KEY and old_vec is not None:
+            _apply_delta(user_id, -old_vec.astype(np.float64) * old.weight, -old.weight, -1)
+        else:
+            recompute_user_profile(user_id)
+
+
+def _apply_delta(user_id: int, delta: np.ndarray, weight_delta: float, count_delta: int) -> None:
+    for _ in range(MAX_CAS_RETRIES):
+        profile, _ = UserProfileVector.objects.get_or_create(user_id=user_id)
+
+        current = profile.get_sum_array()
+        legacy = current is None and profile.review_count == 0 and (profile.vector_blob is not None or profile.vector)
+        if (
+            legacy # 합계 없이 EMA 벡터만 있는 기존 프로필
+            or (current is not None and current.shape != delta.shape)
+            or (profile.embedding_model and profile.embedding_model != PROVIDER_MODEL_KEY)
+            or profile.updates_since_recompute + 1 >= RECOMPUTE_EVERY
+        ):
+            recompute_user_profile(user_id)
+            return
+
+        base = current if current is not None else np.zeros_like(delta)
+        new_sum = base + delta
+        if _compare_and_save(profile, new_sum, profile.weight_total + weight_delta, profile.review_count + count_delta):
+            return
+
+    raise ProfileUpdateConflict(f"profile vector update conflict user_id={user_id}")
+
+
+def recompute_user_profile(user_id: int) -> None:
+    # 저장된 기여분 전체로 합계를 정확히 다시 계산한다. (float64 누적)
+    # 프로필 행을 잠근 채 기여분을 읽는다. 합산 도중 커밋된 증분 갱신은 잠금이 풀린 뒤 version CAS에서 다시 읽는다.
+    for _ in range(MAX_CAS_RETRIES):
+        with transaction.atomic():
+            UserProfileVector.objects.get_or_create(user_id=user_id)
+            profile = UserProfileVector.objects.select_for_update().get(user_id=user_id)
+
+            total, weight_total, count = _sum_contributions(user_id)
+            if _compare_and_save(profile, total, weight_total, count, recomputed=True):
+                return
+
+    raise ProfileUpdateConflict(f"profile vector recompute conflict user_id={user_id}")
+
+
+def _sum_contributions(user_id: int) -> tuple[np.ndarray | None, float, int]:
+    total = None
+    weight_total = 0.0
+    count = 0
+    for row in ReviewProfileContribution.objects.filter(user_id=user_id, embedding_model=PROVIDER_MODEL_KEY):
+        vec = row.get_vector_array()
+        if vec is None:
+            continue
+        if total is None:
+            total = np.zeros(vec.size, dtype=np.float64)
+        if vec.size != total.size:
+            continue
+        total += vec.astype(np.float64) * row.weight
+        weight_total += row.weight
+        count += 1
+    return total, weight_total, count
+
+
+def _compare_and_save(profile: UserProfileVector, new_sum, weight_total: float, count: int, recomputed: bool = False) -> bool:
+    fields = {
+        "weight_total": max(weight_total, 0.0),
+        "review_count": max(count, 0),
+        "embedding_model": PROVIDER_MODEL_KEY,
+        "version": F("version") + 1,
+        "updated_at": timezone.now(),
+    }
+
+    if new_sum is None or count <= 0 or weight_total <= 0:
+        fields.update(sum_blob=None, vector_blob=None, vector="", embedding_dim=None, weight_total=0.0, review_count=0)
+    else:
+        # 평균 벡터(검색에 쓰는 값)는 설정된 저장 포맷으로 함께 갱신한다.
+        mean = UserProfileVector()
+        mean.set_vector_array(new_sum / weight_total)
+        fields.update(
+            sum_blob=encode_vector(new_sum, "float64"),
+            vector_blob=mean.vector_blob,
+            vector_dtype=mean.vector_dtype,
+            vector="",
+            embedding_dim=mean.embedding_dim,
+        )
+
+    if recomputed:
+        fields.update(updates_since_recompute=0, recomputed_at=timezone.now())
+    else:
+        fields["updates_since_recompute"] = F("updates_since_recompute") + 1
+
+    # 읽은 뒤 다른 갱신이 끼어들었다면 version이 달라 0건 갱신 → 호출한 쪽에서 다시 읽는다.
+    return bool(
+        UserProfileVector.objects.filter(id=profile.id, version=profile.version).update(**fields)
+    )
@@ -0,0 +1,60 @@
+from books.models import Book
+from libraries.models import Library
+from recommendations.models import UserBookExclusion, UserProfileVector
+from recommendations.services.make_book_vector_pipeline_after_add_book import PROVIDER_MODEL_KEY
+from recommendations.services.vector_search import search_book_hits
+from reviews.models import Review
+
+
+# ================================================================
+#  사용자 프로필 벡터 기반 "for you" 추천
+# ================================================================
+
+# 리뷰 기반 추천(recommend_book)과 달리 임베딩 API를 부르지 않는다.
+    # - 쿼리 벡터: 리뷰마다 갱신해 둔 UserProfileVector (리뷰 임베딩 가중 평균)
+    # - 제외 목록: 서재 / 리뷰가 바뀔 때 미리 계산해 둔 UserBookExclusion 한 행
+    # - 검색 백엔드는 recommend_book과 같이 RECOMMEND_VECTOR_BACKEND를 따른다.
+    # - 제외 / 카테고리 조건은 top-k 선택 전에 적용된다.
+
+
+def refresh_user_exclusions(user_id: int) -> set[int]:
+    book_ids = set(Library.objects.filter(user_id=user_id).values_list("book_id", flat=True))
+    book_ids |= set(Review.objects.filter(user_id=user_id).values_list("book_id", flat=True))
+
+    UserBookExclusion.objects.update_or_create(
+        user_id=user_id,
+        defaults={"book_ids": sorted(book_ids)},
+    )
+    return book_ids
+
+
+def get_user_exclusions(user_id: int) -> set[int]:
+    row = UserBookExclusion.objects.filter(user_id=user_id).values_list("book_ids", flat=True).first()
+    if row is None:
+        return refresh_user_exclusions(user_id)
+    return set(row)
+
+
+def recommend_for_user(user_id: int, k: int = 10, category_id: int | None = None) -> list[dict] | None:
+    """
+    반환값: [{"book": Book, "score": float}, ...] (유사도 내림차순)
+    프로필 벡터가 아직 없으면 None.
+    """
+    profile = UserProfileVector.objects.filter(user_id=user_id).first()
+    query = profile.get_vector_array(embedding_model=PROVIDER_MODEL_KEY) if profile else None
+    if query is None:
+        return None
+
+    found = search_book_hits(
+        query,
+        k=k,
+        exclude_book_ids=get_user_exclusions(user_id),
+        category_id=category_id,
+    )
+
+    books = Book.objects.select_related("category").in_bulk([hit["book_id"] for hit in found])
+    return [
+        {"book": books[hit["book_id"]], "score": hit["score"]}
+        for hit in found
+        if hit["book_id"] in books
+    ]
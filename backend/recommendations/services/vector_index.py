@@ -0,0 +1,355 @@
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from django.conf import settings
+
+from recommendations.models import BookVector
+
+
+VECTOR_ROW_FIELDS = (
+    "vector", "vector_blob", "vector_dtype", "embedding_model", "embedding_dim", "updated_at",
+    "book__id", "book__isbn", "book__category_id",
+)
+
+
+# ================================================================
+#  BookVector 전체를 메모리에 올려 두고 정확한(exact) 코사인 검색을 하는 인덱스
+# ================================================================
+
+# 카탈로그 규모(수천~수만 권)에서는 Chroma(sqlite + HNSW)를 거치는 것보다
+# 정규화된 float32 행렬과 쿼리 벡터의 행렬곱 한 번이 더 빠르다.
+    # - 행(row)은 미리 L2 정규화해 두므로 내적 = 코사인 유사도
+    # - top-k는 전체 정렬 대신 argpartition으로 뽑는다.
+    # - 행마다 카테고리 id를 함께 두어 카테고리 필터를 top-k 선택 전에 적용한다.
+class BookVectorIndex:
+
+    def __init__(self, dim: int | None = None):
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+        self._book_ids = np.zeros(0, dtype=np.int64)
+        self._category_ids = np.zeros(0, dtype=np.int64)
+        self._isbns: list[str] = []
+        self._size = 0
+        self._row_by_book_id: dict[int, int] = {}
+        self.loaded_at = None
+        self.load_ms = 0.0
+        # 다른 프로세스의 변경 반영용 (sync_index_from_db)
+        self.synced_until = None # 반영한 BookVector.updated_at 최댓값
+        self.synced_rows = {} # 겹쳐 읽는 구간 안에서 이미 반영한 book_id -> updated_at
+        self.checked_at = 0.0
+        self.counted_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    # ------------------------------------------------------------
+    #  적재 / 증분 갱신
+    # ------------------------------------------------------------
+
+    def load_from_db(self) -> None:
+        started = time.perf_counter()
+
+        rows = BookVector.objects.select_related("book").only(*VECTOR_ROW_FIELDS)
+
+        book_ids, category_ids, isbns, vectors = [], [], [], []
+        dim = self.dim
+        synced_until = None
+        seen = {}
+        checked_at = time.monotonic()
+        for row in rows.iterator():
+            seen[row.book.id] = row.updated_at
+            if synced_until is None or row.updated_at > synced_until:
+                synced_until = row.updated_at
+            vec = row.get_vector_array()
+            if vec is None:
+                continue
+            if dim is None:
+                dim = vec.shape[0]
+            if vec.shape[0] != dim: # 모델이 섞여 있으면 차원이 다른 벡터는 제외
+                continue
+            book_ids.append(row.book.id)
+            category_ids.append(row.book.category_id or 0)
+            isbns.append(str(row.book.isbn or ""))
+            vectors.append(vec)
+
+        with self._lock:
+            self.dim = dim
+            capacity = max(len(vectors), 1)
+            matrix = np.zeros((capacity, dim or 0), dtype=np.float32)
+            if vectors:
+                matrix[: len(vectors)] = _normalize_rows(np.vstack(vectors))
+            self._matrix = matrix
+            self._book_ids = np.zeros(capacity, dtype=np.int64)
+            self._book_ids[: len(book_ids)] = book_ids
+            self._category_ids = np.zeros(capacity, dtype=np.int64)
+            self._category_ids[: len(category_ids)] = category_ids
+            self._isbns = isbns
+            self._size = len(vectors)
+            self._row_by_book_id = {book_id: i for i, book_id in enumerate(book_ids)}
+            self.loaded_at = time.time()
+            self.load_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.synced_until = synced_until
+            self.synced_rows = _recent_rows(seen, synced_until)
+            self.checked_at = checked_at
+            self.counted_at = checked_at
+
+        print(f"[vector_index] loaded rows={self._size} dim={self.dim} in {self.load_ms}ms")
+
+    def upsert(self, book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+        vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vec.shape[0]
+                self._matrix = np.zeros((1, self.dim), dtype=np.float32)
+                self._book_ids = np.zeros(1, dtype=np.int64)
+                self._category_ids = np.zeros(1, dtype=np.int64)
+            if vec.shape[0] != self.dim:
+                return
+
+            row = self._row_by_book_id.get(book_id)
+            if row is None:
+                # 용량이 부족하면 두 배로 늘려 추가 비용을 상각(amortize)한다.
+                if self._size >= self._matrix.shape[0]:
+                    self._grow(max(self._matrix.shape[0] * 2, 16))
+                row = self._size
+                self._size += 1
+                self._isbns.append("")
+                self._row_by_book_id[book_id] = row
+
+            self._matrix[row] = _normalize_rows(vec[None, :])[0]
+            self._book_ids[row] = book_id
+            self._category_ids[row] = category_id or 0
+            self._isbns[row] = str(isbn or "")
+
+    def remove(self, book_id: int) -> None:
+        with self._lock:
+            row = self._row_by_book_id.pop(book_id, None)
+            if row is None:
+                return
+            # 마지막 행을 빈 자리로 옮겨 행렬을 연속(contiguous)으로 유지한다.
+            last = self._size - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._book_ids[row] = self._book_ids[last]
+                self._category_ids[row] = self._category_ids[last]
+                self._isbns[row] = self._isbns[last]
+                self._row_by_book_id[int(self._book_ids[row])] = row
+            self._isbns.pop()
+            self._size -= 1
+
+    def book_ids(self) -> list[int]:
+        with self._lock:
+            return [int(x) for x in self._book_ids[: self._size]]
+
+    def get_vectors(self, book_ids) -> tuple[list[int], np.ndarray]:
+        # 정규화된 행 복사본을 돌려준다. (인덱스에 없는 책은 건너뜀)
+        with self._lock:
+            found = [book_id for book_id in book_ids if book_id in self._row_by_book_id]
+            rows = [self._row_by_book_id[book_id] for book_id in found]
+            return found, self._matrix[rows].copy()
+
+    def export(self) -> tuple[list[int], list[str], list[int], np.ndarray]:
+        # (book_ids, isbns, category_ids, 정규화된 행렬) 복사본. 압축 인덱스 / 스냅샷 빌드용
+        with self._lock:
+            size = self._size
+            return (
+                [int(x) for x in self._book_ids[:size]],
+                list(self._isbns[:size]),
+                [int(x) for x in self._category_ids[:size]],
+                self._matrix[:size].copy(),
+            )
+
+    def _grow(self, capacity: int) -> None:
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        book_ids = np.zeros(capacity, dtype=np.int64)
+        book_ids[: self._size] = self._book_ids[: self._size]
+        category_ids = np.zeros(capacity, dtype=np.int64)
+        category_ids[: self._size] = self._category_ids[: self._size]
+        self._matrix = matrix
+        self._book_ids = book_ids
+        self._category_ids = category_ids
+
+    # ------------------------------------------------------------
+    #  검색
+    # ------------------------------------------------------------
+
+    def search(self, query, k: int = 10, exclude_book_ids=None, category_id: int | None = None) -> list[dict]:
+        return self.search_batch([query], k=k, exclude_book_ids=exclude_book_ids, category_id=category_id)[0]
+
+    def search_batch(self, queries, k: int = 10, exclude_book_ids=None, category_id: int | None = None) -> list[list[dict]]:
+        """
+        여러 쿼리 벡터를 한 번의 행렬곱(queries @ matrix.T)으로 처리한다.
+        제외 / 카테고리 조건에 맞지 않는 행은 top-k를 고르기 전에 -inf로 가려 결과 개수가 줄지 않는다.
+        반환값: 쿼리별 [{"book_id", "isbn13", "score"}, ...] (점수 내림차순)
+        """
+        q = np.asarray(queries, dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+
+        with self._lock:
+            size = self._size
+            if size == 0 or q.shape[1] != self.dim:
+                return [[] for _ in range(q.shape[0])]
+            # 증분 갱신이 행을 덮어쓰는 중에 읽지 않도록 행렬곱까지 잠금 안에서 수행한다.
+            scores = _normalize_rows(q) @ self._matrix[:size].T
+            book_ids = self._book_ids[:size].copy()
+            category_ids = self._category_ids[:size].copy()
+            isbns = list(self._isbns)
+
+        if exclude_book_ids:
+            mask = np.isin(book_ids, np.fromiter(exclude_book_ids, dtype=np.int64))
+            scores[:, mask] = -np.inf
+        if category_id is not None:
+            scores[:, category_ids != category_id] = -np.inf
+
+        k = min(k, size)
+        results = []
+        for row_scores in scores:
+            if k < size:
+                top = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                top = np.arange(size)
+            top = top[np.argsort(-row_scores[top])]
+            results.append([
+                {
+                    "book_id": int(book_ids[i]),
+                    "isbn13": isbns[i],
+                    "score": float(row_scores[i]),
+                }
+                for i in top
+                if np.isfinite(row_scores[i])
+            ])
+        return results
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ================================================================
+#  프로세스 전역 인덱스
+# ================================================================
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_book_vector_index() -> BookVectorIndex:
+    # 스냅샷을 쓰면 워커마다 행렬을 복제하지 않고 공유 memmap을 연다. (없으면 DB 적재로 대체)
+    if getattr(settings, "RECOMMEND_VECTOR_SNAPSHOT", False):
+        from recommendations.services.vector_snapshot import get_snapshot_index
+        snapshot = get_snapshot_index()
+        if snapshot is not None:
+            return snapshot
+
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = BookVectorIndex()
+                index.load_from_db()
+                _index = index
+    sync_index_from_db(_index)
+    return _index
+
+
+def upsert_book_vector_index(book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+    if getattr(settings, "RECOMMEND_VECTOR_SNAPSHOT", False):
+        from recommendations.services.vector_snapshot import enqueue_snapshot_build, upsert_snapshot_index
+        upsert_snapshot_index(book_id, isbn, vector, category_id=category_id)
+        # 다른 워커에도 보이도록 스냅샷을 (모아서) 다시 만든다.
+        enqueue_snapshot_build()
+
+    # 이 프로세스의 인덱스만 바로 고친다. (다른 프로세스는 sync_index_from_db로 반영)
+    # 아직 적재되지 않았다면 첫 조회 시 DB에서 전체를 읽으므로 여기서는 건너뛴다.
+    if _index is None:
+        return
+    _index.upsert(book_id, isbn, vector, category_id=category_id)
+
+
+def reload_book_vector_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+    get_book_vector_index()
+
+
+# ================================================================
+#  다른 프로세스의 변경 반영 (BookVector.updated_at 워터마크)
+# ================================================================
+
+# upsert_*_index는 벡터를 저장한 프로세스의 인덱스만 고친다.
+# 다른 gunicorn 워커 / run_vector_workers 프로세스가 저장한 벡터는 CHECK_SECONDS마다 워터마크 이후 행만 읽어 반영한다.
+    # - 인메모리 인덱스 / 스냅샷 overlay / 압축 인덱스가 같은 방식(upsert)으로 따라간다.
+    # - 워터마크는 SYNC_OVERLAP_SECONDS만큼 겹쳐 읽는다. (늦게 커밋된 행 대비)
+    # - 겹친 구간은 (book_id, updated_at)만 먼저 읽고, 이미 반영한 행은 벡터를 다시 읽지 않는다.
+    # - 책 벡터 삭제 확인(전체 행 수 집계)은 COUNT_SECONDS마다만 한다. 줄었으면 전체를 다시 적재한다.
+CHECK_SECONDS = getattr(settings, "RECOMMEND_VECTOR_INDEX_CHECK_SECONDS", 5)
+COUNT_SECONDS = getattr(settings, "RECOMMEND_VECTOR_INDEX_COUNT_SECONDS", 300)
+SYNC_OVERLAP_SECONDS = 60
+SYNC_FETCH_ROWS = 500
+
+
+def sync_index_from_db(index, force: bool = False) -> int:
+    now = time.monotonic()
+    if not force and now - index.checked_at < CHECK_SECONDS:
+        return 0
+    # 이미 다른 스레드가 확인 중이면 기다리지 않고 현재 인덱스로 검색한다.
+    if not index._sync_lock.acquire(blocking=force):
+        return 0
+    try:
+        index.checked_at = now
+
+        if isinstance(index, BookVectorIndex) and now - index.counted_at >= COUNT_SECONDS:
+            index.counted_at = now
+            if BookVector.objects.count() < len(index):
+                index.load_from_db()
+                return len(index)
+
+        window = BookVector.objects.all()
+        if index.synced_until is not None:
+            window = window.filter(updated_at__gt=index.synced_until - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+        changed = [
+            book_id for book_id, updated_at in window.values_list("book_id", "updated_at")
+            if index.synced_rows.get(book_id) != updated_at
+        ]
+        if not changed:
+            return 0
+
+        synced_until = index.synced_until
+        applied = 0
+        for start in range(0, len(changed), SYNC_FETCH_ROWS):
+            rows = BookVector.objects.select_related("book").only(*VECTOR_ROW_FIELDS).filter(
+                book_id__in=changed[start:start + SYNC_FETCH_ROWS]
+            )
+            for row in rows.iterator():
+                vec = row.get_vector_array()
+                if vec is not None:
+                    index.upsert(row.book.id, row.book.isbn, vec, category_id=row.book.category_id)
+                    applied += 1
+                index.synced_rows[row.book.id] = row.updated_at
+                if synced_until is None or row.updated_at > synced_until:
+                    synced_until = row.updated_at
+        index.synced_until = synced_until
+        index.synced_rows = _recent_rows(index.synced_rows, synced_until)
+        return applied
+    finally:
+        index._sync_lock.release()
+
+
+def _recent_rows(rows: dict, synced_until) -> dict:
+    # 다음 확인 때 겹쳐 읽을 구간의 행만 기억한다.
+    if synced_until is None:
+        return {}
+    cutoff = synced_until - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    return {book_id: updated_at for book_id, updated_at in rows.items() if updated_at > cutoff}
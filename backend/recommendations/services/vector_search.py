@@ -0,0 +1,205 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from recommendations.models import BookVector
+from recommendations.services.compressed_index import get_compressed_index
+from recommendations.services.vector_index import get_book_vector_index
+from recommendations.services.vector_store import query_collection
+
+
+# ================================================================
+#  추천 검색 백엔드 선택
+# ================================================================
+
+# settings.RECOMMEND_VECTOR_BACKEND
+    # - "chroma": 기존 Chroma 컬렉션 (sqlite + HNSW)
+    # - "numpy" : BookVector 전체를 메모리 행렬로 올린 정확한(exact) 검색
+    # - "compressed": IVF + int8 압축 인덱스로 후보를 고르고 원본 벡터로 재순위 (`manage.py build_compressed_index`)
+def get_backend() -> str:
+    return getattr(settings, "RECOMMEND_VECTOR_BACKEND", "chroma")
+
+
+def search_similar_books(query_emb, k: int = 5, exclude_isbns=None, exclude_book_ids=None, category_id: int | None = None) -> list[dict]:
+    """
+    쿼리 임베딩과 가까운 책을 찾는다.
+    제외 / 카테고리 조건은 검색 안에서 적용하므로 조건에 맞는 책이 충분하면 항상 k개를 돌려준다.
+    (compressed 백엔드는 조건에 맞는 후보가 k개가 될 때까지 살펴볼 군집 수를 늘린다.)
+    반환값: [{"isbn13": str, "document": str}, ...] (유사도 내림차순, 최대 k개)
+    """
+    exclude_isbns = {str(i) for i in (exclude_isbns or []) if i}
+    exclude_book_ids = {int(i) for i in (exclude_book_ids or []) if i}
+
+    backend = get_backend()
+    if backend == "compressed":
+        return _search_compressed(query_emb, k, exclude_isbns, exclude_book_ids, category_id)
+    if backend == "numpy":
+        return _search_numpy(query_emb, k, exclude_isbns, exclude_book_ids, category_id)
+    return _search_chroma(query_emb, k, exclude_isbns, exclude_book_ids, category_id)
+
+
+def search_book_hits(query_emb, k: int = 10, exclude_book_ids=None, category_id: int | None = None) -> list[dict]:
+    """
+    search_similar_books와 같은 백엔드로 찾되, 문서 대신 book_id / 점수를 돌려준다. (사용자 프로필 추천 등)
+    반환값: [{"book_id": int, "isbn13": str, "score": float}, ...] (유사도 내림차순, 최대 k개)
+    """
+    exclude_book_ids = {int(i) for i in (exclude_book_ids or []) if i} or None
+
+    backend = get_backend()
+    if backend == "compressed":
+        return _compressed_hits(query_emb, k, exclude_book_ids, category_id)
+    if backend == "numpy":
+        return _numpy_hits(query_emb, k, exclude_book_ids, category_id)
+    return _chroma_hits(query_emb, k, exclude_book_ids or set(), category_id)
+
+
+def _chroma_where(exclude_isbns: set[str], exclude_book_ids: set[int], category_id: int | None) -> dict | None:
+    # 메타데이터(book_id / category_id)는 `manage.py backfill_vector_metadata`로 기존 문서에도 채워 둔다.
+    conditions = []
+    if exclude_isbns:
+        conditions.append({"isbn13": {"$nin": sorted(exclude_isbns)}})
+    if exclude_book_ids:
+        conditions.append({"book_id": {"$nin": sorted(exclude_book_ids)}})
+    if category_id is not None:
+        conditions.append({"category_id": {"$eq": int(category_id)}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def _search_chroma(query_emb, k: int, exclude_isbns: set[str], exclude_book_ids: set[int], category_id: int | None) -> list[dict]:
+    # where 조건은 Chroma가 후보를 고르기 전에 적용하므로 여분을 더 가져오지 않는다.
+    results = query_collection(
+        query_embeddings=[query_emb],
+        n_results=k,
+        include=["metadatas", "documents"],
+        where=_chroma_where(exclude_isbns, exclude_book_ids, category_id),
+    )
+
+    metadatas = (results.get("metadatas") or [[]])[0]
+    documents = (results.get("documents") or [[]])[0]
+
+    hits = []
+    seen = set()
+    for md, doc in zip(metadatas, documents):
+        isbn = str((md or {}).get("isbn13", "")).strip()
+        if not isbn or isbn in exclude_isbns or isbn in seen:
+            continue
+        seen.add(isbn)
+        hits.append({"isbn13": isbn, "document": doc or ""})
+        if len(hits) >= k:
+            break
+    return hits
+
+
+def _chroma_hits(query_emb, k: int, exclude_book_ids: set[int], category_id: int | None) -> list[dict]:
+    results = query_collection(
+        query_embeddings=[query_emb],
+        n_results=k,
+        include=["metadatas", "distances"],
+        where=_chroma_where(set(), exclude_book_ids, category_id),
+    )
+
+    metadatas = (results.get("metadatas") or [[]])[0]
+    distances = (results.get("distances") or [[]])[0]
+
+    # 메타데이터에 book_id가 없는 예전 문서는 ISBN으로 찾는다.
+    isbns = [str((md or {}).get("isbn13", "")).strip() for md in metadatas]
+    book_ids = dict(
+        BookVector.objects.filter(book__isbn__in=[i for i in isbns if i])
+        .values_list("book__isbn", "book_id")
+    )
+
+    hits = []
+    seen = set()
+    for md, isbn, distance in zip(metadatas, isbns, distances):
+        book_id = (md or {}).get("book_id") or book_ids.get(isbn)
+        if not book_id or book_id in seen or book_id in exclude_book_ids:
+            continue
+        seen.add(book_id)
+        # Chroma 기본 거리(제곱 L2)를 정규화된 벡터의 코사인 유사도로 바꾼다.
+        hits.append({"book_id": int(book_id), "isbn13": isbn, "score": 1.0 - float(distance) / 2})
+    return hits[:k]
+
+
+def _search_numpy(query_emb, k: int, exclude_isbns: set[str], exclude_book_ids: set[int], category_id: int | None) -> list[dict]:
+    found = _numpy_hits(query_emb, k, _merge_exclusions(exclude_isbns, exclude_book_ids), category_id)
+    return _with_documents(found)
+
+
+def _search_compressed(query_emb, k: int, exclude_isbns: set[str], exclude_book_ids: set[int], category_id: int | None) -> list[dict]:
+    found = _compressed_hits(query_emb, k, _merge_exclusions(exclude_isbns, exclude_book_ids), category_id)
+    return _with_documents(found)
+
+
+def _numpy_hits(query_emb, k: int, exclude_book_ids: set[int] | None, category_id: int | None) -> list[dict]:
+    return get_book_vector_index().search(
+        query_emb,
+        k=k,
+        exclude_book_ids=exclude_book_ids,
+        category_id=category_id,
+    )
+
+
+def _compressed_hits(query_emb, k: int, exclude_book_ids: set[int] | None, category_id: int | None) -> list[dict]:
+    index = get_compressed_index()
+    if index is None: # 아직 빌드하지 않았으면 exact 검색으로 대체
+        return _numpy_hits(query_emb, k, exclude_book_ids, category_id)
+    return index.search(
+        query_emb,
+        k=k,
+        exclude_book_ids=exclude_book_ids,
+        category_id=category_id,
+    )
+
+
+def _merge_exclusions(isbns: set[str], book_ids: set[int]) -> set[int] | None:
+    merged = set(book_ids)
+    if isbns:
+        merged |= set(BookVector.objects.filter(book__isbn__in=isbns).values_list("book_id", flat=True))
+    return merged or None
+
+
+def _with_documents(found: list[dict]) -> list[dict]:
+    summaries = dict(
+        BookVector.objects.filter(book_id__in=[hit["book_id"] for hit in found])
+        .values_list("book_id", "summary")
+    )
+    return [
+        {"isbn13": hit["isbn13"], "document": summaries.get(hit["book_id"], "")}
+        for hit in found
+        if hit["isbn13"]
+    ]
+
+
+# ================================================================
+#  검색 대상(책 벡터 집합) 버전
+# ================================================================
+
+# 책 벡터가 추가 / 갱신되면 바뀌는 값. 미리 계산해 둔 추천 결과가 최신인지 판단하는 데 쓴다.
+# 조회마다 집계하지 않도록 프로세스 안에서 INDEX_VERSION_TTL_SECONDS 동안 재사용한다.
+INDEX_VERSION_TTL_SECONDS = getattr(settings, "RECOMMEND_INDEX_VERSION_TTL_SECONDS", 10)
+
+_version_lock = threading.Lock()
+_version_cache = {"value": None, "expires": 0.0}
+
+
+def get_index_version() -> str:
+    now = time.monotonic()
+    with _version_lock:
+        if _version_cache["value"] is not None and now < _version_cache["expires"]:
+            return _version_cache["value"]
+
+    agg = BookVector.objects.aggregate(n=Count("id"), last=Max("updated_at"))
+    last = agg["last"].strftime("%Y%m%d%H%M%S%f") if agg["last"] else "0"
+    version = f"{get_backend()}:{agg['n']}:{last}"
+
+    with _version_lock:
+        _version_cache["value"] = version
+        _version_cache["expires"] = now + INDEX_VERSION_TTL_SECONDS
+    return version
@@ -0,0 +1,359 @@
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from recommendations.models import BookVector, VectorJob
+from recommendations.services.job_queue import enqueue_job, job_stage, register_handler
+from recommendations.services.vector_index import BookVectorIndex, _normalize_rows
+
+
+# ================================================================
+#  워커 프로세스 간 공유하는 책 벡터 스냅샷 (np.memmap)
+# ================================================================
+
+# 인메모리 인덱스는 gunicorn / uvicorn 워커마다 복제되어 (3072 x 4바이트 x 책 수) x 워커 수만큼 메모리를 쓴다.
+# 디스크의 정규화된 행렬(.npy)을 읽기 전용 memmap으로 열면 OS 페이지 캐시 한 벌을 모든 워커가 공유한다.
+# - 파일: snapshot-<version>.{vectors,ids,categories,isbns}.npy + CURRENT.json(버전 헤더)
+# - 쓰기: 임시 파일에 다 쓴 뒤 rename, 마지막으로 CURRENT.json을 rename으로 교체 (원자적 전환)
+# - 빌드는 build.lock 파일 잠금(flock)으로 한 번에 하나만 돈다. (버전 번호 / 파일 교체가 섞이지 않게)
+# - 읽기: CHECK_SECONDS마다 CURRENT.json 버전을 확인하고 바뀌었으면 새 파일을 연다. (재시작 불필요)
+# - 스냅샷 이후 이 프로세스에서 저장된 벡터는 작은 인메모리 overlay에 두고 함께 검색한다.
+SNAPSHOT_DIR = getattr(
+    settings,
+    "RECOMMEND_VECTOR_SNAPSHOT_DIR",
+    os.path.join(settings.BASE_DIR, "recommendations", "vector_db", "snapshot"),
+)
+CHECK_SECONDS = getattr(settings, "RECOMMEND_VECTOR_SNAPSHOT_CHECK_SECONDS", 5)
+REBUILD_DELAY_SECONDS = getattr(settings, "RECOMMEND_VECTOR_SNAPSHOT_REBUILD_DELAY_SECONDS", 120)
+KEEP_VERSIONS = 2 # 교체 직후 이전 버전을 열고 있는 워커를 위해 하나 더 남긴다.
+
+HEADER_NAME = "CURRENT.json"
+LOCK_NAME = "build.lock"
+ISBN_DTYPE = "<U20"
+BUILD_CHUNK_ROWS = 1024
+
+
+class SnapshotVectorIndex:
+    """
+    memmap 스냅샷(읽기 전용) + 스냅샷 이후 upsert된 행(overlay)을 함께 검색한다.
+    BookVectorIndex와 같은 메서드를 제공한다.
+    """
+
+    def __init__(self, header: dict, vectors, book_ids, category_ids, isbns):
+        self.version = header["version"]
+        self.dim = header["dim"]
+        self._vectors = vectors
+        self._book_ids = book_ids
+        self._category_ids = category_ids
+        self._isbns = isbns
+        self._row_by_book_id = {int(b): i for i, b in enumerate(book_ids) if b >= 0}
+        self._overlay = BookVectorIndex(dim=self.dim)
+        self.loaded_at = time.time()
+        # 빌드 시작 이후 다른 프로세스가 저장한 벡터는 sync_index_from_db가 overlay에 반영한다.
+        self.synced_until = datetime.fromtimestamp(header.get("synced_at", header["created_at"]), tz=timezone.utc)
+        self.synced_rows = {}
+        self.checked_at = 0.0
+        self._sync_lock = threading.Lock()
+
+    def __len__(self):
+        overlay_new = [b for b in self._overlay.book_ids() if b not in self._row_by_book_id]
+        return len(self._row_by_book_id) + len(overlay_new)
+
+    def upsert(self, book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+        self._overlay.upsert(book_id, isbn, vector, category_id=category_id)
+
+    def book_ids(self) -> list[int]:
+        overlay_new = [b for b in self._overlay.book_ids() if b not in self._row_by_book_id]
+        return list(self._row_by_book_id) + overlay_new
+
+    def get_vectors(self, book_ids) -> tuple[list[int], np.ndarray]:
+        overlay_found, overlay_vectors = self._overlay.get_vectors(book_ids)
+        by_id = dict(zip(overlay_found, overlay_vectors))
+
+        found, rows = [], []
+        for book_id in book_ids:
+            if book_id in by_id:
+                found.append(book_id)
+                rows.append(by_id[book_id])
+            elif book_id in self._row_by_book_id:
+                found.append(book_id)
+                rows.append(np.asarray(self._vectors[self._row_by_book_id[book_id]]))
+        if not rows:
+            return [], np.zeros((0, self.dim), dtype=np.float32)
+        return found, np.vstack(rows).astype(np.float32)
+
+    def export(self) -> tuple[list[int], list[str], list[int], np.ndarray]:
+        ids = self.book_ids()
+        found, matrix = self.get_vectors(ids)
+        overlay_ids, overlay_isbns, overlay_categories, _ = self._overlay.export()
+        meta = {b: (i, c) for b, i, c in zip(overlay_ids, overlay_isbns, overlay_categories)}
+        isbns, category_ids = [], []
+        for book_id in found:
+            if book_id in meta:
+                isbn, category_id = meta[book_id]
+            else:
+                row = self._row_by_book_id[book_id]
+                isbn, category_id = str(self._isbns[row]), int(self._category_ids[row])
+            isbns.append(isbn)
+            category_ids.append(category_id)
+        return found, isbns, category_ids, matrix
+
+    def search(self, query, k: int = 10, exclude_book_ids=None, category_id: int | None = None) -> list[dict]:
+        return self.search_batch([query], k=k, exclude_book_ids=exclude_book_ids, category_id=category_id)[0]
+
+    def search_batch(self, queries, k: int = 10, exclude_book_ids=None, category_id: int | None = None) -> list[list[dict]]:
+        q = np.asarray(queries, dtype=np.float32)
+        if q.ndim == 1:
+            q = q[None, :]
+        if q.shape[1] != self.dim:
+            return [[] for _ in range(q.shape[0])]
+
+        # memmap 행렬곱: 필요한 페이지만 OS 페이지 캐시에서 읽는다.
+        scores = _normalize_rows(q) @ self._vectors.T
+
+        # 빈 행(-1) / overlay가 덮어쓴 행 / 제외 / 카테고리 조건은 top-k 선택 전에 가린다.
+        masked = self._book_ids < 0
+        hidden = set(self._overlay.book_ids())
+        if exclude_book_ids:
+            hidden |= set(exclude_book_ids)
+        if hidden:
+            masked |= np.isin(self._book_ids, np.fromiter(hidden, dtype=np.int64))
+        if category_id is not None:
+            masked |= self._category_ids != category_id
+        scores[:, masked] = -np.inf
+
+        overlay_results = self._overlay.search_batch(q, k=k, exclude_book_ids=exclude_book_ids, category_id=category_id)
+
+        size = scores.shape[1]
+        kk = min(k, size)
+        results = []
+        for row_scores, overlay_hits in zip(scores, overlay_results):
+            hits = list(overlay_hits)
+            if kk > 0:
+                top = np.argpartition(-row_scores, kk - 1)[:kk] if kk < size else np.arange(size)
+                hits.extend(
+                    {
+                        "book_id": int(self._book_ids[i]),
+                        "isbn13": str(self._isbns[i]),
+                        "score": float(row_scores[i]),
+                    }
+                    for i in top
+                    if np.isfinite(row_scores[i])
+                )
+            hits.sort(key=lambda hit: -hit["score"])
+            results.append(hits[:k])
+        return results
+
+
+# ================================================================
+#  쓰기 (원자적 교체)
+# ================================================================
+
+def build_vector_snapshot(snapshot_dir: str = SNAPSHOT_DIR) -> dict:
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # 다른 프로세스(워커 / manage.py)의 빌드가 끝날 때까지 기다린다.
+    with _build_lock(snapshot_dir):
+        return _build_vector_snapshot(snapshot_dir)
+
+
+@contextmanager
+def _build_lock(snapshot_dir: str):
+    with open(os.path.join(snapshot_dir, LOCK_NAME), "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _build_vector_snapshot(snapshot_dir: str) -> dict:
+    started = time.perf_counter()
+    synced_at = time.time() # 이 시각 이후 저장된 벡터는 읽는 쪽에서 DB로 따라간다.
+
+    # 행 위치는 시작 시점의 book_id 목록으로 정한다.
+    # 빌드 중에 추가된 책은 목록에 없으므로 건너뛰고, 읽는 쪽이 synced_at 이후 변경분으로 overlay에 반영한다.
+    snapshot_ids = list(BookVector.objects.order_by("book_id").values_list("book_id", flat=True))
+    count = len(snapshot_ids)
+    if not count:
+        return {"rows": 0}
+    position = {book_id: i for i, book_id in enumerate(snapshot_ids)}
+
+    rows = BookVector.objects.select_related("book").only(
+        "vector", "vector_blob", "vector_dtype", "embedding_model", "embedding_dim",
+        "book__id", "book__isbn", "book__category_id",
+    ).filter(book_id__lte=snapshot_ids[-1]).order_by("book_id")
+
+    version = _read_header(snapshot_dir).get("version", 0) + 1
+    prefix = f"snapshot-{version}"
+    paths = {name: os.path.join(snapshot_dir, f"{prefix}.{name}.npy") for name in ("vectors", "ids", "categories", "isbns")}
+    tmp = {name: f"{path}.{os.getpid()}.tmp" for name, path in paths.items()}
+
+    book_ids = np.full(count, -1, dtype=np.int64) # 차원이 맞지 않아 건너뛴 행은 -1
+    category_ids = np.zeros(count, dtype=np.int64)
+    isbns = np.zeros(count, dtype=ISBN_DTYPE)
+
+    # 행렬은 디스크에 바로 쓴다. (전체를 메모리에 올리지 않음)
+    dim = None
+    vectors = None
+    written = 0
+    buf = []
+    for row in rows.iterator(chunk_size=BUILD_CHUNK_ROWS):
+        i = position.get(row.book_id)
+        if i is None: # 목록을 만든 뒤 추가된 행은 다음 스냅샷에 포함
+            continue
+        vec = row.get_vector_array()
+        if vec is None:
+            continue
+        if dim is None:
+            dim = vec.shape[0]
+            vectors = np.lib.format.open_memmap(tmp["vectors"], mode="w+", dtype=np.float32, shape=(count, dim))
+        if vec.shape[0] != dim:
+            continue
+        buf.append((i, vec))
+        book_ids[i] = row.book.id
+        category_ids[i] = row.book.category_id or 0
+        isbns[i] = str(row.book.isbn or "")
+        written += 1
+        if len(buf) >= BUILD_CHUNK_ROWS:
+            _flush_rows(vectors, buf)
+    if vectors is None:
+        return {"rows": 0}
+    _flush_rows(vectors, buf)
+    vectors.flush()
+    del vectors
+
+    for name, array in (("ids", book_ids), ("categories", category_ids), ("isbns", isbns)):
+        with open(tmp[name], "wb") as f:
+            np.save(f, array)
+    for name in paths:
+        os.replace(tmp[name], paths[name])
+
+    header = {
+        "version": version,
+        "prefix": prefix,
+        "rows": count,
+        "written": written,
+        "dim": dim,
+        "synced_at": synced_at,
+        "created_at": time.time(),
+    }
+    header_tmp = os.path.join(snapshot_dir, f"{HEADER_NAME}.{os.getpid()}.tmp")
+    with open(header_tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f)
+        f.flush()
+        os.fsync(f.fileno())
+    # 이 rename 이 끝나는 순간 새 버전이 보인다. 읽는 쪽은 이전 파일 또는 새 파일 중 하나만 본다.
+    os.replace(header_tmp, os.path.join(snapshot_dir, HEADER_NAME))
+
+    _remove_old_versions(snapshot_dir, version)
+    header["seconds"] = round(time.perf_counter() - started, 2)
+    return header
+
+
+def _flush_rows(vectors, buf: list) -> None:
+    if not buf:
+        return
+    rows = [i for i, _ in buf]
+    vectors[rows] = _normalize_rows(np.vstack([vec for _, vec in buf]))
+    buf.clear()
+
+
+def _remove_old_versions(snapshot_dir: str, version: int) -> None:
+    # 이미 memmap으로 열린 파일은 삭제되어도 연 프로세스가 닫을 때까지 유지된다. (POSIX)
+    for path in glob.glob(os.path.join(snapshot_dir, "snapshot-*.npy")):
+        try:
+            file_version = int(os.path.basename(path).split(".")[0].split("-")[1])
+        except (IndexError, ValueError):
+            continue
+        if file_version <= version - KEEP_VERSIONS:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _read_header(snapshot_dir: str) -> dict:
+    try:
+        with open(os.path.join(snapshot_dir, HEADER_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ================================================================
+#  읽기 (버전이 바뀌면 다시 연다)
+# ================================================================
+
+_snapshot = None
+_checked_at = 0.0
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot_index() -> SnapshotVectorIndex | None:
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < CHECK_SECONDS:
+        return _snapshot
+
+    with _snapshot_lock:
+        _checked_at = now
+        header = _read_header(SNAPSHOT_DIR)
+        if not header.get("rows"):
+            return _snapshot
+        if _snapshot is not None and _snapshot.version == header["version"]:
+            return _snapshot
+        try:
+            _snapshot = _open_snapshot(SNAPSHOT_DIR, header)
+            print(f"[vector_snapshot] opened version={header['version']} rows={header['rows']} dim={header['dim']}")
+        except (OSError, ValueError) as e:
+            # 파일이 교체되는 중이면 기존 버전을 계속 쓰고 다음 확인 때 다시 시도한다.
+            print(f"[vector_snapshot] open failed version={header.get('version')}: {e}")
+    return _snapshot
+
+
+def _open_snapshot(snapshot_dir: str, header: dict) -> SnapshotVectorIndex:
+    base = os.path.join(snapshot_dir, header["prefix"])
+    return SnapshotVectorIndex(
+        header,
+        vectors=np.load(f"{base}.vectors.npy", mmap_mode="r"),
+        book_ids=np.load(f"{base}.ids.npy", mmap_mode="r"),
+        category_ids=np.load(f"{base}.categories.npy", mmap_mode="r"),
+        isbns=np.load(f"{base}.isbns.npy", mmap_mode="r"),
+    )
+
+
+def upsert_snapshot_index(book_id: int, isbn: str, vector, category_id: int | None = None) -> None:
+    if _snapshot is None:
+        return
+    _snapshot.upsert(book_id, isbn, vector, category_id=category_id)
+
+
+# ================================================================
+#  재생성 작업 (책 벡터가 저장되면 모아서 한 번)
+# ================================================================
+
+def enqueue_snapshot_build() -> None:
+    enqueue_job(
+        VectorJob.Kind.VECTOR_SNAPSHOT_BUILD,
+        dedup_key="snapshot",
+        delay_seconds=REBUILD_DELAY_SECONDS,
+    )
+
+
+def _run_snapshot_build_job(payload: dict) -> None:
+    close_old_connections()
+    with job_stage("snapshot"):
+        build_vector_snapshot()
+
+
+register_handler(VectorJob.Kind.VECTOR_SNAPSHOT_BUILD, _run_snapshot_build_job)
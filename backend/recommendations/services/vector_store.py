@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import threading
+import time
+
+import chromadb.errors
+from django.conf import settings
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+
+# Chroma 내부 collection 이름으로, openai_large 임베딩만 담는 컬렉션의 논리적 이름
+COLLECTION_NAME = "reviews_openai_large"
+
+# 벡터 DB를 Django 프로젝트 내부에 파일로 저장할 때의 경로설정
+    # - project/vectordb/openai_large/chroma.sqlite3 <- 메타데이터 + 내부 관리 데이터 DB
+    # - project/vectordb/openai_large/index/ <- 실제 벡터 검색을 위한 고속 인덱스 (사람이 읽을 수 있는 데이터가 아님)
+    # - 서버를 재시작해도 벡터가 유지(persist)된다.
+VECTOR_DB_DIR = os.path.join(
+    settings.BASE_DIR,
+    "recommendations",
+    "vector_db",
+    "openai_large_test",
+    "Book_vector_db",
+)
+
+# Chroma가 메타데이터를 저장하는 sqlite 파일.
+    # - 컬렉션을 다시 빌드(디렉터리 삭제 후 재생성)하면 inode가 바뀌므로 재오픈 판단에 사용한다.
+CHROMA_SQLITE_PATH = os.path.join(VECTOR_DB_DIR, "chroma.sqlite3")
+
+
+# LangChain의 Embeddings 인터페이스 구현
+    # - 임베딩을 내가 직접 계산해서 넣겠다는 선언
+class PrecomputedEmbedding(Embeddings):
+
+    # 벡터 차원 수 저장
+        # - Chroma는 내부적으로 차원 정보를 필요로 한다.
+    def __init__(self, dim: int | None):
+        self.dim = dim
+
+    # LangChain이 자동으로 임베딩 생성하지 못하게 차단한다.
+    def embed_documents(self, texts):
+        raise RuntimeError("Precomputed embeddings only") # 랭체인이 임베딩 생성시 에러
+
+    # 검색 시에도 LangChain이 자동 임베딩 생성하지 못하게 차단한다.
+        # - 쿼리 임베딩도 직접 생성하고자 한다.
+        # - LangChain은 저장소 역할만 하고, 임베딩 생성은 우리 서비스가 수행하겠다는 것.
+    def embed_query(self, text):
+        raise RuntimeError("Query embedding must be generated separately")
+
+
+# ================================================================
+#  프로세스 단위로 공유하는 Chroma 클라이언트 / 컬렉션 핸들
+# ================================================================
+
+# 요청마다 Chroma(...)를 새로 만들면 persistent store와 HNSW 세그먼트를 매번 다시 읽는다.
+# 한 프로세스에서 한 번만 열고, 읽기/쓰기 모두 같은 핸들을 재사용한다.
+_lock = threading.RLock()
+_vectordb = None
+_store_signature = None
+
+_stats = {
+    "open_count": 0,
+    "last_open_ms": 0.0,
+    "query_count": 0,
+    "query_total_ms": 0.0,
+    "last_query_ms": 0.0,
+    "write_count": 0,
+    "write_total_ms": 0.0,
+}
+
+
+def _read_store_signature():
+    try:
+        st = os.stat(CHROMA_SQLITE_PATH)
+    except OSError:
+        return None
+    return st.st_ino
+
+
+def _open_vectordb() -> Chroma:
+    started = time.perf_counter()
+    os.makedirs(VECTOR_DB_DIR, exist_ok=True) # 디렉터리가 없다면 생성
+    vectordb = Chroma(
+        collection_name=COLLECTION_NAME,
+        persist_directory=VECTOR_DB_DIR,
+        embedding_function=PrecomputedEmbedding(None),
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _stats["open_count"] += 1
+    _stats["last_open_ms"] = round(elapsed_ms, 2)
+    print(f"[vector_store] opened collection={COLLECTION_NAME} in {elapsed_ms:.1f}ms")
+    return vectordb
+
+
+def get_vectordb() -> Chroma:
+    """
+    프로세스 전역 Chroma 핸들을 반환한다.
+    컬렉션이 다시 빌드되어 sqlite 파일이 교체된 경우에만 다시 연다.
+    """
+    global _vectordb, _store_signature
+
+    signature = _read_store_signature()
+    vectordb = _vectordb
+    if vectordb is not None and signature == _store_signature:
+        return vectordb
+
+    with _lock:
+        if _vectordb is None or signature != _store_signature:
+            _vectordb = _open_vectordb()
+            # 최초 생성 시 sqlite 파일이 새로 만들어지므로 열고 난 뒤 다시 읽는다.
+            _store_signature = _read_store_signature()
+        return _vectordb
+
+
+def get_collection():
+    return get_vectordb()._collection
+
+
+def reset_vector_store() -> None:
+    """컬렉션을 재빌드한 뒤 호출하면 다음 접근 시 핸들을 새로 연다."""
+    global _vectordb, _store_signature
+    with _lock:
+        _vectordb = None
+        _store_signature = None
+
+
+def warm_up() -> None:
+    # 서버 기동 시 미리 열어 두어 첫 추천 요청이 오픈 비용을 떠안지 않게 한다.
+    try:
+        get_collection().count()
+    except Exception as e:
+        print(f"[vector_store] warm up failed: {e}")
+
+
+# 기존 핸들이 깨졌을 때(컬렉션 재생성 / sqlite 파일 교체) 나는 예외만 재오픈 대상으로 본다.
+    # - 차원 불일치 / 잘못된 where 같은 요청 오류는 다시 열어도 같으므로 그대로 올린다.
+STALE_HANDLE_ERRORS = (sqlite3.Error,) + tuple(
+    getattr(chromadb.errors, name)
+    for name in ("NotFoundError", "InvalidCollectionException", "InternalError")
+    if hasattr(chromadb.errors, name)
+)
+
+
+def _run_with_reopen(fn):
+    # 외부에서 컬렉션을 지우고 다시 만든 경우 기존 핸들이 깨질 수 있으므로 한 번만 재오픈 후 재시도한다.
+    try:
+        return fn(get_collection())
+    except STALE_HANDLE_ERRORS as e:
+        print(f"[vector_store] reopening after {type(e).__name__}: {e}")
+        reset_vector_store()
+        return fn(get_collection())
+
+
+def query_collection(query_embeddings, n_results: int = 10, include=None, where=None) -> dict:
+    started = time.perf_counter()
+
+    kwargs = {
+        "query_embeddings": query_embeddings,
+        "n_results": n_results,
+        "include": include or ["metadatas", "documents"],
+    }
+    if where:
+        kwargs["where"] = where
+
+    results = _run_with_reopen(lambda collection: collection.query(**kwargs))
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _stats["query_count"] += 1
+        _stats["query_total_ms"] += elapsed_ms
+        _stats["last_query_ms"] = round(elapsed_ms, 2)
+    return results
+
+
+def upsert_documents(ids, documents, metadatas, embeddings) -> None:
+    started = time.perf_counter()
+
+    # documents / metadatas / embeddings / ids 모두 길이가 같아야 한다.
+    def _upsert(collection):
+        with _lock:
+            collection.upsert(
+                ids=ids,
+                documents=documents,
+                metadatas=metadatas,
+                embeddings=embeddings,
+            )
+
+    _run_with_reopen(_upsert)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _stats["write_count"] += 1
+        _stats["write_total_ms"] += elapsed_ms
+
+
+def update_metadatas(ids, metadatas) -> int:
+    # 임베딩 / 문서는 그대로 두고 메타데이터만 고친다. (백필용, 컬렉션에 없는 id는 건너뜀)
+    def _update(collection):
+        with _lock:
+            existing = set(collection.get(ids=list(ids), include=[])["ids"])
+            pairs = [(i, md) for i, md in zip(ids, metadatas) if i in existing]
+            if pairs:
+                collection.update(ids=[i for i, _ in pairs], metadatas=[md for _, md in pairs])
+            return len(pairs)
+
+    return _run_with_reopen(_update)
+
+
+def get_vector_store_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    query_count = stats["query_count"]
+    stats["avg_query_ms"] = round(stats["query_total_ms"] / query_count, 2) if query_count else 0.0
+    stats["query_total_ms"] = round(stats["query_total_ms"], 2)
+    stats["write_total_ms"] = round(stats["write_total_ms"], 2)
+    stats["is_open"] = _vectordb is not None
+    return stats
@@ -1,3 +1,365 @@
-from django.test import TestCase
+import glob
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from books.models import Book, Category
+from recommendations.models import BookVector, UserProfileVector, VectorJob
+from recommendations.my_source.summary.summarizer.review_filter import classify_review, is_purchase_review
+from recommendations.services import vector_snapshot
+from recommendations.services.compressed_index import CompressedBookIndex, _assign, _spherical_kmeans
+from recommendations.services.job_queue import claim_next_job, enqueue_job
+from recommendations.services.make_book_vector_pipeline_after_add_book import PROVIDER_MODEL_KEY
+from recommendations.services.user_profile import (
+    _compare_and_save,
+    recompute_user_profile,
+    remove_review_contribution,
+    upsert_review_contribution,
+)
+from recommendations.services.vector_index import BookVectorIndex
+from recommendations.services.vector_search import _chroma_where
+from recommendations.services.vector_snapshot import SnapshotVectorIndex, build_vector_snapshot, get_snapshot_index
+
+
+# ================================================================
+#  사용자 프로필 벡터 (가중 합 + compare-and-swap)
+# ================================================================
+
+class UserProfileRunningSumTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="reader", password="pw")
+
+    def _mean(self):
+        profile = UserProfileVector.objects.get(user=self.user)
+        return profile, profile.get_vector_array(embedding_model=PROVIDER_MODEL_KEY)
+
+    def test_add_edit_delete_keep_exact_mean(self):
+        upsert_review_contribution(self.user.id, 1, [1.0, 0.0, 0.0])
+        upsert_review_contribution(self.user.id, 2, [0.0, 1.0, 0.0])
+        profile, mean = self._mean()
+        np.testing.assert_allclose(mean, [0.5, 0.5, 0.0], atol=1e-6)
+        self.assertEqual(profile.review_count, 2)
+
+        # 수정: 이전 기여분을 빼고 새 값을 더한다. (리뷰 수는 그대로)
+        upsert_review_contribution(self.user.id, 1, [0.0, 0.0, 1.0])
+        profile, mean = self._mean()
+        np.testing.assert_allclose(mean, [0.0, 0.5, 0.5], atol=1e-6)
+        self.assertEqual(profile.review_count, 2)
+
+        remove_review_contribution(2)
+        profile, mean = self._mean()
+        np.testing.assert_allclose(mean, [0.0, 0.0, 1.0], atol=1e-6)
+        self.assertEqual(profile.review_count, 1)
+        self.assertAlmostEqual(profile.weight_total, 1.0)
+
+    def test_removing_last_review_clears_profile(self):
+        upsert_review_contribution(self.user.id, 1, [1.0, 2.0])
+        remove_review_contribution(1)
+        profile, mean = self._mean()
+        self.assertIsNone(mean)
+        self.assertEqual(profile.review_count, 0)
+
+    def test_recompute_matches_incremental_sum(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(5, 8)).astype(np.float32)
+        for review_id, vec in enumerate(vectors, start=1):
+            upsert_review_contribution(self.user.id, review_id, vec.tolist())
+        _, incremental = self._mean()
+
+        recompute_user_profile(self.user.id)
+        profile, recomputed = self._mean()
+        np.testing.assert_allclose(recomputed, vectors.mean(axis=0), atol=1e-5)
+        np.testing.assert_allclose(incremental, recomputed, atol=1e-5)
+        np.testing.assert_allclose(profile.get_sum_array(), vectors.astype(np.float64).sum(axis=0), atol=1e-5)
+        self.assertEqual(profile.updates_since_recompute, 0)
+
+    def test_compare_and_save_rejects_stale_version(self):
+        upsert_review_contribution(self.user.id, 1, [1.0, 0.0])
+        stale = UserProfileVector.objects.get(user=self.user)
+
+        self.assertTrue(_compare_and_save(stale, np.array([2.0, 0.0]), 2.0, 2))
+        # 같은 version으로 다시 쓰면 0건 갱신 (다른 갱신이 끼어든 경우)
+        self.assertFalse(_compare_and_save(stale, np.array([9.0, 9.0]), 1.0, 1))
+
+        profile, mean = self._mean()
+        np.testing.assert_allclose(mean, [1.0, 0.0], atol=1e-6)
+        self.assertEqual(profile.version, stale.version + 1)
+
+
+# ================================================================
+#  압축 인덱스 (k-means / int8 잔차 / recall) - DB 없이 NumPy만 사용
+# ================================================================
+
+def _clustered_vectors(n_clusters=4, per_cluster=50, dim=32, noise=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = np.repeat(np.arange(n_clusters), per_cluster)
+    x = centers[labels] + noise * rng.normal(size=(len(labels), dim))
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x.astype(np.float32), labels
+
+
+class CompressedIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.matrix = rng.normal(size=(300, 64)).astype(np.float32)
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.book_ids = list(range(1, 301))
+        self.categories = [book_id % 5 for book_id in self.book_ids]
+        self.index = CompressedBookIndex.build(
+            self.book_ids, [str(b) for b in self.book_ids], self.categories, self.matrix, dim=32, n_lists=10,
+        )
+
+    def _rerank_vectors(self, ids):
+        return ids, self.matrix[[book_id - 1 for book_id in ids]]
+
+    def _exact(self, query, k, exclude=(), category_id=None):
+        scores = self.matrix @ query
+        ranked = [int(i) + 1 for i in np.argsort(-scores)]
+        return [
+            b for b in ranked
+            if b not in exclude and (category_id is None or self.categories[b - 1] == category_id)
+        ][:k]
+
+    def test_kmeans_recovers_separated_clusters(self):
+        x, labels = _clustered_vectors(seed=1)
+        centroids = _spherical_kmeans(x, 4, seed=0)
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+
+        # 같은 군집의 점은 같은 중심으로, 다른 군집의 점은 다른 중심으로 간다.
+        assign = _assign(x, centroids)
+        for label in range(4):
+            self.assertEqual(len(set(assign[labels == label])), 1)
+        self.assertEqual(len(set(assign)), 4)
+
+        # 수렴: 각 중심은 배정된 점들의 정규화된 평균이다.
+        for c in range(4):
+            mean = x[assign == c].mean(axis=0)
+            np.testing.assert_allclose(centroids[c], mean / np.linalg.norm(mean), atol=1e-5)
+
+    def test_int8_residual_round_trip(self):
+        index = self.index
+        truncated = self.matrix[index.book_ids - 1, :32]
+        truncated /= np.linalg.norm(truncated, axis=1, keepdims=True)
+
+        decoded = index.centroids[index.lists] + index.codes.astype(np.float32) * index.scale
+        # 반올림 오차는 차원별 스케일의 절반 이내
+        self.assertTrue(np.all(np.abs(decoded - truncated) <= index.scale / 2 + 1e-6))
+        self.assertEqual(index.codes.dtype, np.int8)
+        self.assertEqual(sorted(index.book_ids.tolist()), self.book_ids)
+
+    def test_full_probe_and_rerank_matches_exact_search(self):
+        for i in (0, 57, 199):
+            query = self.matrix[i]
+            found = self.index.search(
+                query, k=10, exclude_book_ids={i + 1}, n_probe=10, rerank=300, rerank_vectors=self._rerank_vectors,
+            )
+            self.assertEqual([hit["book_id"] for hit in found], self._exact(query, 10, exclude={i + 1}))
+
+    def test_default_probe_recall(self):
+        hits = 0
+        for i in range(50):
+            query = self.matrix[i]
+            found = self.index.search(
+                query, k=10, exclude_book_ids={i + 1}, n_probe=3, rerank=100, rerank_vectors=self._rerank_vectors,
+            )
+            hits += len({hit["book_id"] for hit in found} & set(self._exact(query, 10, exclude={i + 1})))
+        self.assertGreaterEqual(hits / 500, 0.5)
+
+    def test_category_filter_widens_probe_to_fill_k(self):
+        query = self.matrix[3]
+        found = self.index.search(
+            query, k=10, category_id=2, n_probe=1, rerank=100, rerank_vectors=self._rerank_vectors,
+        )
+        self.assertEqual(len(found), 10)
+        self.assertTrue(all(self.categories[hit["book_id"] - 1] == 2 for hit in found))
+
+
+# ================================================================
+#  구매·배송 리뷰 분류
+# ================================================================
+
+class PurchaseReviewFilterTests(SimpleTestCase):
+
+    def test_short_shipping_reviews_are_purchase_reviews(self):
+        for text in ("배송 빨라요", "포장 꼼꼼하게 왔어요", "책 상태 좋아요", "빨리 받았습니다"):
+            self.assertTrue(is_purchase_review(text), text)
+            self.assertEqual(classify_review(text), "purchase_review")
+
+    def test_content_reviews_mentioning_state_or_pace_are_kept(self):
+        long_text = "주인공의 심리 상태가 섬세하게 그려지고 전개가 빠르지만 인물 사이의 감정선이 끝까지 흔들리지 않아서 마지막 장까지 단숨에 읽었다. 오래 기억에 남을 소설이다."
+        self.assertFalse(is_purchase_review(long_text))
+        self.assertEqual(classify_review(long_text), "content_review")
+        self.assertEqual(classify_review("문장이 아름다워요"), "short_opinion")
+
+
+# ================================================================
+#  공유 벡터 스냅샷 (원자적 버전 교체 / overlay)
+# ================================================================
+
+class VectorSnapshotBuildTests(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name="소설")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # 모듈 전역(열린 스냅샷 / 확인 시각)은 테스트마다 초기화한다.
+        for name, value in (("SNAPSHOT_DIR", self.tmp.name), ("_snapshot", None), ("_checked_at", 0.0)):
+            patcher = mock.patch.object(vector_snapshot, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.books = [self._add_book(i, np.eye(8, dtype=np.float32)[i]) for i in range(4)]
+
+    def _add_book(self, i, vector):
+        book = Book.objects.create(title=f"book {i}", isbn=f"97800000000{i:02d}", category=self.category)
+        row = BookVector(book=book, embedding_model=PROVIDER_MODEL_KEY)
+        row.set_vector_array(vector)
+        row.save()
+        return book
+
+    def _reopen(self):
+        vector_snapshot._checked_at = 0.0 # CHECK_SECONDS를 기다리지 않고 CURRENT.json을 다시 읽는다.
+        return get_snapshot_index()
+
+    def test_rebuild_swaps_current_version_for_readers(self):
+        header = build_vector_snapshot(self.tmp.name)
+        self.assertEqual((header["version"], header["rows"], header["dim"]), (1, 4, 8))
+
+        index = get_snapshot_index()
+        self.assertEqual(index.version, 1)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.search(np.eye(8)[2], k=1)[0]["book_id"], self.books[2].id)
+
+        added = self._add_book(4, np.eye(8, dtype=np.float32)[4])
+        self.assertEqual(build_vector_snapshot(self.tmp.name)["version"], 2)
+
+        reopened = self._reopen()
+        self.assertEqual(reopened.version, 2)
+        self.assertEqual(len(reopened), 5)
+        self.assertEqual(reopened.search(np.eye(8)[4], k=1)[0]["book_id"], added.id)
+        # 이미 열린 이전 버전은 그대로 읽을 수 있다.
+        self.assertEqual(index.search(np.eye(8)[2], k=1)[0]["book_id"], self.books[2].id)
+
+    def test_old_versions_are_removed_after_keep_window(self):
+        for _ in range(3):
+            build_vector_snapshot(self.tmp.name)
+
+        versions = {
+            os.path.basename(path).split(".")[0]
+            for path in glob.glob(os.path.join(self.tmp.name, "snapshot-*.npy"))
+        }
+        self.assertEqual(versions, {"snapshot-2", "snapshot-3"})
+        self.assertEqual(self._reopen().version, 3)
+
+
+class SnapshotOverlayTests(SimpleTestCase):
+
+    def setUp(self):
+        # 마지막 행(-1)은 차원이 맞지 않아 건너뛴 빈 행
+        vectors = np.vstack([np.eye(3, dtype=np.float32), np.ones((1, 3), dtype=np.float32) / np.sqrt(3)])
+        self.index = SnapshotVectorIndex(
+            {"version": 1, "dim": 3, "created_at": 0},
+            vectors=vectors,
+            book_ids=np.array([1, 2, 3, -1], dtype=np.int64),
+            category_ids=np.array([1, 1, 2, 0], dtype=np.int64),
+            isbns=np.array(["a", "b", "c", ""], dtype=vector_snapshot.ISBN_DTYPE),
+        )
+        # 스냅샷 이후 book 1의 벡터가 바뀌었다.
+        self.index.upsert(1, "a", [0.0, 1.0, 0.0], category_id=1)
+
+    def test_overlay_hides_stale_snapshot_row(self):
+        found = self.index.search([1.0, 0.0, 0.0], k=4)
+        ids = [hit["book_id"] for hit in found]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertNotIn(-1, ids)
+        self.assertAlmostEqual({hit["book_id"]: hit["score"] for hit in found}[1], 0.0, places=5)
+
+        found = self.index.search([0.0, 1.0, 0.0], k=2)
+        self.assertEqual(sorted(hit["book_id"] for hit in found), [1, 2])
+        self.assertTrue(all(hit["score"] > 0.99 for hit in found))
+
+    def test_filters_apply_to_snapshot_and_overlay(self):
+        found = self.index.search([0.0, 1.0, 0.0], k=3, exclude_book_ids={2}, category_id=1)
+        self.assertEqual([hit["book_id"] for hit in found], [1])
+        self.assertEqual(len(self.index), 3)
+
+
+# ================================================================
+#  작업 큐 (중복 합치기 / 같은 키 동시 실행 방지)
+# ================================================================
+
+class VectorJobQueueTests(TestCase):
+
+    def setUp(self):
+        # 워커 스레드가 대기 작업을 먼저 가져가지 않도록 큐에만 넣는다.
+        patcher = mock.patch("recommendations.services.job_queue.should_start_in_process", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_enqueue_merges_queued_job_with_same_key(self):
+        first = enqueue_job(VectorJob.Kind.BOOK_VECTOR_BUILD, dedup_key="9780000000001", payload={"n": 1}, priority=5)
+        enqueue_job(VectorJob.Kind.BOOK_VECTOR_BUILD, dedup_key="9780000000001", payload={"n": 2}, priority=1)
+
+        jobs = VectorJob.objects.filter(kind=VectorJob.Kind.BOOK_VECTOR_BUILD)
+        self.assertEqual(jobs.count(), 1)
+        job = jobs.get()
+        self.assertEqual(job.id, first.id)
+        self.assertEqual(job.payload, {"n": 2})
+        self.assertEqual(job.priority, 5)
+        self.assertEqual(job.merged_count, 1)
+
+    def test_claim_skips_key_that_is_already_running(self):
+        enqueue_job(VectorJob.Kind.BOOK_VECTOR_BUILD, dedup_key="a")
+        running = claim_next_job("w1")
+        self.assertEqual(running.status, VectorJob.Status.RUNNING)
+        self.assertEqual(running.attempts, 1)
+
+        # 실행 중에 같은 키가 다시 들어오면 새 대기 작업이 생기지만 바로 가져가지 않는다.
+        enqueue_job(VectorJob.Kind.BOOK_VECTOR_BUILD, dedup_key="a")
+        self.assertIsNone(claim_next_job("w2"))
+
+        other = enqueue_job(VectorJob.Kind.BOOK_VECTOR_BUILD, dedup_key="b")
+        self.assertEqual(claim_next_job("w2").id, other.id)
+        self.assertIsNone(claim_next_job("w3"))
+
+
+# ================================================================
+#  조건부 검색 (제외 / 카테고리 조건을 top-k 전에 적용)
+# ================================================================
+
+class FilteredTopKTests(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.matrix = rng.normal(size=(60, 16)).astype(np.float32)
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.index = BookVectorIndex(dim=16)
+        for i, vec in enumerate(self.matrix):
+            self.index.upsert(i + 1, str(i + 1), vec, category_id=(i + 1) % 3)
+
+    def test_numpy_index_returns_full_k_after_filters(self):
+        query = self.matrix[0]
+        nearest = [int(i) + 1 for i in np.argsort(-(self.matrix @ query))]
+        excluded = set(nearest[:10]) # 가장 가까운 10권을 제외해도 k개가 채워져야 한다.
+
+        found = self.index.search(query, k=5, exclude_book_ids=excluded, category_id=1)
+        expected = [b for b in nearest if b not in excluded and b % 3 == 1][:5]
+        self.assertEqual([hit["book_id"] for hit in found], expected)
+
+    def test_chroma_where_pushes_filters_into_query(self):
+        self.assertIsNone(_chroma_where(set(), set(), None))
+        self.assertEqual(_chroma_where(set(), {3, 1}, None), {"book_id": {"$nin": [1, 3]}})
+        self.assertEqual(
+            _chroma_where({"978"}, {1}, 2),
+            {"$and": [
+                {"isbn13": {"$nin": ["978"]}},
+                {"book_id": {"$nin": [1]}},
+                {"category_id": {"$eq": 2}},
+            ]},
+        )
@@ -5,4 +5,8 @@ app_name = 'recommendations'
 
 urlpatterns = [
     path('<int:review_id>/', views.recommend_book, name='recommend_book'),
+    path('users/<int:user_id>/', views.recommend_books_for_user, name='recommend_books_for_user'),
+    path('books/<int:book_id>/similar/', views.similar_books, name='similar_books'),
+    path('stats/', views.recommendation_stats, name='recommendation_stats'),
+    path('jobs/', views.job_status, name='job_status'),
 ]
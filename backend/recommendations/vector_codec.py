@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+
+
+# ================================================================
+#  벡터 바이너리 직렬화
+# ================================================================
+
+# 3072차원 벡터를 json.dumps 하면 행당 약 60KB 텍스트가 되고, 읽을 때마다 json.loads 비용이 든다.
+# float32(또는 float16) 원시 바이트로 저장하면 12KB(6KB)로 줄고, 읽을 때는 복사 없이 ndarray로 감쌀 수 있다.
+SUPPORTED_DTYPES = ("float32", "float16", "float64") # float64: 누적 합(프로필 벡터 합계) 전용
+DEFAULT_DTYPE = "float32"
+
+
+def encode_vector(vector, dtype: str = DEFAULT_DTYPE) -> bytes:
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"unsupported vector dtype: {dtype}")
+    # 저장 포맷은 리틀 엔디언으로 고정한다.
+    arr = np.asarray(vector, dtype=np.dtype(dtype).newbyteorder("<")).reshape(-1)
+    return arr.tobytes()
+
+
+def decode_vector(blob, dtype: str = DEFAULT_DTYPE, dim: int | None = None) -> np.ndarray | None:
+    """
+    저장된 바이트를 복사 없이 ndarray로 감싸 반환한다. (읽기 전용 view)
+    차원 수가 embedding_dim과 다르면 None을 반환한다.
+    """
+    if blob is None:
+        return None
+    if dtype not in SUPPORTED_DTYPES:
+        return None
+
+    # sqlite는 bytes, postgres는 memoryview를 돌려준다. 둘 다 버퍼 프로토콜이므로 그대로 감싼다.
+    arr = np.frombuffer(blob, dtype=np.dtype(dtype).newbyteorder("<"))
+    if arr.size == 0:
+        return None
+    if dim is not None and arr.size != dim:
+        return None
+    return arr
+
+
+def decode_json_vector(raw: str | None) -> list[float] | None:
+    # 바이너리 마이그레이션 이전 행(JSON 문자열) 호환용
+    if not raw:
+        return None
+    try:
+        values = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(values, list) or not values:
+        return None
+    return values
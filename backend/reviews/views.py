@@ -7,7 +7,9 @@ from rest_framework.status import HTTP_403_FORBIDDEN
 from books.models import Book
 from common.utils.paginations import apply_queryset_pagination
 from likes.models import Like
-from recommendations.services.review_vector_pipeline import enqueue_review_vector_update
+from recommendations.services.review_recommendations import enqueue_review_recommendation
+from recommendations.services.review_vector_pipeline import enqueue_review_vector_update, on_review_deleted
+from recommendations.services.user_recommendations import refresh_user_exclusions
 from .models import Review
 from .serializers import ReviewCreateSerializer, ReviewSerializer, ReviewUpdateSerializer
 from django.db.models import Count, OuterRef, Subquery, IntegerField, Value
@@ -47,6 +49,8 @@ def list_and_create(request, book_id):
             book=book
         )
         enqueue_review_vector_update(review.id)
+        enqueue_review_recommendation(review.id)
+        refresh_user_exclusions(request.user.id)
         return Response(
             ReviewSerializer(review, context={"request": request}).data,
             status=status.HTTP_201_CREATED
@@ -130,6 +134,8 @@ def detail_and_update_and_delete(request, review_id):
         serializer = ReviewUpdateSerializer(review, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        enqueue_review_vector_update(review.id)
+        enqueue_review_recommendation(review.id)
         return Response(
             ReviewSerializer(review, context={"request": request}).data,
             status=status.HTTP_200_OK
@@ -149,7 +155,10 @@ def detail_and_update_and_delete(request, review_id):
             target_id=review.id
         ).delete()
 
+        review_id, book_id = review.id, review.book_id
         review.delete()
+        on_review_deleted(review_id, book_id)
+        refresh_user_exclusions(request.user.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     if request.method == 'GET':